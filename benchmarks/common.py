@@ -0,0 +1,192 @@
+# benchmarks/common.py
+
+import os
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from soru_bankasi.data import load_questions
+from soru_bankasi.embedding_cache import EmbeddingCache
+from soru_bankasi.manifest import row_ids
+
+# Gerçek bankadaki kümelenmeyi taklit etmek için sentetik vektörler konu merkezleri etrafında üretilir
+SYNTHETIC_TOPICS = 512
+SYNTHETIC_SPREAD = 2.0      # konu merkezine göre gürültünün büyüklüğü
+GENERATE_BLOCK_ROWS = 8192
+SCAN_BLOCK_ROWS = 16384
+
+# Sentetik soru metinleri için konu başına şablonlar; sayılar her soruda rastgele seçilir
+QUESTION_TEMPLATES = {
+    "Üslü İfadeler": [
+        "({a}^{b})^{c} işleminin sonucu aşağıdakilerden hangisidir?",
+        "{a}^{b} × {a}^(-{c}) işleminin sonucu kaçtır?",
+        "{a}^{b} / {a}^{c} ifadesinin en sade hali hangisidir?",
+    ],
+    "Köklü İfadeler": [
+        "√{a} + √{b} toplamının yaklaşık değeri kaçtır?",
+        "√({a} × {b}) ifadesinin en sade hali hangisidir?",
+    ],
+    "Logaritma Fonksiyonları": [
+        "log_{a}({b}) + log_{a}({c}) ifadesinin değeri nedir?",
+        "log({a}) = {b} ise log({a}^{c}) kaçtır?",
+    ],
+    "Polinomlar": [
+        "P(x) = {a}x^{b} - {c}x + {d} polinomunun x = {e} için değeri kaçtır?",
+        "P(x) = x^{b} + {a}x - {c} polinomunun (x - {d}) ile bölümünden kalan kaçtır?",
+    ],
+    "Türev": [
+        "f(x) = {a}x^{b} + {c}x fonksiyonunun x = {d} noktasındaki türevi kaçtır?",
+        "f(x) = {a}x^{b} - {c} eğrisine x = {d} noktasında çizilen teğetin eğimi kaçtır?",
+    ],
+    "Trigonometri": [
+        "sin({a}°) + cos({b}°) ifadesinin değeri kaçtır?",
+        "tan(x) = {a}/{b} ve x dar açı ise sin(x) kaçtır?",
+    ],
+    "Sayma ve Olasılık": [
+        "{a} kırmızı ve {b} mavi top bulunan bir torbadan rastgele {c} top çekiliyor. Hepsinin kırmızı olma olasılığı kaçtır?",
+        "{a} kişi arasından {c} kişilik bir komisyon kaç farklı şekilde seçilebilir?",
+    ],
+    "Diziler": [
+        "İlk terimi {a} ve ortak farkı {b} olan aritmetik dizinin {c}. terimi kaçtır?",
+        "İlk terimi {a} ve ortak çarpanı {b} olan geometrik dizinin ilk {c} teriminin toplamı kaçtır?",
+    ],
+}
+SYNTHETIC_LEVELS = ["9. sınıf", "10. sınıf", "11. sınıf", "12. sınıf"]
+SYNTHETIC_DIFFICULTIES = ["Kolay", "Orta", "Zor"]
+
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+def synthetic_corpus(path: str, rows: int, dim: int, seed: int = 0) -> np.ndarray:
+    """
+    Birim uzunlukta, kümelenmiş sentetik embedding'leri diskte bir memmap
+    dosyasına bloklar halinde üretir. Aynı boyutta dosya varsa yeniden kullanır.
+    """
+    if os.path.exists(path):
+        existing = np.load(path, mmap_mode="r")
+        if existing.shape == (rows, dim):
+            return existing
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    topics = normalize(rng.normal(size=(SYNTHETIC_TOPICS, dim)))
+    vectors = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(rows, dim))
+    for start in range(0, rows, GENERATE_BLOCK_ROWS):
+        n = min(GENERATE_BLOCK_ROWS, rows - start)
+        centers = topics[rng.integers(0, SYNTHETIC_TOPICS, n)]
+        noise = rng.standard_normal(size=(n, dim), dtype=np.float32) / np.sqrt(dim)
+        vectors[start:start + n] = normalize(centers + SYNTHETIC_SPREAD * noise)
+    vectors.flush()
+    del vectors
+    return np.load(path, mmap_mode="r")
+
+
+def make_queries(vectors: np.ndarray, count: int, noise: float = 0.05, seed: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bankadan rastgele satırlar seçip gürültü ekleyerek sorgu üretir.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (sorgu vektörleri, kaynak satır numaraları)
+    """
+    rng = np.random.default_rng(seed)
+    source = np.sort(rng.choice(vectors.shape[0], min(count, vectors.shape[0]), replace=False))
+    base = np.asarray(vectors[source], dtype=np.float32)
+    queries = normalize(base + noise * rng.normal(size=base.shape) / np.sqrt(base.shape[1]))
+    return queries, source
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int,
+                block_rows: int = SCAN_BLOCK_ROWS) -> np.ndarray:
+    """
+    float32 tam arama ile referans sonuçları üretir. Banka tek geçişte,
+    bloklar halinde okunur; tüm sorgular her blokla birlikte skorlanır.
+
+    Returns:
+        np.ndarray: (sorgu sayısı, k) satır numaraları, skora göre azalan.
+    """
+    n_queries = queries.shape[0]
+    best_scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+    best_rows = np.zeros((n_queries, k), dtype=np.int64)
+    for start in range(0, vectors.shape[0], block_rows):
+        block = np.asarray(vectors[start:start + block_rows], dtype=np.float32)
+        scores = queries @ block.T
+        all_scores = np.concatenate([best_scores, scores], axis=1)
+        all_rows = np.concatenate(
+            [best_rows, np.broadcast_to(np.arange(start, start + block.shape[0]), scores.shape)], axis=1
+        )
+        top = np.argpartition(-all_scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(all_scores, top, axis=1)
+        best_rows = np.take_along_axis(all_rows, top, axis=1)
+    order = np.argsort(-best_scores, axis=1)
+    return np.take_along_axis(best_rows, order, axis=1)
+
+
+def recall_at_k(results: List[np.ndarray], truth: np.ndarray, k: int) -> float:
+    """Her sorgu için ilk k sonucun referans ilk k ile kesişim oranının ortalaması."""
+    hits = [len(set(np.asarray(r)[:k].tolist()) & set(t[:k].tolist())) / k for r, t in zip(results, truth)]
+    return float(np.mean(hits)) if hits else 0.0
+
+
+def load_csv_vectors(csv_path: str, cache_path: str, model: str,
+                     dimensions: int) -> Optional[Tuple[List[str], np.ndarray]]:
+    """
+    Gerçek soru bankasının embedding'lerini yalnızca önbellekten okur (API çağrısı
+    yapılmaz). Önbellekte eksik embedding varsa None döner.
+    """
+    if not os.path.exists(csv_path) or not os.path.exists(cache_path):
+        return None
+    df = load_questions(csv_path)
+    vectors = EmbeddingCache(cache_path).get_many(model, dimensions, df["combined_text"].tolist())
+    if any(vector is None for vector in vectors):
+        return None
+    return row_ids(df).tolist(), normalize(np.asarray(vectors, dtype=np.float32))
+
+
+def synthetic_questions(rows: int, seed: int = 0) -> Tuple[List[str], List[str]]:
+    """
+    Konu şablonlarından, bankadaki `combined_text` biçimine benzeyen sentetik
+    soru metinleri üretir.
+
+    Returns:
+        Tuple[List[str], List[str]]: (id listesi, metin listesi)
+    """
+    rng = np.random.default_rng(seed)
+    templates = [(konu, template) for konu, items in QUESTION_TEMPLATES.items() for template in items]
+    choices = rng.integers(0, len(templates), rows)
+    numbers = rng.integers(2, 1000, size=(rows, 5))
+    levels = rng.integers(0, len(SYNTHETIC_LEVELS), rows)
+    difficulties = rng.integers(0, len(SYNTHETIC_DIFFICULTIES), rows)
+
+    texts = []
+    for row in range(rows):
+        konu, template = templates[choices[row]]
+        a, b, c, d, e = numbers[row].tolist()
+        question = template.format(a=a, b=b, c=c, d=d, e=e)
+        texts.append(f"{question} {konu} {SYNTHETIC_DIFFICULTIES[difficulties[row]]} {SYNTHETIC_LEVELS[levels[row]]}")
+    return [str(row) for row in range(rows)], texts
+
+
+def perturb_queries(texts: Sequence[str], count: int, drop: float = 0.25,
+                    seed: int = 1) -> Tuple[List[str], np.ndarray]:
+    """
+    Etiketli sorgu kümesi üretir: seçilen her metnin kelimelerinin bir kısmı
+    atılır; doğru cevap, sorgunun üretildiği satırdır.
+
+    Returns:
+        Tuple[List[str], np.ndarray]: (sorgu metinleri, kaynak satır numaraları)
+    """
+    rng = np.random.default_rng(seed)
+    source = np.sort(rng.choice(len(texts), min(count, len(texts)), replace=False))
+    queries = []
+    for row in source.tolist():
+        words = texts[row].split()
+        keep = rng.random(len(words)) >= drop
+        keep[0] = True
+        queries.append(" ".join(word for word, kept in zip(words, keep) if kept))
+    return queries, source
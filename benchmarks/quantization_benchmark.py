@@ -0,0 +1,121 @@
+# benchmarks/quantization_benchmark.py
+"""
+Sıkıştırılmış embedding depolama türlerini (ve isteğe bağlı Matryoshka önekli
+kaba taramayı) float32 tam aramayla karşılaştırır.
+
+Her depolama türü için vektör başına bellek, sorgu/saniye (QPS) ve float32
+referansına göre recall@k raporlanır. Gerçek CSV'nin embedding'leri önbellekte
+varsa onlar da ölçülür.
+
+Kullanım:
+    python -m benchmarks.quantization_benchmark --synthetic-rows 1000000 --dim 3072
+"""
+
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from soru_bankasi.quantization import create_codec, quantized_search
+
+from .common import exact_top_k, load_csv_vectors, make_queries, recall_at_k, synthetic_corpus
+
+
+def benchmark_corpus(name: str, vectors: np.ndarray, args: argparse.Namespace) -> List[Dict[str, object]]:
+    queries, _ = make_queries(vectors, args.queries)
+    k = min(args.k, vectors.shape[0])
+    truth = exact_top_k(vectors, queries, k)
+    results = []
+
+    # float32 referansı: tüm banka tek matris-vektör çarpımıyla skorlanır
+    started = time.perf_counter()
+    for query in queries:
+        scores = np.asarray(vectors) @ query
+        np.argpartition(-scores, k - 1)[:k]
+    elapsed = time.perf_counter() - started
+    results.append({
+        "corpus": name, "storage": "float32", "bytes/vector": vectors.shape[1] * 4,
+        "build_s": 0.0, "qps": len(queries) / elapsed, "recall": 1.0, "recall_no_rerank": 1.0,
+    })
+
+    variants = [(storage, None) for storage in args.storages]
+    if args.coarse_dims:
+        # Matryoshka: önekle kaba tarama + tam boyutla yeniden sıralama
+        variants += [(storage, args.coarse_dims) for storage in ["float32"] + args.storages]
+
+    for storage, coarse_dims in variants:
+        codec = create_codec(storage, vectors.shape[1], coarse_dims)
+        label = storage if coarse_dims is None else f"m{coarse_dims}+{storage}"
+        started = time.perf_counter()
+        codec.train(vectors)
+        codes = codec.encode(vectors)
+        build_seconds = time.perf_counter() - started
+
+        found, approx_only = [], []
+        started = time.perf_counter()
+        for query in queries:
+            rows, _ = quantized_search(codec, codes, vectors, query, k, rerank=args.rerank)
+            found.append(rows)
+        elapsed = time.perf_counter() - started
+
+        # Yeniden sıralamanın katkısını görmek için yalnızca yaklaşık skorla sıralama
+        for query in queries:
+            approx = codec.scores(codes, query)
+            approx_only.append(np.argsort(-approx)[:k])
+
+        results.append({
+            "corpus": name, "storage": label, "bytes/vector": codec.bytes_per_vector(codes),
+            "build_s": build_seconds, "qps": len(queries) / elapsed,
+            "recall": recall_at_k(found, truth, k),
+            "recall_no_rerank": recall_at_k(approx_only, truth, k),
+        })
+    return results
+
+
+def print_results(results: List[Dict[str, object]], k: int) -> None:
+    header = f"{'corpus':<22}{'storage':<14}{'B/vec':>8}{'build s':>10}{'QPS':>10}{f'R@{k}':>8}{'R@k(ham)':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['corpus']:<22}{r['storage']:<14}{r['bytes/vector']:>8}{r['build_s']:>10.2f}"
+            f"{r['qps']:>10.1f}{r['recall']:>8.3f}{r['recall_no_rerank']:>10.3f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Nicemlenmiş embedding depolama kıyaslaması.")
+    parser.add_argument("--csv", default="sorular_cozumleri_featureslerle.csv")
+    parser.add_argument("--cache", default="cache/embeddings.sqlite")
+    parser.add_argument("--model", default="text-embedding-3-large")
+    parser.add_argument("--dim", type=int, default=3072)
+    parser.add_argument("--synthetic-rows", type=int, default=1_000_000)
+    parser.add_argument("--workdir", default="cache/benchmarks")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank", type=int, default=100)
+    parser.add_argument("--coarse-dims", type=int, default=0,
+                        help="Matryoshka kaba tarama boyutu (0 = ölçme). Sentetik vektörlerde önek "
+                             "anlamlı olmadığından bu ölçüm esas olarak gerçek CSV içindir.")
+    parser.add_argument("--storages", default="float16,int8,pq",
+                        type=lambda value: [s.strip() for s in value.split(",") if s.strip()])
+    args = parser.parse_args()
+
+    results = []
+    real = load_csv_vectors(args.csv, args.cache, args.model, args.dim)
+    if real is None:
+        print(f"'{args.csv}' embedding'leri önbellekte eksik; gerçek CSV ölçümü atlandı.")
+    else:
+        results += benchmark_corpus("csv", real[1], args)
+
+    if args.synthetic_rows > 0:
+        path = f"{args.workdir}/synthetic_{args.synthetic_rows}x{args.dim}.npy"
+        vectors = synthetic_corpus(path, args.synthetic_rows, args.dim)
+        results += benchmark_corpus(f"synthetic-{args.synthetic_rows}", vectors, args)
+
+    print_results(results, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# benchmarks/recommender_benchmark.py
+"""
+Öneri aramasının uçtan uca çevrimdışı kıyaslaması.
+
+Sentetik soru bankaları (1k - 1M) ve gerçek CSV, deterministik yerel
+embedding (HashingEmbedder) ile vektörleştirilir; API anahtarı gerekmez.
+Etiketli sorgu kümesi bankadaki soruların kelimeleri eksiltilerek üretilir ve
+doğru cevap sorgunun kaynağı olan sorudur. Her arka uç için recall@k, MRR,
+p50/p95/p99 gecikme, eşzamanlı QPS ve indeks kurulum süresi raporlanır.
+
+Kullanım:
+    python -m benchmarks.recommender_benchmark --sizes 1000,10000,100000
+    python -m benchmarks.recommender_benchmark --sizes 1000000 --backends vector-float32,vector-int8,bm25
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from soru_bankasi.data import load_questions
+from soru_bankasi.keyword_search import BM25Index, reciprocal_rank_fusion
+from soru_bankasi.local_embeddings import HashingEmbedder
+from soru_bankasi.manifest import row_ids
+from soru_bankasi.vector_index import LocalVectorIndex
+
+from .common import perturb_queries, synthetic_questions
+
+UPSERT_CHUNK_ROWS = 50_000
+
+SearchFn = Callable[[int], List[str]]
+
+
+def build_vector_index(path: str, ids: Sequence[str], vectors: np.ndarray, storage: str,
+                       rerank: int, coarse_dimensions: int = 0) -> LocalVectorIndex:
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    index = LocalVectorIndex(
+        path, dimension=vectors.shape[1], initial_capacity=len(ids), storage=storage,
+        rerank_candidates=rerank, coarse_dimensions=coarse_dimensions or None,
+    )
+    with index.batch():
+        for start in range(0, len(ids), UPSERT_CHUNK_ROWS):
+            index.upsert([
+                {"id": ids[row], "values": vectors[row]}
+                for row in range(start, min(start + UPSERT_CHUNK_ROWS, len(ids)))
+            ])
+    # Sıkıştırılmış kodlar ilk sorguda üretilir; kurulum süresine dahil edilir
+    index.query(vector=vectors[0], top_k=1)
+    return index
+
+
+def build_backends(name: str, ids: List[str], texts: List[str], vectors: np.ndarray,
+                   queries: List[str], query_vectors: np.ndarray,
+                   args: argparse.Namespace) -> Dict[str, Tuple[float, SearchFn]]:
+    """Her arka uç için (kurulum süresi, sorgu numarası -> id listesi) döndürür."""
+    backends: Dict[str, Tuple[float, SearchFn]] = {}
+    fetch = max(args.k, args.hybrid_candidates)
+
+    vector_indexes: Dict[str, Tuple[LocalVectorIndex, float]] = {}
+    for backend in args.backends:
+        if not backend.startswith("vector-") and backend != "hybrid":
+            continue
+        storage = "float32" if backend == "hybrid" else backend[len("vector-"):]
+        coarse = 0
+        if storage.startswith("m") and "+" in storage:
+            coarse, storage = storage[1:].split("+", 1)
+            coarse = int(coarse)
+        key = f"{storage}-m{coarse}"
+        if key not in vector_indexes:
+            started = time.perf_counter()
+            path = os.path.join(args.workdir, "recommender", name, key)
+            index = build_vector_index(path, ids, vectors, storage, args.rerank, coarse)
+            vector_indexes[key] = (index, time.perf_counter() - started)
+        index, build_seconds = vector_indexes[key]
+
+        def search(q: int, index: LocalVectorIndex = index) -> List[str]:
+            matches = index.query(vector=query_vectors[q], top_k=fetch)["matches"]
+            return [match["id"] for match in matches]
+
+        if backend != "hybrid":
+            backends[backend] = (build_seconds, search)
+        else:
+            backends["_hybrid_vector"] = (build_seconds, search)
+
+    if "bm25" in args.backends or "hybrid" in args.backends:
+        started = time.perf_counter()
+        keyword_index = BM25Index(ids, texts)
+        bm25_seconds = time.perf_counter() - started
+
+        def keyword_search(q: int) -> List[str]:
+            return [vid for vid, _ in keyword_index.search(queries[q], fetch)]
+
+        if "bm25" in args.backends:
+            backends["bm25"] = (bm25_seconds, keyword_search)
+
+        if "hybrid" in args.backends:
+            vector_seconds, vector_search = backends.pop("_hybrid_vector")
+
+            def hybrid_search(q: int) -> List[str]:
+                # Uygulamadaki get_recommendations ile aynı birleştirme
+                vector_ids = vector_search(q)[:args.hybrid_candidates]
+                keyword_ids = keyword_search(q)[:args.hybrid_candidates]
+                fused = reciprocal_rank_fusion([vector_ids, keyword_ids], k=args.rrf_k)
+                return [vid for vid, _ in fused]
+
+            backends["hybrid"] = (vector_seconds + bm25_seconds, hybrid_search)
+    return backends
+
+
+def evaluate(search: SearchFn, relevant: Sequence[str], k: int, concurrency: int) -> Dict[str, float]:
+    """Bir arka ucun etiketli sorgu kümesindeki kalite ve hız ölçümleri."""
+    latencies, reciprocal_ranks, hits = [], [], []
+    for q, target in enumerate(relevant):
+        started = time.perf_counter()
+        results = search(q)[:k]
+        latencies.append((time.perf_counter() - started) * 1000)
+        rank = results.index(target) + 1 if target in results else 0
+        hits.append(rank > 0)
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(search, range(len(relevant))))
+    concurrent_seconds = time.perf_counter() - started
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "recall": float(np.mean(hits)), "mrr": float(np.mean(reciprocal_ranks)),
+        "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99),
+        "qps": len(relevant) / concurrent_seconds,
+    }
+
+
+def benchmark_corpus(name: str, ids: List[str], texts: List[str], query_source: List[str],
+                     args: argparse.Namespace) -> List[Dict[str, object]]:
+    embedder = HashingEmbedder(args.dim)
+    started = time.perf_counter()
+    vectors = embedder.embed(texts)
+    embed_seconds = time.perf_counter() - started
+    print(f"[{name}] {len(ids)} soru {embed_seconds:.1f} sn'de vektörleştirildi.")
+
+    queries, source = perturb_queries(query_source, args.queries)
+    query_vectors = embedder.embed(queries)
+    relevant = [ids[row] for row in source.tolist()]
+
+    results = []
+    backends = build_backends(name, ids, texts, vectors, queries, query_vectors, args)
+    for backend, (build_seconds, search) in backends.items():
+        search(0)  # ısınma
+        metrics = evaluate(search, relevant, args.k, args.concurrency)
+        results.append({"corpus": name, "backend": backend, "rows": len(ids),
+                        "embed_s": embed_seconds, "build_s": build_seconds, **metrics})
+    return results
+
+
+def print_results(results: List[Dict[str, object]], k: int, concurrency: int) -> None:
+    header = (f"{'corpus':<16}{'backend':<18}{'build s':>9}{f'R@{k}':>8}{'MRR':>7}"
+              f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{f'QPS@{concurrency}':>10}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['corpus']:<16}{r['backend']:<18}{r['build_s']:>9.2f}{r['recall']:>8.3f}{r['mrr']:>7.3f}"
+            f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['qps']:>10.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Öneri araması için çevrimdışı kıyaslama.")
+    parser.add_argument("--csv", default="sorular_cozumleri_featureslerle.csv")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        type=lambda value: [int(s) for s in value.split(",") if s.strip()])
+    parser.add_argument("--backends", default="vector-float32,vector-int8,vector-pq,bm25,hybrid",
+                        type=lambda value: [s.strip() for s in value.split(",") if s.strip()],
+                        help="vector-<depolama>, vector-m<önek>+<depolama>, bm25, hybrid")
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank", type=int, default=300)
+    parser.add_argument("--hybrid-candidates", type=int, default=20)
+    parser.add_argument("--rrf-k", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workdir", default="cache/benchmarks")
+    parser.add_argument("--output", default=None, help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    results = []
+    if os.path.exists(args.csv):
+        df = load_questions(args.csv)
+        results += benchmark_corpus(
+            "csv", row_ids(df).tolist(), df["combined_text"].tolist(), df["soru_metni"].tolist(), args
+        )
+    else:
+        print(f"'{args.csv}' bulunamadı; gerçek CSV ölçümü atlandı.")
+
+    for size in args.sizes:
+        ids, texts = synthetic_questions(size)
+        results += benchmark_corpus(f"synthetic-{size}", ids, texts, texts, args)
+
+    print_results(results, args.k, args.concurrency)
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
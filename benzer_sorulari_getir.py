@@ -1,8 +1,20 @@
 import streamlit as st
 import pandas as pd
-import openai, pinecone, time, os, ast
+import openai, os
+import threading
 from tqdm import tqdm  # Optional progress display
 
+from soru_bankasi import FILTER_FIELDS, MetadataPartitions, batched_writes, create_vector_index, vector_metadata
+from soru_bankasi.embeddings import iter_embedded_batches
+from soru_bankasi.embedding_providers import create_embedding_provider, supports_matryoshka
+from soru_bankasi.embedding_cache import CachedEmbedder, EmbeddingCache
+from soru_bankasi.keyword_search import BM25Index, reciprocal_rank_fusion
+from soru_bankasi.data import load_questions
+from soru_bankasi.manifest import IndexManifest, row_fingerprints, row_ids
+from soru_bankasi.neighbors import NeighborTable, bank_signature
+from soru_bankasi.question_store import QuestionStore
+from soru_bankasi.startup import IndexHealthMonitor, LazyResource, StartupTimer
+
 # =============================================================================
 # 1) APP CONFIGURATION & CUSTOM STYLE
 # =============================================================================
@@ -48,35 +60,102 @@ PINECONE_API_KEY = os.environ.get("PINECONE_API_KEY")
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
 
 
-# Pinecone & Embedding Settings
+# Index & Embedding Settings
+# INDEX_BACKEND: "pinecone" (uzak servis) veya "local" (diskte memory-mapped NumPy indeksi)
+INDEX_BACKEND = os.environ.get("SORU_INDEX_BACKEND", "pinecone")
+LOCAL_INDEX_DIR = os.environ.get("SORU_INDEX_DIR", "soru_index")
+# Yerel indekste bellekteki gösterim: "float32", "float16", "int8" veya "pq".
+# Sıkıştırılmış türlerde en iyi RERANK_CANDIDATES aday float32 vektörlerle yeniden skorlanır.
+INDEX_STORAGE = os.environ.get("SORU_INDEX_STORAGE", "float32")
+RERANK_CANDIDATES = 300
 PINECONE_ENV = "us-east-1"
 INDEX_NAME = "sorular-index"
+# İndeks bağlantısı arka planda bu aralıkla yoklanır (saniye)
+INDEX_HEALTH_CHECK_INTERVAL = 60
+# İndekse yazılmış satırların içerik hash'leri; açılışta yalnızca değişen satırlar yeniden indekslenir
+INDEX_MANIFEST_PATH = os.environ.get("SORU_INDEX_MANIFEST", f"cache/{INDEX_NAME}-{INDEX_BACKEND}.manifest.json")
 BATCH_SIZE = 50
+# EMBEDDING_PROVIDER: "openai" veya "local" (API gerektirmeyen deterministik hashing embedding).
+# Sağlayıcı değişince manifest geçersiz olur ve banka yeni vektörlerle baştan indekslenir.
+EMBEDDING_PROVIDER = os.environ.get("SORU_EMBEDDING_PROVIDER", "openai")
 EMBEDDING_MODEL = "text-embedding-3-large"
 EMBED_DIMENSIONS = 3072
+# Matryoshka kaba tarama boyutu: yerel indeks önce bu önekle tüm bankayı tarar,
+# en iyi RERANK_CANDIDATES adayı EMBED_DIMENSIONS ile yeniden sıralar (0 = kapalı).
+# Önek yapısı olmayan sağlayıcılarda (örn. "local" hashing) her zaman kapalıdır.
+COARSE_EMBED_DIMENSIONS = (int(os.environ.get("SORU_COARSE_DIMENSIONS", 256))
+                           if supports_matryoshka(EMBEDDING_PROVIDER, EMBEDDING_MODEL) else 0)
+EMBED_BATCH_SIZE = 256      # tek embedding isteğindeki metin sayısı (en fazla 2048)
+EMBED_MAX_WORKERS = 4       # aynı anda uçuşta olabilecek embedding isteği
+# İndeksleme, sorgu ve zenginleştirme çıktıları aynı önbelleği paylaşır
+EMBEDDING_CACHE_PATH = os.environ.get("SORU_EMBEDDING_CACHE", "cache/embeddings.sqlite")
+EMBEDDING_CACHE_MAX_ENTRIES = 200_000
+# Çevrimdışı üretilen komşu tablosu: python -m soru_bankasi.neighbors
+NEIGHBOR_TABLE_PATH = os.environ.get("SORU_NEIGHBOR_TABLE", "cache/neighbors.npz")
+# Hibrit (BM25 + vektör) arama ayarları
+HYBRID_CANDIDATES = 20      # her sıralamadan füzyona giren aday sayısı (komşu tablosu en az bu kadar komşu tutmalı)
+RRF_K = 60                  # reciprocal-rank fusion sabiti
+SEARCH_RESULT_LIMIT = 100   # kenar çubuğu aramasında gösterilecek en fazla soru
 
 # CSV Data file (update the path as needed)
 CSV_PATH = "sorular_cozumleri_featureslerle.csv"
+# Ayrıştırılmış, soru_id ile anahtarlanmış soru deposu; CSV değişince yeniden üretilir
+QUESTION_STORE_PATH = os.environ.get("SORU_QUESTION_STORE", "cache/questions.npz")
 
 # =============================================================================
-# 3) PINECONE INDEX BAĞLANTISI
+# 3) VEKTÖR INDEX BAĞLANTISI
 # =============================================================================
-st.sidebar.info("Pinecone indeksine bağlanılıyor...")
-from pinecone import Pinecone, ServerlessSpec
-pc = Pinecone(api_key=PINECONE_API_KEY)
-existing_indexes = pc.list_indexes().names()
-if INDEX_NAME not in existing_indexes:
-    st.sidebar.info(f"Index '{INDEX_NAME}' bulunamadı. Oluşturuluyor...")
-    pc.create_index(
-        name=INDEX_NAME,
+# İstemci, indeks ve veriler süreç genelinde bir kez oluşturulur; yeniden
+# çalıştırmalar ağ çağrısı yapmaz. Bağlantı ilk ihtiyaçta veya arka plandaki
+# sağlık kontrolü tarafından kurulur.
+@st.cache_resource
+def get_startup_timer():
+    return StartupTimer()
+
+startup = get_startup_timer()
+
+def connect_index():
+    if INDEX_BACKEND == "local":
+        return create_vector_index(
+            "local",
+            path=LOCAL_INDEX_DIR,
+            dimension=EMBED_DIMENSIONS,
+            storage=INDEX_STORAGE,
+            rerank_candidates=RERANK_CANDIDATES,
+            coarse_dimensions=COARSE_EMBED_DIMENSIONS or None
+        )
+    return create_vector_index(
+        "pinecone",
+        api_key=PINECONE_API_KEY,
+        index_name=INDEX_NAME,
         dimension=EMBED_DIMENSIONS,
-        metric="cosine",
-        spec=ServerlessSpec(cloud="aws", region=PINECONE_ENV)
+        region=PINECONE_ENV
     )
-else:
-    st.sidebar.success(f"Index '{INDEX_NAME}' zaten mevcut.")
 
-index = pc.Index(INDEX_NAME)
+@st.cache_resource
+def get_index_resource():
+    return LazyResource("indeks bağlantısı", connect_index, startup)
+
+@st.cache_resource
+def get_index_health():
+    return IndexHealthMonitor(get_index_resource(), interval=INDEX_HEALTH_CHECK_INTERVAL).start()
+
+def get_index():
+    return get_index_resource().get()
+
+index_health = get_index_health().snapshot()
+index_label = f"Yerel indeks '{LOCAL_INDEX_DIR}'" if INDEX_BACKEND == "local" else f"Pinecone index '{INDEX_NAME}'"
+if index_health["healthy"] is None:
+    st.sidebar.info(f"{index_label}: bağlantı arka planda kuruluyor...")
+elif index_health["healthy"]:
+    st.sidebar.success(
+        f"{index_label} hazır ({index_health['vector_count']} vektör, "
+        f"{index_health['latency_ms']:.0f} ms)"
+    )
+else:
+    st.sidebar.warning(f"{index_label} şu anda yanıt vermiyor.")
+    if debug_mode:
+        st.sidebar.write(index_health["error"])
 
 # =============================================================================
 # 4) CSV VERİLERİNİN YÜKLENMESİ VE ÖN İŞLEM
@@ -84,26 +163,13 @@ index = pc.Index(INDEX_NAME)
 @st.cache_data(show_spinner=True)
 def load_data(csv_path):
     try:
-        df = pd.read_csv(csv_path)
+        with startup.measure("CSV yükleme"):
+            return load_questions(csv_path)
     except Exception as e:
         st.error("CSV dosyası yüklenirken hata oluştu!")
         if debug_mode:
             st.exception(e)
         return pd.DataFrame()
-    
-    # Combine key text fields, including extra MEB/müfredat fields for richer context
-    def combine_text(row):
-        parts = []
-        for field in ["soru_metni", "çözüm", "alt_konular", "konu", "matematik_formulu"]:
-            if pd.notnull(row.get(field)):
-                parts.append(str(row[field]))
-        for field in ["meb_kazanım", "taxonomy", "soru_türü", "difficulty", "sinif", "sik_yapilan_hatalar"]:
-            if pd.notnull(row.get(field)):
-                parts.append(str(row[field]))
-        return " ".join(parts)
-    
-    df["combined_text"] = df.apply(combine_text, axis=1)
-    return df
 
 df = load_data(CSV_PATH)
 if df.empty:
@@ -114,93 +180,170 @@ else:
 # =============================================================================
 # 5) EMBEDDING & INDEX İŞLEMLERİ
 # =============================================================================
-def embed_single_text(text, model=EMBEDDING_MODEL):
-    max_retries = 5
-    for attempt in range(max_retries):
-        try:
-            if debug_mode:
-                st.write(f"Embedding işlemi (deneme {attempt+1}): {text[:50]}...")
-            response = openai.Embedding.create(model=model, input=[text])
-            return response["data"][0]["embedding"]
-        except openai.error.RateLimitError as e:
-            if debug_mode:
-                st.warning("RateLimitError oluştu, 5 saniye sonra tekrar deneniyor...")
-                st.exception(e)
-            time.sleep(5)
-        except Exception as e:
-            if debug_mode:
-                st.error("embed_single_text fonksiyonunda hata:")
-                st.exception(e)
-            time.sleep(5)
-    raise RuntimeError("embed_single_text için maksimum deneme sayısı aşıldı.")
+@st.cache_resource
+def get_embedding_cache():
+    return EmbeddingCache(EMBEDDING_CACHE_PATH, max_entries=EMBEDDING_CACHE_MAX_ENTRIES)
 
-def index_data(df):
+embedding_provider = create_embedding_provider(
+    EMBEDDING_PROVIDER, model=EMBEDDING_MODEL, dimensions=EMBED_DIMENSIONS
+)
+embedder = CachedEmbedder(
+    embedding_provider,
+    get_embedding_cache(),
+    model=embedding_provider.model,
+    dimensions=embedding_provider.dimensions
+)
+
+def embed_single_text(text):
+    if debug_mode:
+        st.write(f"Embedding işlemi: {text[:50]}...")
+    return embedder([text])[0]
+
+def index_data(df, fingerprints):
+    manifest = IndexManifest(
+        INDEX_MANIFEST_PATH, embedding_provider.model, EMBED_DIMENSIONS, metadata_fields=FILTER_FIELDS
+    )
+    delta = manifest.diff(fingerprints)
+    if debug_mode:
+        st.write(
+            f"Manifest karşılaştırması: {len(delta.changed)} değişen/yeni, "
+            f"{len(delta.removed)} silinen, {delta.unchanged} değişmeyen soru"
+        )
+
+    if delta.is_empty:
+        st.sidebar.info("Index güncel. (Değişen soru yok)")
+        return True
     try:
-        stats = index.describe_index_stats()
-        vector_count = stats.get("total_vector_count", 0)
-        if debug_mode:
-            st.write("Indexteki mevcut vektör sayısı:", vector_count)
+        index = get_index()
     except Exception as e:
-        st.error("Index stats alınırken hata oluştu!")
+        st.error("İndeks bağlantısı kurulamadı!")
         if debug_mode:
             st.exception(e)
-        vector_count = 0
-
-    if vector_count > 0:
-        st.sidebar.info("Index zaten doldurulmuş. (Zaten indekslenmiş)")
-        return
+        return False
+    failures = []
 
-    st.info("Veriler Pinecone indeksine ekleniyor...")
-    vectors = []
-    for idx, row in df.iterrows():
-        text = row["combined_text"]
+    if delta.removed:
         try:
-            embedding = embed_single_text(text)
+            index.delete(ids=delta.removed)
+            manifest.mark_removed(delta.removed)
+            st.sidebar.info(f"{len(delta.removed)} silinen sorunun vektörü kaldırıldı.")
         except Exception as e:
-            st.error(f"Embedding oluşturulurken hata (ID: {idx})")
+            failures.append(e)
+            st.error("Silinen soruların vektörleri kaldırılırken hata oluştu!")
             if debug_mode:
                 st.exception(e)
-            continue
-        vector = {
-            "id": str(idx),
-            "values": embedding,
-            "metadata": row.to_dict()
-        }
-        vectors.append(vector)
-        if len(vectors) == BATCH_SIZE:
-            try:
-                index.upsert(vectors=vectors)
-            except Exception as e:
-                st.error("Batch upsert sırasında hata oluştu!")
-                if debug_mode:
-                    st.exception(e)
-            vectors = []
-    if vectors:
+
+    if not delta.changed:
+        manifest.save()
+        return not failures
+
+    st.info(f"{len(delta.changed)} soru vektör indeksine ekleniyor...")
+    ids = row_ids(df)
+    changed = ids.isin(delta.changed)
+    items = list(zip(ids[changed], df.loc[changed, "combined_text"]))
+    # Vektörlerle yalnızca filtre alanları saklanır; gösterim alanları soru deposundan okunur
+    metadata_by_id = {
+        vid: vector_metadata(record)
+        for vid, record in zip(ids[changed], df.loc[changed, df.columns.intersection(FILTER_FIELDS)].to_dict(orient="records"))
+    }
+
+    progress_bar = st.progress(0.0)
+    progress_text = st.empty()
+
+    def report_progress(done, total, elapsed):
+        progress_bar.progress(done / total)
+        rate = done / elapsed if elapsed > 0 else 0.0
+        progress_text.write(f"{done}/{total} soru embed edildi ({rate:.1f} soru/sn)")
+
+    def upsert_batch(batch, label):
         try:
-            index.upsert(vectors=vectors)
+            index.upsert(vectors=batch)
+            # Yalnızca başarıyla yazılan satırlar manifest'e işlenir; diğerleri sonraki açılışta tekrar denenir
+            manifest.mark_indexed({v["id"]: fingerprints[v["id"]] for v in batch})
         except Exception as e:
-            st.error("Final upsert sırasında hata oluştu!")
+            failures.append(e)
+            st.error(f"{label} upsert sırasında hata oluştu!")
             if debug_mode:
                 st.exception(e)
+
+    # Embedding istekleri arka planda sürerken tamamlanan gruplar upsert edilir.
+    vectors = []
+    batches = iter_embedded_batches(
+        items,
+        embedder,
+        batch_size=min(EMBED_BATCH_SIZE, embedding_provider.max_batch_size),
+        max_workers=EMBED_MAX_WORKERS,
+        on_progress=report_progress
+    )
+    # Yerel indeks durum dosyasını her batch'te değil, döngü sonunda bir kez yazar.
+    # Manifest indeks kaydedildikten sonra yazılır; yarıda kalan eşitleme tekrarlanır.
+    try:
+        with batched_writes(index):
+            for batch_ids, embeddings, error in batches:
+                if error is not None:
+                    failures.append(error)
+                    st.error(f"Embedding oluşturulurken hata ({len(batch_ids)} soru atlandı)")
+                    if debug_mode:
+                        st.exception(error)
+                    continue
+                for vid, embedding in zip(batch_ids, embeddings):
+                    vectors.append({
+                        "id": vid,
+                        "values": embedding,
+                        "metadata": metadata_by_id[vid]
+                    })
+                while len(vectors) >= BATCH_SIZE:
+                    upsert_batch(vectors[:BATCH_SIZE], "Batch")
+                    vectors = vectors[BATCH_SIZE:]
+            if vectors:
+                upsert_batch(vectors, "Final")
+    finally:
+        manifest.save()
+    if failures:
+        return False
     st.success("Veriler başarıyla indekslendi.")
+    return True
+
+@st.cache_data
+def get_fingerprints(csv_path):
+    return row_fingerprints(load_data(csv_path))
+
+@st.cache_resource
+def get_index_sync_state():
+    # Bu süreçte indeksle eşitlenmiş banka imzası; aynı imza için manifest tekrar okunmaz.
+    # Kilit, eşzamanlı oturumların aynı anda index_data çalıştırmasını önler.
+    return {"lock": threading.Lock(), "signature": None}
 
 if not df.empty:
-    with st.spinner("Veriler indeksleniyor..."):
-        index_data(df)
+    fingerprints = get_fingerprints(CSV_PATH)
+    signature = bank_signature(fingerprints, EMBEDDING_PROVIDER, embedding_provider.model, embedding_provider.dimensions)
+    sync_state = get_index_sync_state()
+    if sync_state["signature"] != signature:
+        with st.spinner("Veriler indeksleniyor..."), sync_state["lock"]:
+            # Kilidi beklerken başka bir oturum eşitlemeyi tamamlamış olabilir
+            if sync_state["signature"] != signature:
+                with startup.measure("indeks eşitleme"):
+                    if index_data(df, fingerprints):
+                        sync_state["signature"] = signature
+    st.sidebar.caption(f"Soğuk başlangıç: {startup.summary()}")
 
 # =============================================================================
 # 6) BENZER SORU ÖNERİSİ FONKSİYONLARI
 # =============================================================================
-def query_similar_questions(query_text, top_k=5):
+def query_similar_questions(query_text, top_k=5, filter=None):
     try:
         query_embedding = embed_single_text(query_text)
-        query_response = index.query(
+        # Filtre varsa indeks yalnızca ilgili bölümü tarar (ön filtreleme)
+        filter_kwargs = {"filter": filter} if filter else {}
+        query_response = get_index().query(
             vector=query_embedding,
             top_k=top_k,
-            include_metadata=True
+            include_metadata=False,
+            **filter_kwargs
         )
         if debug_mode:
-            st.write("Pinecone'dan gelen yanıt:", query_response)
+            st.write("İndeksten gelen yanıt:", query_response)
+            st.write(f"Embedding önbelleği: {embedder.hits} isabet / {embedder.misses} ıska")
         return query_response.get("matches", [])
     except Exception as e:
         st.error("query_similar_questions sırasında hata oluştu:")
@@ -208,16 +351,80 @@ def query_similar_questions(query_text, top_k=5):
             st.exception(e)
         return []
 
-def get_recommendations(query_text, top_k=5):
+@st.cache_resource
+def load_neighbor_table(path, mtime):
+    return NeighborTable.load(path)
+
+@st.cache_resource
+def get_keyword_index(csv_path):
+    data = load_data(csv_path)
+    return BM25Index(row_ids(data), data["combined_text"])
+
+@st.cache_resource
+def get_partitions(csv_path):
+    data = load_data(csv_path)
+    return MetadataPartitions(data.to_dict(orient="records"), FILTER_FIELDS)
+
+@st.cache_resource
+def load_question_store(csv_path, mtime):
+    return QuestionStore.open(csv_path, QUESTION_STORE_PATH)
+
+def get_question_store():
+    return load_question_store(CSV_PATH, os.path.getmtime(CSV_PATH))
+
+def get_neighbor_table():
+    """Komşu tablosu mevcut ve güncel soru bankasıyla üretilmişse döndürür."""
+    if df.empty or not os.path.exists(NEIGHBOR_TABLE_PATH):
+        return None
     try:
-        candidates = query_similar_questions(query_text, top_k=top_k)
-        if not candidates:
+        table = load_neighbor_table(NEIGHBOR_TABLE_PATH, os.path.getmtime(NEIGHBOR_TABLE_PATH))
+    except Exception as e:
+        if debug_mode:
+            st.warning("Komşu tablosu okunamadı, canlı aramaya geçiliyor.")
+            st.exception(e)
+        return None
+    if table.signature != signature:
+        if debug_mode:
+            st.warning("Komşu tablosu güncel değil veya farklı embedding ayarlarıyla üretilmiş, canlı aramaya geçiliyor.")
+        return None
+    return table
+
+def get_vector_candidates(query_text, top_k, exclude_id=None, filter=None):
+    """Vektör benzerliğine göre sıralı aday id'lerini döndürür."""
+    # Bankadaki sorular için önceden hesaplanmış komşular doğrudan okunur.
+    # Tablo filtresiz hesaplandığından filtreli aramada canlı sorguya geçilir.
+    if exclude_id is not None and not filter:
+        table = get_neighbor_table()
+        if table is not None and exclude_id in table:
+            if table.covers(top_k):
+                return [vid for vid, _ in table.lookup(exclude_id, top_k)]
+            if debug_mode:
+                st.warning(f"Komşu tablosu {table.k} komşu içeriyor, {top_k} isteniyor; canlı aramaya geçiliyor.")
+
+    # Bankadaki bir soru için kendisi de sonuçlarda çıkacağından bir fazlası istenir
+    fetch_k = top_k + 1 if exclude_id is not None else top_k
+    candidates = query_similar_questions(query_text, top_k=fetch_k, filter=filter)
+    sorted_candidates = sorted(candidates, key=lambda x: x.get("score", 0), reverse=True)
+    return [cand["id"] for cand in sorted_candidates if cand.get("id") != exclude_id][:top_k]
+
+def get_recommendations(query_text, top_k=5, exclude_id=None, filter=None):
+    try:
+        # Vektör ve BM25 sıralamaları reciprocal-rank fusion ile birleştirilir;
+        # böylece (a^b)^c gibi birebir formül eşleşmeleri de kaçmaz.
+        vector_ids = get_vector_candidates(query_text, HYBRID_CANDIDATES, exclude_id, filter)
+        keyword_hits = get_keyword_index(CSV_PATH).search(
+            query_text, HYBRID_CANDIDATES + 1, rows=get_partitions(CSV_PATH).select(filter)
+        )
+        keyword_ids = [vid for vid, _ in keyword_hits if vid != exclude_id][:HYBRID_CANDIDATES]
+        fused = reciprocal_rank_fusion([vector_ids, keyword_ids], k=RRF_K)[:top_k]
+        if not fused:
             return []
-        sorted_candidates = sorted(candidates, key=lambda x: x.get("score", 0), reverse=True)
+        store = get_question_store()
         recommendations = [{
-            "soru_metni": cand["metadata"].get("soru_metni", "N/A"),
-            "score": cand.get("score", 0.0)
-        } for cand in sorted_candidates]
+            "id": vid,
+            "soru_metni": store.get(vid, "soru_metni", "N/A"),
+            "score": score
+        } for vid, score in fused]
         return recommendations
     except Exception as e:
         if debug_mode:
@@ -228,7 +435,7 @@ def get_recommendations(query_text, top_k=5):
 # 7) ANA KULLANICI ARAYÜZÜ (Soru Seçimi, Cevaplama & Öneriler)
 # =============================================================================
 
-# Oturum durumunda (session state) seçilen sorunun saklanması
+# Oturum durumunda (session state) seçilen sorunun id'si saklanır
 if "selected_question" not in st.session_state:
     st.session_state.selected_question = None
 
@@ -246,50 +453,56 @@ st.sidebar.markdown(
 if df.empty:
     st.error("Soru verisi mevcut değil.")
 else:
+    store = get_question_store()
+
     # Soru arama & filtreleme
     search_query = st.sidebar.text_input("Sorular arasında ara:")
     if search_query:
-        filtered_df = df[df["soru_metni"].str.contains(search_query, case=False, na=False)]
+        # Ters indeks üzerinden arama; son kelime yazılırken önek olarak eşleşir
+        hits = get_keyword_index(CSV_PATH).search(search_query, SEARCH_RESULT_LIMIT, prefix_last=True)
+        question_options = [vid for vid, _ in hits]
     else:
-        filtered_df = df
+        question_options = store.ids
 
-    if filtered_df.empty:
+    if not question_options:
         st.sidebar.warning("Aramanıza uygun soru bulunamadı.")
-        question_options = []
-    else:
-        question_options = filtered_df["soru_metni"].tolist()
-    
+
     # Varsayılan seçimi session_state üzerinden ayarlıyoruz:
     if st.session_state.selected_question in question_options:
         default_index = question_options.index(st.session_state.selected_question)
     else:
         default_index = 0
 
-    selected_question = st.sidebar.selectbox("Bir soru seçiniz:", question_options, index=default_index)
-    st.session_state.selected_question = selected_question  # Güncelle
+    # Seçenekler soru id'leridir; ekranda soru metni gösterilir
+    selected_id = st.sidebar.selectbox(
+        "Bir soru seçiniz:", question_options, index=default_index,
+        format_func=lambda vid: store.get(vid, "soru_metni", vid)
+    )
+    st.session_state.selected_question = selected_id  # Güncelle
+
+    # Öneriler yalnızca seçilen sınıf/konu/zorluk/soru türü içinden getirilir
+    st.sidebar.header("Öneri Filtreleri")
+    partitions = get_partitions(CSV_PATH)
+    filter_labels = {"sinif": "Sınıf", "konu": "Konu", "difficulty": "Zorluk", "soru_türü": "Soru Türü"}
+    recommendation_filter = {}
+    for field in FILTER_FIELDS:
+        chosen = st.sidebar.multiselect(filter_labels.get(field, field), partitions.values(field))
+        if chosen:
+            recommendation_filter[field] = {"$in": chosen}
 
     # Ana içerik alanı: Soru & Cevap ve Ek Bilgiler olmak üzere iki sekme
     tab1, tab2 = st.tabs(["Soru & Cevap", "Ek Bilgiler"])
     
     with tab1:
-        st.header("Soru")
-        st.markdown(f"**{selected_question}**")
-        try:
-            selected_row = df[df["soru_metni"] == selected_question].iloc[0]
-        except Exception as e:
+        selected_row = store.record(selected_id) if selected_id is not None else None
+        if selected_row is None:
             st.error("Seçilen soruya ait veriler alınırken hata oluştu!")
-            if debug_mode:
-                st.exception(e)
             st.stop()
-    
-        # Cevap seçeneklerini ayrıştırma
-        try:
-            choices = ast.literal_eval(selected_row["şıklar"])
-        except Exception as e:
-            if debug_mode:
-                st.warning("Şıklar alanının literal değerlendirmesi başarısız oldu, alternatif yöntem kullanılıyor.")
-                st.exception(e)
-            choices = selected_row["şıklar"].split(",")
+        st.header("Soru")
+        st.markdown(f"**{selected_row['soru_metni']}**")
+
+        # Şıklar depoda önceden ayrıştırılmış liste olarak tutulur
+        choices = selected_row["şıklar"]
     
         st.subheader("Cevap Seçenekleri")
         user_choice = st.radio("Lütfen doğru cevabı seçiniz:", choices, key="answer_radio")
@@ -303,14 +516,19 @@ else:
                 st.error("Maalesef, yanlış cevap.")
                 st.info("Konuyu pekiştirmek için öneriler hazırlanıyor...")
                 with st.spinner("Öneriler hazırlanıyor..."):
-                    rec_list = get_recommendations(selected_question, top_k=5)
+                    # combined_text indekslemede kullanılan metin olduğundan vektörü önbellekten gelir
+                    rec_list = get_recommendations(
+                        selected_row["combined_text"], top_k=5,
+                        exclude_id=selected_id,
+                        filter=recommendation_filter
+                    )
                 if rec_list:
                     with st.expander("Önerilen Sorulara Göz Atın"):
                         st.markdown("**Önerilen Sorular:**")
                         for i, rec in enumerate(rec_list, start=1):
                             # Her öneriyi tıklanabilir buton olarak sunuyoruz.
-                            if st.button(f"{i}. {rec['soru_metni']} (Benzerlik: {rec['score']:.3f})", key=f"rec_{i}"):
-                                st.session_state.selected_question = rec["soru_metni"]
+                            if st.button(f"{i}. {rec['soru_metni']} (Skor: {rec['score']:.3f})", key=f"rec_{i}"):
+                                st.session_state.selected_question = rec["id"]
                                 st.experimental_rerun()
                 else:
                     st.write("Öneri üretilemedi, lütfen daha sonra tekrar deneyiniz.")
@@ -329,4 +547,6 @@ else:
             "Sınıf": selected_row.get("sinif", "Veri yok")
         }
         for key, value in extra_info.items():
-            st.markdown(f"**{key}:** {value}")
+            if isinstance(value, list):
+                value = ", ".join(value)
+            st.markdown(f"**{key}:** {value or 'Veri yok'}")
@@ -1,11 +1,19 @@
 import os
 import re
-import json
 import time
+import argparse
 import logging
+from concurrent.futures import TimeoutError as FutureTimeoutError
 import pandas as pd
 import openai
 
+from soru_bankasi.checkpoint import JsonlCheckpoint
+from soru_bankasi.curriculum import CurriculumIndex
+from soru_bankasi.llm_json import JSONRepairError, RepairStats, parse_with_outcome, validate_record
+from soru_bankasi.pipeline import run_ordered
+from soru_bankasi.rate_limit import estimate_tokens, get_scheduler
+from soru_bankasi.telemetry import RunTelemetry, current_meter, metered
+
 # API anahtarınızı ortam değişkeni üzerinden alın.
 openai.api_key = os.getenv("OPENAI_API_KEY")
 if not openai.api_key:
@@ -14,6 +22,41 @@ if not openai.api_key:
 # Loglama yapılandırması
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# Chat çağrıları için hız sınırı bütçesi (hesap sınırlarına göre güncelleyin).
+# Zamanlayıcı token kovası, retry-after ve AIMD eşzamanlılık denetimini paylaşır.
+CHAT_MODEL = "gpt-4"  # Veya ihtiyaca göre "gpt-3.5-turbo"
+CHAT_REQUESTS_PER_MINUTE = 500
+CHAT_TOKENS_PER_MINUTE = 40_000
+CHAT_COMPLETION_TOKENS_ESTIMATE = 800  # yanıt JSON'u için token bütçesinden ayrılan pay
+CHAT_REQUEST_TIMEOUT = 60              # tek chat isteği için en fazla süre (saniye)
+# Toplu işleme: aynı anda işlenen en fazla soru ve soru başına süre sınırı (tekrar denemeler dahil)
+MAX_IN_FLIGHT = 8
+ROW_TIMEOUT = 300
+chat_scheduler = get_scheduler(
+    "openai-chat",
+    requests_per_minute=CHAT_REQUESTS_PER_MINUTE,
+    tokens_per_minute=CHAT_TOKENS_PER_MINUTE,
+)
+
+# Sonuçlar her soru tamamlandığında JSONL kontrol noktasına eklenir; yeniden
+# başlatmada işlenmiş soru_id'ler atlanır, nihai CSV/Parquet bu dosyadan üretilir.
+CHECKPOINT_FILE = "extracted_questions.jsonl"
+OUTPUT_CSV = "extracted_questions.csv"
+# Aynı sınıftaki sorular tek istekte gönderilir; şema, soru türü rehberi ve
+# müfredat istek başına bir kez yer alır. Yanıtta eksik kalan sorular tek tek işlenir.
+BATCH_SIZE = 5
+# Satır başına gecikme/token/tekrar ölçümleri; özet `<dosya>.summary.json` olarak yazılır
+TELEMETRY_FILE = "enrichment_telemetry.jsonl"
+CHUNK_SIZE = 1000  # girdi CSV'sinden tek seferde okunan satır sayısı
+# Sınıf partileri sonuçları girdi sırasından farklı sırada tamamlar; her kayda girdi
+# satır sırası yazılır ve nihai CSV/Parquet bu alana göre sıralanarak üretilir.
+INPUT_ORDER_FIELD = "girdi_sirasi"
+OUTPUT_FIELDS = [
+    "soru_id", "soru_metni", "şıklar", "doğru_şık", "çözüm", "alt_konular", "meb_kazanım",
+    "taxonomy", "soru_türü", "konu", "cozum_suresi", "difficulty", "sinif",
+    "sik_yapilan_hatalar", "matematik_formulu", "ek_not",
+]
+
 # MEB müfredatlarının tanımlanması (9, 10, 11, 12. sınıflar için örnek metinler)
 MEB_CURRICULUMS = {
     "9": """
@@ -102,26 +145,31 @@ MEB 12. Sınıf Matematik Öğretim Programı
 """
 }
 
-def get_meb_curriculum(sinif_value: str) -> str:
-    """
-    Verilen sınıf bilgisinden (örn. '9. sınıf', '10', '11', '12') ilgili müfredat bilgisini döndürür.
-    Varsayılan olarak 9. sınıf müfredatı döner.
-    """
-    grade_match = re.search(r'(\d+)', sinif_value)
+def grade_key(sinif_value: str) -> str:
+    """Sınıf bilgisini (örn. '9. sınıf', '10') müfredat anahtarına çevirir; varsayılan 9. sınıftır."""
+    grade_match = re.search(r'(\d+)', str(sinif_value))
     grade = grade_match.group(1) if grade_match else "9"
-    curriculum = MEB_CURRICULUMS.get(grade, MEB_CURRICULUMS["9"])
-    return curriculum.strip()
+    return grade if grade in MEB_CURRICULUMS else "9"
 
-def build_prompt(row: dict) -> str:
+# Prompta müfredatın tamamı yerine sorunun konusuyla eşleşen bölümler eklenir
+CURRICULUM_TOP_SECTIONS = 3
+curriculum_index = CurriculumIndex(MEB_CURRICULUMS, top_k=CURRICULUM_TOP_SECTIONS)
+
+def curriculum_query(row: dict) -> str:
+    """Müfredat bölümü aramasında kullanılan metin: konu ve alt konular, yoksa soru metni."""
+    query = f"{str(row.get('konu', '')).strip()} {str(row.get('alt_konular', '')).strip()}".strip()
+    return query or str(row.get("soru_metni", "")).strip()
+
+def get_relevant_curriculum(rows: list) -> str:
     """
-    CSV'deki soru satırındaki bilgileri ve ilgili MEB müfredatını kullanarak LLM'e gönderilecek promptu oluşturur.
-    Çıktıda istenen tüm alanlar yer almalıdır.
+    Sorulara (aynı sınıftan) en uygun müfredat bölümlerini döndürür; hiçbir
+    bölüm eşleşmezse sınıfın müfredatının tamamı döner.
     """
-    sinif_value = row.get("sinif", "9")
-    curriculum_text = get_meb_curriculum(str(sinif_value))
-    
-    # Soru türlerinin açıklamaları eklendi:
-    soru_turleri_aciklama = """
+    grade = grade_key(rows[0].get("sinif", "9"))
+    return curriculum_index.select(grade, [curriculum_query(row) for row in rows])
+
+# Soru türlerinin açıklamaları (her istekte bir kez yer alır)
+SORU_TURLERI_ACIKLAMA = """
 **Soru Türleri ve Açıklamaları**:
 1. Yorumlama Soruları: Verilen bilgi veya metni analiz ederek yorum yapmanızı gerektiren sorulardır. Grafik, tablo veya paragraf yorumlama bu kategoriye girer.
 2. Problem Çözme Soruları: Matematiksel veya mantıksal problemleri çözmenizi isteyen sorulardır. Genellikle birden fazla adımda çözüm gerektirir.
@@ -132,12 +180,7 @@ def build_prompt(row: dict) -> str:
 Lütfen 'soru_türü' alanını yukarıdaki kategorilerden en uygun olanı seçerek doldurun.
 """
 
-    prompt = f"""
-Aşağıdaki matematik sorusunu ilgili MEB müfredatına uygun olarak analiz et.
-Eksik bilgileri tamamlayarak ve gerekirse yorum ekleyerek aşağıdaki formatta **sadece JSON** çıktısı üret.
-Lütfen çıktı, yalnızca aşağıdaki anahtarları içermelidir:
-
-{{
+JSON_SCHEMA = """{
   "soru_id": "<soru id'si>",
   "soru_metni": "<soru metni>",
   "şıklar": <şıklar listesi>,
@@ -154,89 +197,325 @@ Lütfen çıktı, yalnızca aşağıdaki anahtarları içermelidir:
   "sik_yapilan_hatalar": <sık yapılan hatalar listesi>,
   "matematik_formulu": "<matematik formülü>",
   "ek_not": "Varsa ek açıklamalar"
-}}
+}"""
 
-{soru_turleri_aciklama}
+# Prompta eklenen soru alanları (ek_not modelin ürettiği alandır)
+QUESTION_FIELDS = [field for field in OUTPUT_FIELDS if field != "ek_not"]
 
-Soru bilgileri:
-soru_id: {row.get('soru_id', '').strip()}
-soru_metni: {row.get('soru_metni', '').strip()}
-şıklar: {row.get('şıklar', '').strip()}
-doğru_şık: {row.get('doğru_şık', '').strip()}
-çözüm: {row.get('çözüm', '').strip()}
-alt_konular: {row.get('alt_konular', '').strip()}
-meb_kazanım: {row.get('meb_kazanım', '').strip()}
-taxonomy: {row.get('taxonomy', '').strip()}
-soru_türü: {row.get('soru_türü', '').strip()}
-konu: {row.get('konu', '').strip()}
-cozum_suresi: {row.get('cozum_suresi', '').strip()}
-difficulty: {row.get('difficulty', '').strip()}
-sinif: {row.get('sinif', '').strip()}
-sik_yapilan_hatalar: {row.get('sik_yapilan_hatalar', '').strip()}
-matematik_formulu: {row.get('matematik_formulu', '').strip()}
-
-Ayrıca, ilgili MEB müfredatı (Sınıf: {sinif_value}) bilgisi aşağıdadır:
----------------------------------------------------------
-{curriculum_text}
+def format_question(row: dict) -> str:
+    """Soru satırını prompttaki "alan: değer" bloğuna çevirir."""
+    return "\n".join(f"{field}: {str(row.get(field, '')).strip()}" for field in QUESTION_FIELDS)
+
+def format_curriculum(rows: list) -> str:
+    sinif_value = rows[0].get("sinif", "9")
+    return f"""Ayrıca, ilgili MEB müfredatı (Sınıf: {sinif_value}) bilgisi aşağıdadır:
 ---------------------------------------------------------
+{get_relevant_curriculum(rows)}
+---------------------------------------------------------"""
+
+def build_prompt(row: dict) -> str:
+    """
+    CSV'deki soru satırındaki bilgileri ve ilgili MEB müfredatını kullanarak LLM'e gönderilecek promptu oluşturur.
+    Çıktıda istenen tüm alanlar yer almalıdır.
+    """
+    prompt = f"""
+Aşağıdaki matematik sorusunu ilgili MEB müfredatına uygun olarak analiz et.
+Eksik bilgileri tamamlayarak ve gerekirse yorum ekleyerek aşağıdaki formatta **sadece JSON** çıktısı üret.
+Lütfen çıktı, yalnızca aşağıdaki anahtarları içermelidir:
+
+{JSON_SCHEMA}
+
+{SORU_TURLERI_ACIKLAMA}
+
+Soru bilgileri:
+{format_question(row)}
+
+{format_curriculum([row])}
 
 Lütfen **sadece JSON formatında** çıktı üret.
 """
     return prompt
 
-def process_question(row: dict, max_retries: int = 3, delay: int = 2) -> dict:
+def build_batch_prompt(rows: list) -> str:
+    """
+    Aynı sınıftaki birden fazla soru için tek prompt oluşturur. Şema, soru türü
+    rehberi ve müfredat bir kez yer alır; model her soru için bir nesne içeren
+    JSON dizisi döndürür.
+    """
+    questions = "\n\n".join(
+        f"### Soru {position}\n{format_question(row)}" for position, row in enumerate(rows, start=1)
+    )
+    prompt = f"""
+Aşağıdaki {len(rows)} matematik sorusunu ilgili MEB müfredatına uygun olarak ayrı ayrı analiz et.
+Eksik bilgileri tamamlayarak ve gerekirse yorum ekleyerek her soru için aşağıdaki formatta bir JSON nesnesi üret.
+Çıktı, sorularla aynı sırada {len(rows)} nesne içeren **sadece bir JSON dizisi** olmalıdır.
+Her nesne yalnızca aşağıdaki anahtarları içermeli ve "soru_id" alanı sorudaki değerle aynı olmalıdır:
+
+{JSON_SCHEMA}
+
+{SORU_TURLERI_ACIKLAMA}
+
+Soru bilgileri:
+{questions}
+
+{format_curriculum(rows)}
+
+Lütfen **sadece JSON dizisi** formatında çıktı üret.
+"""
+    return prompt
+
+# Yanıt şeması: liste alanları ve diğerleri metin. Bozuk JSON (kod bloğu, sondaki
+# virgül, tek tırnak...) önce yerel onarılır; yalnızca onarılamayan veya zorunlu
+# alanları eksik yanıtlar için istek tekrarlanır.
+LIST_FIELDS = ("şıklar", "alt_konular", "sik_yapilan_hatalar")
+RESPONSE_SCHEMA = {field: (list if field in LIST_FIELDS else str) for field in OUTPUT_FIELDS}
+REQUIRED_FIELDS = ("soru_metni", "şıklar", "doğru_şık", "alt_konular", "konu")
+json_stats = RepairStats()
+
+def parse_response(content: str):
+    """Yanıtı (gerekirse yerel onarımla) ayrıştırır; sonucu genel sayaca ve satırın ölçerine yazar."""
+    meter = current_meter()
+    outcome = "failed"
+    try:
+        value, outcome = parse_with_outcome(content)
+    finally:
+        json_stats.record(outcome)
+        if meter is not None:
+            meter.add_parse(outcome)
+    return value
+
+def check_response(item) -> tuple:
+    """Model çıktısını şemaya göre doğrular; (düzeltilmiş kayıt, sorunlar) döndürür."""
+    return validate_record(item, RESPONSE_SCHEMA, required=REQUIRED_FIELDS)
+
+def request_completion(prompt: str, expected_items: int = 1) -> str:
+    """
+    Promptu paylaşılan zamanlayıcı üzerinden modele gönderir ve yanıt metnini döndürür.
+    Deneme sayısı ve token kullanımı satırın ölçerine kaydedilir.
+    """
+    meter = current_meter()
+    try:
+        response = chat_scheduler.call(
+            openai.ChatCompletion.create,
+            model=CHAT_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0,
+            request_timeout=CHAT_REQUEST_TIMEOUT * expected_items,
+            tokens=estimate_tokens(prompt) + CHAT_COMPLETION_TOKENS_ESTIMATE * expected_items
+        )
+    finally:
+        if meter is not None:
+            meter.add_attempts(chat_scheduler.last_attempts())
+    if meter is not None:
+        meter.add_usage(response)
+    return response.choices[0].message.content.strip()
+
+def process_question(row: dict, max_retries: int = 3) -> dict:
     """
     Verilen soru satırını LLM'e gönderir, analiz ettirir ve JSON çıktısı olarak döndürür.
-    Hata durumunda belirlenen sayıda yeniden deneme yapar.
+    API hataları paylaşılan zamanlayıcıda yeniden denenir; onarılamayan JSON veya
+    zorunlu alanları eksik yanıtta istek belirlenen sayıda tekrarlanır.
     """
     prompt = build_prompt(row)
+    meter = current_meter()
     for attempt in range(1, max_retries + 1):
+        if attempt > 1 and meter is not None:
+            meter.add_retry()
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",  # Veya ihtiyaca göre "gpt-3.5-turbo"
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0
-            )
-            content = response.choices[0].message.content.strip()
-            result = json.loads(content)
+            result, problems = check_response(parse_response(request_completion(prompt)))
+            if problems:
+                logging.error(f"Deneme {attempt}/{max_retries} - Soru {row.get('soru_id', 'Bilinmiyor')} "
+                              f"yanıtı şemaya uymuyor: {'; '.join(problems)}")
+                continue
             logging.info(f"Soru {row.get('soru_id', 'Bilinmiyor')} başarıyla işlendi.")
             return result
+        except JSONRepairError as e:
+            logging.error(f"Deneme {attempt}/{max_retries} - Soru {row.get('soru_id', 'Bilinmiyor')} için geçersiz JSON: {e}")
         except Exception as e:
-            logging.error(f"Deneme {attempt}/{max_retries} - Soru {row.get('soru_id', 'Bilinmiyor')} işlenirken hata: {e}")
-            time.sleep(delay)
+            # Zamanlayıcı geçici hataları zaten yeniden denedi; burada kalıcı hata vardır
+            logging.error(f"Soru {row.get('soru_id', 'Bilinmiyor')} işlenirken hata: {e}")
+            break
     logging.warning(f"Soru {row.get('soru_id', 'Bilinmiyor')} işlenemedi.")
     return {}
 
+def match_batch_results(rows: list, items: list) -> list:
+    """
+    Toplu yanıttaki nesneleri soru_id ile satırlara eşler. Yanıt soru sayısıyla
+    aynı uzunluktaysa, soru_id'si hiçbir satırla eşleşmeyen nesneler aynı sıradaki
+    eşlenmemiş satıra verilir. Bir nesne en fazla bir satıra verilir; eşlenemeyen
+    satırlar için boş sözlük döner (tek soru isteğiyle işlenir).
+    """
+    def item_id(item) -> str:
+        return str(item.get("soru_id", "")).strip() if isinstance(item, dict) else ""
+
+    by_id = {}
+    for index, item in enumerate(items):
+        if item_id(item):
+            by_id.setdefault(item_id(item), index)
+    results = [None] * len(rows)
+    used = set()
+    for position, row in enumerate(rows):
+        index = by_id.get(str(row.get("soru_id", "")).strip())
+        if index is not None:
+            results[position] = items[index]
+            used.add(index)
+    if len(items) == len(rows):
+        row_ids = {str(row.get("soru_id", "")).strip() for row in rows}
+        for position, item in enumerate(items):
+            if (results[position] is None and position not in used and isinstance(item, dict)
+                    and item_id(item) not in row_ids):
+                results[position] = item
+                used.add(position)
+    return [result or {} for result in results]
+
+def process_batch(rows: list, max_retries: int = 2) -> list:
+    """
+    Aynı sınıftaki soruları tek istekte işler ve satır sırasıyla sonuç listesi döndürür.
+    Yanıtta bulunmayan veya okunamayan sorular tek tek `process_question` ile işlenir.
+    """
+    if len(rows) == 1:
+        return [process_question(rows[0])]
+    prompt = build_batch_prompt(rows)
+    items = []
+    meter = current_meter()
+    for attempt in range(1, max_retries + 1):
+        if attempt > 1 and meter is not None:
+            meter.add_retry()
+        try:
+            parsed = parse_response(request_completion(prompt, expected_items=len(rows)))
+            # Model diziyi tek anahtarlı bir nesneye sarabilir
+            if isinstance(parsed, dict):
+                parsed = next((value for value in parsed.values() if isinstance(value, list)), [parsed])
+            items = parsed
+            break
+        except JSONRepairError as e:
+            logging.error(f"Deneme {attempt}/{max_retries} - {len(rows)} soruluk toplu istek için geçersiz JSON: {e}")
+        except Exception as e:
+            logging.error(f"{len(rows)} soruluk toplu istek işlenirken hata: {e}")
+            break
+
+    results, missing = [], []
+    for position, item in enumerate(match_batch_results(rows, items)):
+        result, problems = check_response(item) if item else ({}, ["yanıtta yok"])
+        if problems:
+            missing.append(position)
+        results.append(result)
+    if missing:
+        logging.warning(f"Toplu yanıtta {len(missing)}/{len(rows)} soru eksik veya geçersiz; tek tek işlenecek.")
+        for position in missing:
+            results[position] = process_question(rows[position])
+    logging.info(f"{len(rows) - len(missing)}/{len(rows)} soru toplu istekle işlendi.")
+    return results
+
+def iter_pending_rows(csv_file: str, done_ids: set, chunk_size: int = CHUNK_SIZE):
+    """
+    CSV'yi parça parça okur ve kontrol noktasında olmayan satırları
+    (soru_id, girdi satır sırası, satır) olarak üretir. Tüm sütunlar metin
+    olarak okunur; soru_id yoksa satır numarası kullanılır.
+    """
+    skipped = 0
+    for chunk in pd.read_csv(csv_file, chunksize=chunk_size, dtype=str, keep_default_na=False):
+        for index, row in chunk.iterrows():
+            soru_id = row.get("soru_id") or str(index)
+            if soru_id in done_ids:
+                skipped += 1
+                continue
+            yield soru_id, int(index), row
+    if skipped:
+        logging.info(f"{skipped} soru daha önce işlendiği için atlandı.")
+
+def iter_grade_batches(pending_rows, batch_size: int = BATCH_SIZE):
+    """
+    Bekleyen (soru_id, sıra, satır) kayıtlarını sınıfa göre gruplayıp `batch_size`
+    büyüklüğünde partiler üretir. Her sınıf için en fazla bir parti bellekte
+    bekler; girdi bitince yarım partiler de gönderilir.
+    """
+    buffers = {}
+    for soru_id, position, row in pending_rows:
+        grade = grade_key(row.get("sinif", "9"))
+        buffers.setdefault(grade, []).append((soru_id, position, row))
+        if len(buffers[grade]) >= batch_size:
+            yield buffers.pop(grade)
+    for buffer in buffers.values():
+        if buffer:
+            yield buffer
+
+def enrich_batch(batch: list) -> tuple:
+    """Partiyi işler; (sonuçlar, kullanım ölçeri, süre) döndürür."""
+    started = time.perf_counter()
+    with metered() as meter:
+        results = process_batch([row for _, _, row in batch])
+    return results, meter, time.perf_counter() - started
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="MEB matematik sorularını LLM ile zenginleştirir.")
+    # CSV dosya yolunu ihtiyacınıza göre güncelleyin (örn. "./data/sorular.csv").
+    parser.add_argument("--input", default="path/to/your/sorular.csv", help="Girdi soru CSV'si")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE, help="Sonuçların eklendiği JSONL kontrol noktası")
+    parser.add_argument("--output", default=OUTPUT_CSV, help="Kontrol noktasından üretilecek CSV")
+    parser.add_argument("--parquet", default=None, help="İsteğe bağlı Parquet çıktısı (pyarrow gerekir)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Girdiden tek seferde okunan satır")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help="Tek istekte gönderilen aynı sınıftan soru sayısı (1: soru başına istek)")
+    parser.add_argument("--telemetry", default=TELEMETRY_FILE, help="Satır bazlı ölçümlerin yazılacağı JSONL")
+    return parser.parse_args()
+
 def main():
-    # CSV dosya yolunu ihtiyacınıza göre güncelleyin.
-    csv_file = "path/to/your/sorular.csv"  # Örn: "./data/sorular.csv"
+    args = parse_args()
+    checkpoint = JsonlCheckpoint(args.checkpoint, key="soru_id")
+    done_ids = checkpoint.done_ids()
+    if done_ids:
+        logging.info(f"Kontrol noktasında {len(done_ids)} işlenmiş soru bulundu, kaldığı yerden devam ediliyor.")
+
+    # Sınıf partileri eşzamanlı işlenir (hız sınırını zamanlayıcı yönetir); sonuçlar parti sırasıyla gelir.
+    # Her sonuç tamamlanınca girdi satır sırasıyla birlikte kontrol noktasına eklenir; kontrol noktası
+    # parti sırasındadır, nihai çıktı girdi sırasına göre sıralanır. İşlenemeyen sorular yazılmaz,
+    # bir sonraki çalıştırmada yeniden denenir.
+    processed_count = 0
+    batch_size = max(1, args.batch_size)
+    telemetry = RunTelemetry(args.telemetry)
     try:
-        df = pd.read_csv(csv_file)
+        results = run_ordered(
+            iter_grade_batches(iter_pending_rows(args.input, done_ids, args.chunk_size), batch_size),
+            enrich_batch, max_in_flight=MAX_IN_FLIGHT, timeout=ROW_TIMEOUT * batch_size
+        )
+        with checkpoint:
+            for batch, outcome, error in results:
+                if error is not None:
+                    logging.error(f"{len(batch)} soruluk parti işlenirken hata: {error}")
+                    timed_out = isinstance(error, FutureTimeoutError)
+                    outcome = ([{}] * len(batch), None, ROW_TIMEOUT * batch_size if timed_out else 0.0)
+                processed_batch, meter, latency = outcome
+                for (soru_id, position, row), processed in zip(batch, processed_batch):
+                    if processed:
+                        processed["soru_id"] = soru_id
+                        processed[INPUT_ORDER_FIELD] = position
+                        checkpoint.append(processed)
+                        processed_count += 1
+                    else:
+                        logging.warning(f"Soru {soru_id} atlandı.")
+                telemetry.record([soru_id for soru_id, _, _ in batch], meter, latency,
+                                 [bool(processed) for processed in processed_batch])
     except Exception as e:
-        logging.error(f"CSV dosyası okunurken hata oluştu: {e}")
+        # İşlenen sonuçlar kontrol noktasında kalır; yeniden çalıştırınca devam edilir
+        logging.error(f"Sorular işlenirken hata oluştu: {e}")
         return
+    finally:
+        summary_path = telemetry.close()
+        logging.info(f"Çalıştırma özeti:\n{telemetry.report()}")
+        if summary_path:
+            logging.info(f"Ölçümler '{args.telemetry}' ve '{summary_path}' dosyalarına yazıldı.")
+    logging.info(f"Bu çalıştırmada {processed_count} soru işlendi.")
+    logging.info(f"Model yanıtları: {json_stats.summary()}")
 
-    extracted_data = []
-    # Her soru için LLM çağrısı yapılır.
-    for index, row in df.iterrows():
-        soru_id = row.get("soru_id", index)
-        logging.info(f"İşlenen Soru ID: {soru_id}")
-        processed = process_question(row)
-        if processed:
-            # İsteğe bağlı olarak soru_id bilgisini ekleyin.
-            processed["soru_id"] = soru_id
-            extracted_data.append(processed)
-        else:
-            logging.warning(f"Soru {soru_id} atlandı.")
-
-    if extracted_data:
-        result_df = pd.DataFrame(extracted_data)
-        output_csv = "extracted_questions.csv"
-        try:
-            result_df.to_csv(output_csv, index=False)
-            logging.info(f"Çıktılar '{output_csv}' dosyasına başarıyla kaydedildi.")
-        except Exception as e:
-            logging.error(f"Sonuçların CSV dosyasına yazılırken hata: {e}")
+    try:
+        written = checkpoint.export(OUTPUT_FIELDS, csv_path=args.output, parquet_path=args.parquet,
+                                    order_key=INPUT_ORDER_FIELD)
+    except Exception as e:
+        logging.error(f"Sonuçların CSV dosyasına yazılırken hata: {e}")
+        return
+    if written:
+        logging.info(f"{written} soru '{args.output}' dosyasına başarıyla kaydedildi.")
     else:
         logging.warning("Hiçbir soru işlenemedi, çıktı oluşturulmadı.")
 
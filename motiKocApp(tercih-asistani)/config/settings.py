@@ -37,6 +37,15 @@ CACHE_TTL = 3600  # 1 hour
 CACHE_TYPE = "filesystem"
 CACHE_DIR = ".streamlit/cache"
 
+# LLM yanıt önbelleği: metot başına TTL (saniye) ve en fazla kayıt sayısı
+LLM_CACHE_PATH = os.path.join(CACHE_DIR, "llm_responses.db")
+LLM_CACHE_MAX_ENTRIES = 1000
+LLM_CACHE_TTLS = {
+    'analyze_performance': CACHE_TTL,
+    'get_subject_recommendations': 6 * CACHE_TTL,
+    'explain_solution': 7 * 24 * CACHE_TTL,  # soru çözümü kullanıcıya bağlı değil
+}
+
 # Security Settings
 PASSWORD_MIN_LENGTH = 8
 SESSION_EXPIRY = 3600  # 1 hour
@@ -56,6 +65,15 @@ MAX_CONCURRENT_USERS = 100
 REQUEST_TIMEOUT = 30
 MAX_RETRIES = 3
 
+# LLM Gateway Settings
+LLM_MAX_CONCURRENT = 8             # aynı anda çalışan en fazla model çağrısı
+LLM_MAX_QUEUE = 32                 # sıra bekleyebilecek en fazla çağrı
+LLM_QUEUE_TIMEOUT = 20             # sırada en fazla bekleme (saniye)
+LLM_CIRCUIT_FAILURE_THRESHOLD = 5  # devre kesiciyi açan art arda hata sayısı
+LLM_CIRCUIT_RESET_TIMEOUT = 30     # devre açıkken bekleme (saniye)
+LLM_FANOUT_WORKERS = LLM_MAX_CONCURRENT  # paralel başlatılan bağımsız çağrılar için iş parçacığı sayısı
+LLM_FANOUT_TIMEOUT = REQUEST_TIMEOUT + LLM_QUEUE_TIMEOUT  # sayfanın bir bölüm için en fazla bekleyeceği süre
+
 # Forum Settings
 FORUM_CONFIG = {
     'max_title_length': 100,
@@ -6,6 +6,7 @@ import logging
 import plotly.express as px
 from core.database import DatabaseManager, DatabaseError
 from services.gamification import GamificationService
+from services.llm_cache import LLMResponseCache
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -330,6 +331,9 @@ class StudyCalendar:
                 'notes': session_data.get('notes', '')
             })
             
+            # Kullanıcının çalışma verisi değişti; ona bağlı AI yanıtları yeniden üretilsin
+            LLMResponseCache.get_instance().invalidate(scope=self.user_id)
+
             # Award XP for study session
             xp = self.gamification.calculate_xp_for_activity(
                 'study_session',
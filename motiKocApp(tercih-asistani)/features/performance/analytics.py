@@ -46,14 +46,52 @@ class PerformanceAnalytics:
             "AI Değerlendirme"
         ])
 
+        # Girdileri hazır olan tüm AI çağrıları sayfa açılırken birlikte başlatılır;
+        # seçili olmayan derslerin önerileri önceden hazırlanıp önbelleğe düşer
+        subjects = self._get_subjects()
+        subject_data = {subject: self._get_subject_performance(subject) for subject in subjects}
+        futures = self._start_ai_requests(subject_data)
+
+        placeholders = {}
         with tab1:
             self._show_overview()
         with tab2:
-            self._show_subject_analysis()
+            placeholders.update(self._show_subject_analysis(subjects, subject_data))
         with tab3:
             self._show_mock_exam_analysis()
         with tab4:
-            self._show_ai_evaluation()
+            placeholders['evaluation'] = self._show_ai_evaluation()
+
+        # Her bölüm kendi çağrısı biter bitmez doldurulur
+        for name, result in self.ai_service.iter_completed({name: futures[name] for name in placeholders}):
+            with placeholders[name].container():
+                if name == 'evaluation':
+                    self._render_ai_evaluation(result)
+                else:
+                    self._render_subject_recommendations(result)
+
+    def _start_ai_requests(self, subject_data: Dict[str, Optional[Dict[str, Any]]]) -> Dict[Any, Any]:
+        """Start AI evaluation and per-subject recommendation calls in parallel"""
+        futures = {
+            'evaluation': self.ai_service.submit('analyze_performance', {
+                'study_data': self._get_study_data(),
+                'mock_data': self._get_mock_exam_data(),
+                'target_data': self._get_target_data()
+            }, cache_scope=self.user_id)
+        }
+        for subject, data in subject_data.items():
+            if data:
+                futures[('subject', subject)] = self.ai_service.submit(
+                    'get_subject_recommendations',
+                    subject,
+                    {
+                        'total_hours': data['total_hours'],
+                        'avg_performance': data['avg_performance'],
+                        'topics': data['topic_performance']
+                    },
+                    cache_scope=self.user_id
+                )
+        return futures
 
     def _show_overview(self):
         """Display general performance overview"""
@@ -114,17 +152,17 @@ class PerformanceAnalytics:
             fig = self._create_daily_dist_chart(performance_data['hourly_dist'])
             st.plotly_chart(fig, use_container_width=True)
 
-    def _show_subject_analysis(self):
-        """Display subject-wise performance analysis"""
+    def _show_subject_analysis(self, subjects: List[str],
+                               all_subject_data: Dict[str, Optional[Dict[str, Any]]]) -> Dict[Any, Any]:
+        """Display subject-wise performance analysis; returns the placeholder for AI recommendations"""
         st.markdown("### 📚 Ders Analizi")
 
-        subjects = self._get_subjects()
         if not subjects:
             st.info("Hiç ders bulunmuyor.")
-            return
+            return {}
 
         subject = st.selectbox("Ders Seçin", subjects)
-        subject_data = self._get_subject_performance(subject)
+        subject_data = all_subject_data.get(subject)
 
         if subject_data:
             # Display subject metrics
@@ -166,13 +204,23 @@ class PerformanceAnalytics:
                 for topic in subject_data['weak_topics']:
                     st.markdown(f"- {topic['name']}: {topic['performance']:.1f}/5")
 
-            # Display recommendations
+            # Recommendations are filled in when the AI call completes
             st.markdown("#### 💡 Öneriler")
-            for rec in subject_data['recommendations']:
-                st.markdown(f"- {rec}")
+            placeholder = st.empty()
+            placeholder.info("Öneriler hazırlanıyor...")
+            return {('subject', subject): placeholder}
+
+        st.info(f"{subject} dersi için henüz veri bulunmuyor.")
+        return {}
+
+    def _render_subject_recommendations(self, recommendations: Optional[List[str]]):
+        """Display AI recommendations for the selected subject"""
+        if not recommendations:
+            st.info("Şu anda öneri oluşturulamadı.")
+            return
+        for rec in recommendations:
+            st.markdown(f"- {rec}")
 
-        else:
-            st.info(f"{subject} dersi için henüz veri bulunmuyor.")
     def _show_mock_exam_analysis(self):
         """Display mock exam performance analysis"""
         st.markdown("### 📝 Deneme Sınavı Analizi")
@@ -240,19 +288,14 @@ class PerformanceAnalytics:
             st.info("Henüz deneme sınavı verisi bulunmuyor.")
 
     def _show_ai_evaluation(self):
-        """Display AI-powered performance evaluation"""
+        """Display the AI evaluation header; returns the placeholder filled when the analysis completes"""
         st.markdown("### 🤖 AI Değerlendirmesi")
+        placeholder = st.empty()
+        placeholder.info("AI değerlendirmesi hazırlanıyor...")
+        return placeholder
 
-        study_data = self._get_study_data()
-        mock_data = self._get_mock_exam_data()
-        target_data = self._get_target_data()
-
-        analysis = self.ai_service.analyze_performance({
-            'study_data': study_data,
-            'mock_data': mock_data,
-            'target_data': target_data
-        })
-
+    def _render_ai_evaluation(self, analysis: Optional[Dict[str, Any]]):
+        """Display AI-powered performance evaluation"""
         if analysis:
             # Display overall assessment
             st.markdown("#### 📊 Genel Değerlendirme")
@@ -523,24 +566,13 @@ class PerformanceAnalytics:
                     elif topic.get('performance', 0) <= 3:
                         weak_topics.append(topic_data)
 
-                # Get AI recommendations
-                recommendations = self.ai_service.get_subject_recommendations(
-                    subject,
-                    {
-                        'total_hours': stats.get('total_minutes', 0) / 60,
-                        'avg_performance': stats.get('avg_performance', 0),
-                        'topics': topics
-                    }
-                )
-
                 return {
                     'total_hours': stats.get('total_minutes', 0) / 60,
                     'avg_performance': stats.get('avg_performance', 0),
                     'success_rate': success_rate,
                     'topic_performance': topics,
                     'strong_topics': strong_topics,
-                    'weak_topics': weak_topics,
-                    'recommendations': recommendations
+                    'weak_topics': weak_topics
                 }
 
         except DatabaseError as e:
@@ -1,10 +1,10 @@
 # university/recommender.py
 
 import pandas as pd
-from typing import Dict, List, Optional, Tuple, Any
-import google.generativeai as genai
+from typing import Dict, Iterator, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
 import re
+from contextlib import closing
 from enum import Enum, auto
 import json
 import os
@@ -15,6 +15,8 @@ from datetime import datetime
 import nest_asyncio
 import logging
 
+from services.llm_gateway import LLMGateway
+
 # Apply nest_asyncio to allow nested event loops
 nest_asyncio.apply()
 
@@ -22,6 +24,10 @@ nest_asyncio.apply()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _message_stream(message: str) -> Iterator[str]:
+    """Wrap a fixed message as a response stream"""
+    yield message
+
 # Define Intent Types
 class IntentType(Enum):
     PROGRAM = auto()
@@ -70,8 +76,7 @@ class UniversityRecommender:
             if api_key is None:
                 raise ValueError("Gemini API key must be provided or set as an environment variable.")
         
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel(model)
+        self.model = LLMGateway.get_instance(api_key=api_key).model(model)
         self.system_prompt = """
 Sen bir üniversite öneri sistemi asistanısın. Kullanıcının verdiği soruyu analiz et ve kullanıcının tercih kriterlerini ayrıştırarak aşağıdaki bilgileri çıkar. 
 Kullanıcının ifadesini en yalın haliyle anla. Örneğin, "yazılımcılık" ifadesi geldiğinde bunu "yazılım mühendisi" olarak algıla.
@@ -345,21 +350,24 @@ Kullanıcının sorusunu analiz ederek, bu bilgileri doğru JSON formatında ver
             logger.error(f"Error in applying filters: {e}")
             return df
 
-    def _generate_response(self, filtered_df: pd.DataFrame, question: str) -> str:
+    def _generate_response(self, filtered_df: pd.DataFrame, question: str) -> Iterator[str]:
         """
-        Generate a natural language response based on the filtered results.
+        Generate a natural language response based on the filtered results,
+        streamed as the model produces it.
 
         Args:
             filtered_df (pd.DataFrame): The filtered university programs data.
             question (str): The user's original question.
 
-        Returns:
-            str: The AI-generated response.
+        Yields:
+            str: Parts of the AI-generated response as they arrive.
         """
-        try:
-            if filtered_df.empty:
-                return "Üzgünüm, arama kriterlerinize uygun bir program bulamadım."
+        if filtered_df.empty:
+            yield "Üzgünüm, arama kriterlerinize uygun bir program bulamadım."
+            return
 
+        received = False
+        try:
             results_summary = filtered_df.head(20).to_dict('records')
 
             prompt = f"""
@@ -378,14 +386,17 @@ Lütfen bu sonuçları analiz ederek Türkçe olarak detaylı ve yardımcı bir
 Cevabı doğal ve samimi bir üslupla yaz, ancak kısa ve odaklı tut.
 """
 
-            response = self.model.generate_content(prompt)
-            return response.text
+            # Stream is closed (and stops being read) if the consumer stops early
+            with closing(self.model.stream_content(prompt, label='university_recommender')) as stream:
+                for chunk in stream:
+                    received = True
+                    yield chunk
 
         except Exception as e:
             logger.error(f"Error in generating response: {e}")
-            return "Sonuçları değerlendirirken bir hata oluştu. Lütfen daha sonra tekrar deneyin."
+            yield ("\n\n" if received else "") + "Sonuçları değerlendirirken bir hata oluştu. Lütfen daha sonra tekrar deneyin."
 
-    def process_question(self, question: str, df: pd.DataFrame) -> Tuple[pd.DataFrame, str]:
+    def process_question(self, question: str, df: pd.DataFrame) -> Tuple[pd.DataFrame, Iterator[str]]:
         """
         Process user question and return filtered results with explanation.
 
@@ -394,12 +405,13 @@ Cevabı doğal ve samimi bir üslupla yaz, ancak kısa ve odaklı tut.
             df (pd.DataFrame): The original university programs data.
 
         Returns:
-            Tuple[pd.DataFrame, str]: The filtered data and the AI-generated response.
+            Tuple[pd.DataFrame, Iterator[str]]: The filtered data and the AI-generated
+                response stream; generation starts when the stream is consumed.
         """
         try:
             intent_data = self._analyze_intent(question)
             if not intent_data:
-                return df, "Sorunuzu anlamakta zorlanıyorum. Lütfen daha net bir ifade kullanın."
+                return df, _message_stream("Sorunuzu anlamakta zorlanıyorum. Lütfen daha net bir ifade kullanın.")
 
             criteria = self._create_filter_criteria(intent_data)
             filtered_df = self._apply_filters(df, criteria)
@@ -408,7 +420,7 @@ Cevabı doğal ve samimi bir üslupla yaz, ancak kısa ve odaklı tut.
                 
         except Exception as e:
             logger.error(f"Error in processing question: {e}")
-            return df, "İşlem sırasında bir hata oluştu. Lütfen daha sonra tekrar deneyin."
+            return df, _message_stream("İşlem sırasında bir hata oluştu. Lütfen daha sonra tekrar deneyin.")
 
 class UniversityRecommenderInterface:
     def __init__(self, api_key: str):
@@ -881,20 +893,21 @@ class UniversityRecommenderInterface:
             placeholder="Örnek: İstanbul'da başarı sırası 50000'den iyi olan bilgisayar mühendisliği bölümlerini göster"
         )
 
+        response_stream = None
         if st.button("Ara", type="primary"):
             if not question.strip():
                 st.warning("Lütfen bir soru girin.")
                 return
 
             with st.spinner("Sonuçlar hazırlanıyor..."):
-                filtered_df, response = self.recommender.process_question(question, self.df)
+                filtered_df, response_stream = self.recommender.process_question(question, self.df)
 
                 # Apply manual filters
                 filtered_df = self._apply_filters(filtered_df, criteria)
 
-                # Store results in session state
+                # Store results in session state; the response is stored once streamed
                 st.session_state.filtered_results = filtered_df
-                st.session_state.current_response = response
+                st.session_state.current_response = None
 
                 # Add to search history
                 self._add_to_search_history(question, len(filtered_df))
@@ -903,8 +916,11 @@ class UniversityRecommenderInterface:
         if st.session_state.filtered_results is not None:
             st.header("🔍 Sonuçlar")
 
-            # Display AI response
-            if st.session_state.current_response:
+            # Display AI response; a new response is rendered as its tokens arrive
+            if response_stream is not None:
+                with st.expander("AI Değerlendirmesi", expanded=True), closing(response_stream):
+                    st.session_state.current_response = st.write_stream(response_stream)
+            elif st.session_state.current_response:
                 with st.expander("AI Değerlendirmesi", expanded=True):
                     st.write(st.session_state.current_response)
 
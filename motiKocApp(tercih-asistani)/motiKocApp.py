@@ -1,5 +1,4 @@
 import streamlit as st
-import google.generativeai as genai
 from datetime import datetime, timedelta
 import json
 import pandas as pd
@@ -11,13 +10,17 @@ import sqlite3
 import hashlib
 import numpy as np
 import re
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterator, List, Optional, Tuple, Any
+from contextlib import closing
 import base64
 from io import BytesIO
 import nest_asyncio
 from dotenv import load_dotenv
 import os
 
+from services.llm_gateway import LLMGateway
+from utils.llm_json import JSONRepairError, RepairStats, parse_llm_json
+
 
 # Load environment variables
 load_dotenv()
@@ -570,8 +573,9 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 # Configure with the API key from environment variables
 API_KEY = GEMINI_API_KEY
 
-genai.configure(api_key=API_KEY)
-model = genai.GenerativeModel('gemini-1.5-pro-002')
+# Model istemcisi süreç genelindeki LLM geçidinden alınır (tek yapılandırma,
+# eşzamanlılık sınırı, zaman aşımı ve devre kesici)
+model = LLMGateway.get_instance(api_key=API_KEY).model('gemini-1.5-pro-002')
 
 def get_ai_response(prompt):
     try:
@@ -580,6 +584,16 @@ def get_ai_response(prompt):
     except Exception as e:
         return f"Üzgünüm, bir hata oluştu: {str(e)}"
 
+def get_ai_response_stream(prompt, label='default'):
+    """
+    get_ai_response'un akış sürümü: yanıt parçalarını geldikçe verir.
+    Tüketici akışı erken bırakırsa model yanıtı daha fazla okunmaz.
+    Hatalar yanıt parçası olarak verilmez, çağırana iletilir; böylece hata
+    metni model yanıtı sanılıp konuşma geçmişine yazılmaz.
+    """
+    with closing(model.stream_content(prompt, label=label)) as stream:
+        yield from stream
+
 # Authentication Functions
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
@@ -636,6 +650,12 @@ def register_user(username, password, name, email, grade, city,
     except sqlite3.IntegrityError:
         return None
 
+# LLM yanıtlarının ayrıştırma sayacı (yerel onarımla kurtarılan yanıtlar dahil);
+# sayfa yeniden çalıştırmalarında sıfırlanmaması için süreç genelinde tutulur
+@st.cache_resource
+def get_llm_json_stats():
+    return RepairStats()
+
 # Date Helper Function
 def format_date(date_obj):
     if isinstance(date_obj, (datetime, pd.Timestamp)):
@@ -645,22 +665,12 @@ def format_date(date_obj):
 # Clean and Parse JSON
 def clean_and_parse_json(json_string):
     """
-    Clean and parse AI-generated JSON string with better error handling and string cleaning.
+    Clean and parse AI-generated JSON string. Code fences, surrounding text,
+    trailing commas and single quotes are repaired locally.
     """
     try:
-        # Remove code block markers if present
-        json_string = json_string.strip()
-        if json_string.startswith('```json'):
-            json_string = json_string[7:]
-        if json_string.startswith('```'):
-            json_string = json_string[3:]
-        if json_string.endswith('```'):
-            json_string = json_string[:-3]
-        json_string = json_string.strip()
-        
-        # Try parsing the cleaned JSON string
-        return json.loads(json_string)
-    except json.JSONDecodeError as e:
+        return parse_llm_json(json_string, get_llm_json_stats())
+    except JSONRepairError as e:
         print(f"JSON parse error: {str(e)}")
         print(f"Problematic JSON string: {json_string}")
         return None
@@ -2295,6 +2305,11 @@ class MotiKocChatbot:
             self.context.pop(0)
     
     def generate_response(self, user_message, user_id):
+        """
+        Yanıtı parça parça üretir; `st.write_stream(chatbot.generate_response(...))`
+        ile tokenlar geldikçe gösterilir. Yanıt tamamlanınca konuşma geçmişine
+        eklenir; akış yarıda bırakılırsa (iptal) geçmiş değişmez.
+        """
         # Kullanıcı bilgilerini al
         conn = sqlite3.connect('motikoc.db')
         user_data = pd.read_sql_query('''
@@ -2305,7 +2320,8 @@ class MotiKocChatbot:
         conn.close()
 
         if user_data.empty:
-            return "Kullanıcı bilgileri bulunamadı."
+            yield "Kullanıcı bilgileri bulunamadı."
+            return
 
         user_info = user_data.iloc[0]
         
@@ -2338,14 +2354,19 @@ class MotiKocChatbot:
         
         conversation_prompt += f"\nÖğrenci: {user_message}\n\nYanıtın:"
     
+        chunks = []
         try:
-            response = get_ai_response(conversation_prompt)
-            self.add_message("user", user_message)
-            self.add_message("assistant", response)
-            return response
+            with closing(get_ai_response_stream(conversation_prompt, label='chatbot')) as stream:
+                for chunk in stream:
+                    chunks.append(chunk)
+                    yield chunk
         except Exception as e:
+            # Başarısız yanıt geçmişe eklenmez; sonraki isteklerde modele geri gönderilmez
             print(f"Chatbot hatası: {str(e)}")
-            return "Üzgünüm, bir hata oluştu. Lütfen tekrar dener misin?"
+            yield ("\n\n" if chunks else "") + "Üzgünüm, bir hata oluştu. Lütfen tekrar dener misin?"
+            return
+        self.add_message("user", user_message)
+        self.add_message("assistant", "".join(chunks))
 
 # Study Groups Functions
 def create_study_group():
@@ -3482,7 +3503,6 @@ def add_yks_specific_features():
 
 import pandas as pd
 from typing import Dict, List, Optional, Tuple, Any
-import google.generativeai as genai
 from dataclasses import dataclass ,field
 import re
 from enum import Enum, auto
@@ -3541,8 +3561,7 @@ class UniversityRecommender:
             if api_key is None:
                 raise ValueError("Gemini API key must be provided or set as an environment variable.")
         
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel(model)
+        self.model = LLMGateway.get_instance(api_key=api_key).model(model)
         self.system_prompt = """
     Sen bir üniversite öneri sistemi asistanısın. Kullanıcının verdiği soruyu analiz et ve kullanıcının tercih kriterlerini ayrıştırarak aşağıdaki bilgileri çıkar. 
     Kullanıcının ifadesini en yalın haliyle anla. Örneğin, "yazılımcılık" ifadesi geldiğinde bunu "yazılım mühendisi" olarak algıla.
@@ -3742,12 +3761,14 @@ class UniversityRecommender:
             print(f"Error in applying filters: {e}")
             return df
 
-    def _generate_response(self, filtered_df: pd.DataFrame, question: str) -> str:
-        """Generate a natural language response based on the filtered results."""
-        try:
-            if filtered_df.empty:
-                return "Üzgünüm, arama kriterlerinize uygun bir program bulamadım."
+    def _generate_response(self, filtered_df: pd.DataFrame, question: str) -> Iterator[str]:
+        """Generate a natural language response based on the filtered results, streamed as it arrives."""
+        if filtered_df.empty:
+            yield "Üzgünüm, arama kriterlerinize uygun bir program bulamadım."
+            return
 
+        received = False
+        try:
             results_summary = filtered_df.head(20).to_dict('records')
 
             prompt = f"""
@@ -3766,15 +3787,18 @@ class UniversityRecommender:
             Cevabı doğal ve samimi bir üslupla yaz, ancak kısa ve odaklı tut.
             """
 
-            response = self.model.generate_content(prompt)
-            return response.text
+            # Stream is closed (and stops being read) if the consumer stops early
+            with closing(self.model.stream_content(prompt, label='university_recommender')) as stream:
+                for chunk in stream:
+                    received = True
+                    yield chunk
 
         except Exception as e:
             print(f"Error in generating response: {e}")
-            return "Sonuçları değerlendirirken bir hata oluştu. Lütfen daha sonra tekrar deneyin."
+            yield ("\n\n" if received else "") + "Sonuçları değerlendirirken bir hata oluştu. Lütfen daha sonra tekrar deneyin."
 
-    def process_question(self, question: str, df: pd.DataFrame) -> Tuple[pd.DataFrame, str]:
-        """Process user question and return filtered results with explanation."""
+    def process_question(self, question: str, df: pd.DataFrame) -> Tuple[pd.DataFrame, Iterator[str]]:
+        """Process user question and return filtered results with a lazily generated explanation stream."""
         try:
             intent_data = self._analyze_intent(question)
             criteria = self._create_filter_criteria(intent_data)
@@ -3784,7 +3808,11 @@ class UniversityRecommender:
             
         except Exception as e:
             print(f"Error in processing question: {e}")
-            return df, "İşlem sırasında bir hata oluştu. Lütfen daha sonra tekrar deneyin."
+            return df, _message_stream("İşlem sırasında bir hata oluştu. Lütfen daha sonra tekrar deneyin.")
+
+def _message_stream(message: str) -> Iterator[str]:
+    """Wrap a fixed message as a response stream"""
+    yield message
 
 import streamlit as st
 import pandas as pd
@@ -4047,20 +4075,21 @@ class UniversityRecommenderInterface:
             placeholder="Örnek: İstanbul'da başarı sırası 50000'den iyi olan bilgisayar mühendisliği bölümlerini göster"
         )
 
+        response_stream = None
         if st.button("Ara", type="primary"):
             if not question:
                 st.warning("Lütfen bir soru girin.")
                 return
 
             with st.spinner("Sonuçlar hazırlanıyor..."):
-                filtered_df, response = self.recommender.process_question(question, self.df)
+                filtered_df, response_stream = self.recommender.process_question(question, self.df)
                 
                 # Apply manual filters
                 filtered_df = self._apply_manual_filters(filtered_df, filters)
                 
-                # Store results in session state
+                # Store results in session state; the response is stored once streamed
                 st.session_state.filtered_results = filtered_df
-                st.session_state.current_response = response
+                st.session_state.current_response = None
                 
                 # Add to search history
                 self._add_to_search_history(question, len(filtered_df))
@@ -4069,8 +4098,11 @@ class UniversityRecommenderInterface:
         if st.session_state.filtered_results is not None:
             st.header("🔍 Sonuçlar")
             
-            # Display AI response
-            if st.session_state.current_response:
+            # Display AI response; a new response is rendered as its tokens arrive
+            if response_stream is not None:
+                with st.expander("AI Değerlendirmesi", expanded=True), closing(response_stream):
+                    st.session_state.current_response = st.write_stream(response_stream)
+            elif st.session_state.current_response:
                 with st.expander("AI Değerlendirmesi", expanded=True):
                     st.write(st.session_state.current_response)
             
@@ -4092,7 +4124,6 @@ class UniversityRecommenderInterface:
         """)
 # CareerPathFinder İlgili Kodlar
 import streamlit as st
-import google.generativeai as genai
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -4104,8 +4135,7 @@ import base64
 from io import BytesIO
 
 # Gemini API configuration
-genai.configure(api_key=API_KEY)
-model = genai.GenerativeModel('gemini-1.5-pro-002')
+model = LLMGateway.get_instance(api_key=API_KEY).model('gemini-1.5-pro-002')
 
 # Error handling function
 def handle_llm_error(error, error_type):
@@ -4245,27 +4275,9 @@ SECTIONS = [
 ]
 
 def extract_json_from_response(response_text):
-    """LLM yanıtından JSON formatını çıkarır"""
-    try:
-        return json.loads(response_text)
-    except json.JSONDecodeError:
-        json_pattern = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL)
-        match = json_pattern.search(response_text)
-        if match:
-            try:
-                return json.loads(match.group(1))
-            except json.JSONDecodeError:
-                pass
-        
-        curly_pattern = re.compile(r'\{.*\}', re.DOTALL)
-        match = curly_pattern.search(response_text)
-        if match:
-            try:
-                return json.loads(match.group(0))
-            except json.JSONDecodeError:
-                pass
-        
-        raise ValueError("Geçerli JSON formatı bulunamadı")
+    """LLM yanıtından JSON formatını çıkarır; bozuk JSON yerel olarak onarılır"""
+    # JSONRepairError bir ValueError'dur; çağıranların hata yakalaması değişmez
+    return parse_llm_json(response_text, get_llm_json_stats())
 
 def analyze_responses_with_llm(responses):
     """Gelişmiş LLM analizi"""
@@ -1,28 +1,109 @@
 # services/ai_service.py
 
-import google.generativeai as genai
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterator, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
 from datetime import datetime
 import json
 import logging
 import re
+import threading
 
-from config.settings import GEMINI_API_KEY, GEMINI_MODEL
+from config.settings import GEMINI_MODEL, LLM_FANOUT_WORKERS, LLM_FANOUT_TIMEOUT
+from services.llm_gateway import LLMGateway
+from services.llm_cache import cached_llm_call, make_cache_key
 
 # Logger configuration
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
 class AIService:
+    # Bağımsız çağrıları paralel başlatan paylaşılan havuz ve sürmekte olan çağrılar
+    _executor: Optional[ThreadPoolExecutor] = None
+    _pending: Dict[str, Future] = {}
+    _lock = threading.Lock()
+
     def __init__(self):
-        """Initialize the AI service"""
+        """Initialize the AI service with the shared model client of the LLM gateway"""
         try:
-            genai.configure(api_key=GEMINI_API_KEY)
-            self.model = genai.GenerativeModel(GEMINI_MODEL)
+            self.gateway = LLMGateway.get_instance()
+            self.model_name = GEMINI_MODEL
+            self.model = self.gateway.model(GEMINI_MODEL)
         except Exception as e:
             logger.error(f"Error initializing AI service: {str(e)}")
             raise e
 
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(max_workers=LLM_FANOUT_WORKERS, thread_name_prefix='ai-fanout')
+        return cls._executor
+
+    @classmethod
+    def _forget(cls, key: str, future: Future):
+        with cls._lock:
+            if cls._pending.get(key) is future:
+                del cls._pending[key]
+
+    def submit(self, method: str, *args, cache_scope: Optional[Any] = None, **kwargs) -> Future:
+        """
+        AIService metodunu arka planda başlatır ve beklemeden döner.
+
+        Aynı girdiyle sürmekte olan bir çağrı varsa yenisi açılmaz, onun Future'ı
+        döner; böylece sayfa açılışında önceden başlatılan (prefetch) çağrılar
+        sonraki yeniden çizimlerde tekrar gönderilmez. Çağrı yine geçitten ve
+        önbellekten geçer.
+
+        Args:
+            method (str): Çağrılacak metodun adı (örn. 'get_subject_recommendations').
+            cache_scope (Any, optional): Önbelleğe alınan metotlar için kayıt kapsamı.
+
+        Returns:
+            Future: Metodun sonucunu taşıyan Future.
+        """
+        key = make_cache_key(method, self.model_name, {'args': args, 'kwargs': kwargs, 'scope': cache_scope})
+        if cache_scope is not None:
+            kwargs['cache_scope'] = cache_scope
+        with AIService._lock:
+            future = AIService._pending.get(key)
+            if future is not None:
+                return future
+            future = self._get_executor().submit(getattr(self, method), *args, **kwargs)
+            AIService._pending[key] = future
+        future.add_done_callback(lambda done: AIService._forget(key, done))
+        return future
+
+    @staticmethod
+    def iter_completed(futures: Dict[Any, Future],
+                       timeout: Optional[float] = LLM_FANOUT_TIMEOUT) -> Iterator[Tuple[Any, Any]]:
+        """
+        Çağrıları bittikleri sırayla (ad, sonuç) olarak verir; sayfa her bölümü
+        hazır olur olmaz gösterebilir.
+
+        Hata veren veya `timeout` içinde bitmeyen çağrıların sonucu None olur.
+
+        Args:
+            futures (Dict[Any, Future]): Bölüm adı -> `submit` ile başlatılan çağrı.
+            timeout (float, optional): Tüm çağrılar için toplam bekleme süresi (saniye).
+        """
+        names: Dict[Future, List[Any]] = {}
+        for name, future in futures.items():
+            names.setdefault(future, []).append(name)
+        try:
+            for future in as_completed(names, timeout=timeout):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Paralel AI çağrısı başarısız: {str(e)}")
+                    result = None
+                for name in names.pop(future):
+                    yield name, result
+        except FutureTimeoutError:
+            logger.error(f"{sum(len(n) for n in names.values())} AI çağrısı {timeout:.0f} sn içinde bitmedi")
+            for pending in names.values():
+                for name in pending:
+                    yield name, None
+
+    @cached_llm_call()
     def analyze_performance(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Performans verilerini analiz eder ve değerlendirme sağlar.
@@ -56,6 +137,7 @@ class AIService:
             logger.error(f"Performans analizi yapılırken hata: {str(e)}")
             return None
 
+    @cached_llm_call()
     def get_subject_recommendations(self, subject: str, stats: Dict[str, Any]) -> List[str]:
         """
         Belirli bir ders için AI tabanlı öneriler sağlar.
@@ -160,6 +242,7 @@ class AIService:
                 'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
 
+    @cached_llm_call()
     def explain_solution(self, question: str, subject: str) -> Dict[str, Any]:
         """
         Belirli bir sorunun detaylı çözümünü sağlar.
@@ -0,0 +1,184 @@
+# services/llm_cache.py
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+from config.settings import LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTLS, CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(value: Any) -> Any:
+    """Anahtar için girdiyi kararlı hale getirir: sıralı sözlükler, yuvarlanmış ondalıklar"""
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, float):
+        return round(value, 4)
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def make_cache_key(method: str, model: str, payload: Any) -> str:
+    """Metot, model ve normalize edilmiş girdinin özeti"""
+    normalized = json.dumps(_normalize(payload), ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(f"{method}|{model}|{normalized}".encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    LLM yanıtları için kalıcı SQLite önbelleği.
+
+    Kayıtlar metot, model ve girdi özetiyle anahtarlanır; metot başına TTL ve
+    en fazla kayıt sayısı (en uzun süredir okunmayan silinir) uygulanır.
+    Kullanıcıya özel kayıtlar `scope` ile işaretlenir ve kullanıcının verisi
+    değiştiğinde `invalidate(scope=...)` ile temizlenir.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._write_lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('''CREATE TABLE IF NOT EXISTS llm_responses
+                            (key TEXT PRIMARY KEY,
+                             method TEXT NOT NULL,
+                             scope TEXT,
+                             value TEXT NOT NULL,
+                             created_at REAL NOT NULL,
+                             accessed_at REAL NOT NULL,
+                             expires_at REAL NOT NULL)''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_responses_method ON llm_responses(method, accessed_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_responses_scope ON llm_responses(scope)')
+
+    @classmethod
+    def get_instance(cls) -> 'LLMResponseCache':
+        """Get singleton cache instance"""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = LLMResponseCache()
+        return cls._instance
+
+    @contextmanager
+    def _connect(self):
+        """Kısa ömürlü bağlantı; başarıda commit eder, her durumda kapatır"""
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """(bulundu mu, değer) döndürür; süresi dolmuş kayıtlar bulunmamış sayılır"""
+        now = time.time()
+        try:
+            with self._write_lock, self._connect() as conn:
+                row = conn.execute('SELECT value, expires_at FROM llm_responses WHERE key = ?', (key,)).fetchone()
+                if row is None or row[1] < now:
+                    self._stats['misses'] += 1
+                    return False, None
+                conn.execute('UPDATE llm_responses SET accessed_at = ? WHERE key = ?', (now, key))
+                self._stats['hits'] += 1
+            return True, json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            logger.error(f"LLM önbelleği okunamadı: {e}")
+            return False, None
+
+    def set(self, key: str, method: str, value: Any, ttl: float, scope: Optional[str] = None):
+        now = time.time()
+        try:
+            payload = json.dumps(value, ensure_ascii=False, default=str)
+            with self._write_lock, self._connect() as conn:
+                conn.execute('''INSERT OR REPLACE INTO llm_responses
+                                (key, method, scope, value, created_at, accessed_at, expires_at)
+                                VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                             (key, method, None if scope is None else str(scope), payload, now, now, now + ttl))
+                # Süresi dolanları ve metodun sınırını aşan en eski okunanları sil
+                conn.execute('DELETE FROM llm_responses WHERE expires_at < ?', (now,))
+                conn.execute('''DELETE FROM llm_responses WHERE method = ? AND key NOT IN
+                                (SELECT key FROM llm_responses WHERE method = ?
+                                 ORDER BY accessed_at DESC LIMIT ?)''',
+                             (method, method, self.max_entries))
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.error(f"LLM önbelleğine yazılamadı: {e}")
+
+    def invalidate(self, scope: Optional[Any] = None, method: Optional[str] = None) -> int:
+        """
+        Kayıtları siler.
+
+        Args:
+            scope: Yalnızca bu kapsamdaki (örn. kullanıcı id) kayıtlar.
+            method: Yalnızca bu metodun kayıtları. İkisi de verilmezse tümü silinir.
+
+        Returns:
+            int: Silinen kayıt sayısı.
+        """
+        conditions, params = [], []
+        if scope is not None:
+            conditions.append('scope = ?')
+            params.append(str(scope))
+        if method is not None:
+            conditions.append('method = ?')
+            params.append(method)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        try:
+            with self._write_lock, self._connect() as conn:
+                return conn.execute(f'DELETE FROM llm_responses{where}', tuple(params)).rowcount
+        except sqlite3.Error as e:
+            logger.error(f"LLM önbelleği temizlenemedi: {e}")
+            return 0
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+
+def _is_cacheable(result: Any) -> bool:
+    # Hata sonuçları (None, boş liste, 'error' anahtarlı sözlük) önbelleğe alınmaz
+    if not result:
+        return False
+    return not (isinstance(result, dict) and 'error' in result)
+
+
+def cached_llm_call(method: Optional[str] = None):
+    """
+    AIService metotları için önbellek dekoratörü.
+
+    Anahtar metot adı, `self.model_name` ve argümanlardan üretilir; TTL
+    `LLM_CACHE_TTLS` ayarından gelir. Çağıran `cache_scope=` (örn. kullanıcı id)
+    vererek kaydı kullanıcının verisine bağlayabilir.
+    """
+    def decorator(fn):
+        name = method or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(self, *args, cache_scope: Optional[Any] = None, **kwargs):
+            cache = LLMResponseCache.get_instance()
+            key = make_cache_key(name, getattr(self, 'model_name', ''), {'args': args, 'kwargs': kwargs})
+            hit, value = cache.get(key)
+            if hit:
+                return value
+            result = fn(self, *args, **kwargs)
+            if _is_cacheable(result):
+                cache.set(key, name, result, LLM_CACHE_TTLS.get(name, CACHE_TTL), scope=cache_scope)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,317 @@
+# services/llm_gateway.py
+
+import threading
+import time
+import logging
+from collections import deque
+from typing import Any, Dict, Iterator, Optional
+
+import google.generativeai as genai
+
+from config.settings import (
+    GEMINI_API_KEY,
+    GEMINI_MODEL,
+    REQUEST_TIMEOUT,
+    LLM_MAX_CONCURRENT,
+    LLM_MAX_QUEUE,
+    LLM_QUEUE_TIMEOUT,
+    LLM_CIRCUIT_FAILURE_THRESHOLD,
+    LLM_CIRCUIT_RESET_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+# Gecikme yüzdelikleri için tutulan son çağrı sayısı
+LATENCY_WINDOW = 500
+
+
+def _percentile(values, q: float) -> Optional[float]:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else None
+
+
+class LLMGatewayError(Exception):
+    """LLM geçidi isteği kabul etmedi"""
+    pass
+
+
+class GatewayBusyError(LLMGatewayError):
+    """Kuyruk dolu veya sıra beklerken süre aşıldı"""
+    pass
+
+
+class CircuitOpenError(LLMGatewayError):
+    """Art arda hatalardan sonra devre açık; istekler bir süre gönderilmez"""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Art arda `failure_threshold` hatadan sonra açılır ve `reset_timeout`
+    saniye boyunca istekleri reddeder. Süre dolunca tek bir deneme isteğine
+    izin verir (yarı açık); başarılı olursa kapanır, başarısız olursa yeniden açılır.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            # Yarı açıkken deneme isteği sonuçlanmadan (örn. kuyrukta reddedildi)
+            # süre yeniden dolarsa yeni bir denemeye izin verilir
+            now = time.monotonic()
+            if now - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self.opened_at = now
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning(f"LLM devre kesici açıldı ({self.failures} art arda hata)")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class GatewayModel:
+    """`genai.GenerativeModel` yerine kullanılan, çağrıları geçitten geçiren model vekili"""
+
+    def __init__(self, gateway: 'LLMGateway', model: genai.GenerativeModel):
+        self._gateway = gateway
+        self._model = model
+
+    def generate_content(self, *args, timeout: Optional[float] = None, **kwargs):
+        return self._gateway.call(self._model.generate_content, *args, timeout=timeout, **kwargs)
+
+    def stream_content(self, *args, label: str = 'default', timeout: Optional[float] = None,
+                       **kwargs) -> Iterator[str]:
+        """Yanıtı parça parça metin olarak verir; bkz. `LLMGateway.stream`"""
+        return self._gateway.stream(self._model.generate_content, *args, label=label, timeout=timeout, **kwargs)
+
+
+class LLMGateway:
+    """
+    Süreç genelinde tek LLM geçidi.
+
+    Model istemcilerini bir kez oluşturur, aynı anda çalışan çağrı sayısını
+    sınırlar (fazlası sınırlı bir kuyrukta bekler), her çağrıya zaman aşımı
+    uygular ve art arda hatalarda devre kesiciyi açar. Yoğunlukta istekler
+    uzun süre asılı kalmak yerine hızla `LLMGatewayError` ile reddedilir.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, api_key: Optional[str] = None, max_concurrent: int = LLM_MAX_CONCURRENT,
+                 max_queue: int = LLM_MAX_QUEUE, queue_timeout: float = LLM_QUEUE_TIMEOUT,
+                 request_timeout: float = REQUEST_TIMEOUT):
+        genai.configure(api_key=api_key or GEMINI_API_KEY)
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.request_timeout = request_timeout
+        self.breaker = CircuitBreaker(LLM_CIRCUIT_FAILURE_THRESHOLD, LLM_CIRCUIT_RESET_TIMEOUT)
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._models: Dict[str, GatewayModel] = {}
+        self._state_lock = threading.Lock()
+        self._waiting = 0
+        self._in_flight = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._counts = {'calls': 0, 'failures': 0, 'rejected': 0, 'circuit_rejected': 0}
+        self._streams: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def get_instance(cls, api_key: Optional[str] = None) -> 'LLMGateway':
+        """Get singleton gateway; api_key is only used on first creation"""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = LLMGateway(api_key=api_key)
+        return cls._instance
+
+    def model(self, name: str = GEMINI_MODEL) -> GatewayModel:
+        """Verilen model için paylaşılan istemciyi döndürür"""
+        with self._state_lock:
+            if name not in self._models:
+                self._models[name] = GatewayModel(self, genai.GenerativeModel(name))
+            return self._models[name]
+
+    def _count(self, key: str):
+        with self._state_lock:
+            self._counts[key] += 1
+
+    def _acquire_slot(self):
+        with self._state_lock:
+            if self._waiting >= self.max_queue:
+                self._counts['rejected'] += 1
+                raise GatewayBusyError("LLM kuyruğu dolu, lütfen biraz sonra tekrar deneyin")
+            self._waiting += 1
+        try:
+            acquired = self._slots.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._state_lock:
+                self._waiting -= 1
+        if not acquired:
+            self._count('rejected')
+            raise GatewayBusyError(f"LLM sırası {self.queue_timeout:.0f} sn içinde gelmedi")
+        with self._state_lock:
+            self._in_flight += 1
+
+    def _release_slot(self):
+        with self._state_lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def call(self, fn, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Model çağrısını eşzamanlılık sınırı, zaman aşımı ve devre kesici altında çalıştırır.
+
+        Args:
+            fn: Çağrılacak istemci metodu (örn. `generate_content`).
+            timeout (float, optional): Çağrı zaman aşımı; varsayılan `REQUEST_TIMEOUT`.
+
+        Returns:
+            Any: İstemci yanıtı.
+
+        Raises:
+            CircuitOpenError: Devre açıksa.
+            GatewayBusyError: Kuyruk doluysa veya sıra zamanında gelmezse.
+        """
+        if not self.breaker.allow():
+            self._count('circuit_rejected')
+            raise CircuitOpenError("AI servisi geçici olarak kullanılamıyor, lütfen biraz sonra tekrar deneyin")
+        self._acquire_slot()
+        started = time.perf_counter()
+        try:
+            request_options = dict(kwargs.pop('request_options', None) or {})
+            request_options.setdefault('timeout', timeout or self.request_timeout)
+            response = fn(*args, request_options=request_options, **kwargs)
+        except Exception:
+            self._count('failures')
+            self.breaker.record_failure()
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self._release_slot()
+            with self._state_lock:
+                self._counts['calls'] += 1
+                self._latencies.append(elapsed)
+        self.breaker.record_success()
+        return response
+
+    def _record_stream(self, label: str, ttft: Optional[float], total: float, outcome: str):
+        with self._state_lock:
+            stats = self._streams.setdefault(label, {
+                'count': 0, 'completed': 0, 'cancelled': 0, 'failed': 0,
+                'ttft': deque(maxlen=LATENCY_WINDOW), 'total': deque(maxlen=LATENCY_WINDOW),
+            })
+            stats['count'] += 1
+            stats[outcome] += 1
+            if ttft is not None:
+                stats['ttft'].append(ttft)
+            self._counts['calls'] += 1
+            if outcome == 'completed':
+                stats['total'].append(total)
+                self._latencies.append(total)
+        logger.info(f"LLM akışı [{label}] {outcome}: ilk token "
+                    f"{'-' if ttft is None else f'{ttft:.2f} sn'}, toplam {total:.2f} sn")
+
+    def stream(self, fn, *args, label: str = 'default', timeout: Optional[float] = None,
+               **kwargs) -> Iterator[str]:
+        """
+        Model çağrısını akış modunda (`stream=True`) çalıştırır ve metin parçalarını
+        geldikçe verir. Eşzamanlılık yuvası akış bitene kadar tutulur.
+
+        İlk token süresi (TTFT) ve toplam süre `label` başına kaydedilir. Tüketici
+        akışı erken bırakırsa (üreteç kapatılır, örn. Streamlit yeniden çalıştırması
+        veya kullanıcı isteği durdurduğunda) yanıt daha fazla okunmaz, yuva hemen
+        serbest bırakılır ve çağrı iptal olarak sayılır.
+
+        Args:
+            fn: Çağrılacak istemci metodu (örn. `generate_content`).
+            label (str): Metrikler için akış adı (örn. 'chatbot').
+            timeout (float, optional): Çağrı zaman aşımı; varsayılan `REQUEST_TIMEOUT`.
+
+        Yields:
+            str: Yanıt metni parçaları.
+
+        Raises:
+            CircuitOpenError: Devre açıksa.
+            GatewayBusyError: Kuyruk doluysa veya sıra zamanında gelmezse.
+        """
+        if not self.breaker.allow():
+            self._count('circuit_rejected')
+            raise CircuitOpenError("AI servisi geçici olarak kullanılamıyor, lütfen biraz sonra tekrar deneyin")
+        self._acquire_slot()
+        started = time.perf_counter()
+        ttft = None
+        outcome = 'failed'
+        try:
+            request_options = dict(kwargs.pop('request_options', None) or {})
+            request_options.setdefault('timeout', timeout or self.request_timeout)
+            response = fn(*args, stream=True, request_options=request_options, **kwargs)
+            for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Metin içermeyen parça (örn. yalnızca bitiş nedeni)
+                    continue
+                if not text:
+                    continue
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                yield text
+            outcome = 'completed'
+        except GeneratorExit:
+            outcome = 'cancelled'
+            raise
+        except Exception:
+            self._count('failures')
+            self.breaker.record_failure()
+            raise
+        finally:
+            self._release_slot()
+            self._record_stream(label, ttft, time.perf_counter() - started, outcome)
+            # İptal edilen akış yanıt vermeye başladıysa servis sağlıklı sayılır
+            if outcome == 'completed' or (outcome == 'cancelled' and ttft is not None):
+                self.breaker.record_success()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Kuyruk derinliği, çalışan çağrılar, sayaçlar, gecikme yüzdelikleri, akış süreleri ve devre durumu"""
+        with self._state_lock:
+            latencies = list(self._latencies)
+            metrics = {
+                'queue_depth': self._waiting,
+                'in_flight': self._in_flight,
+                'max_concurrent': self.max_concurrent,
+                **self._counts,
+            }
+            streams = {label: {key: list(value) if isinstance(value, deque) else value
+                               for key, value in stats.items()}
+                       for label, stats in self._streams.items()}
+        for name, q in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99)):
+            metrics[f'latency_{name}'] = _percentile(latencies, q)
+        # Akış başına ilk token ve toplam süre yüzdelikleri
+        metrics['streams'] = {}
+        for label, stats in streams.items():
+            summary = {key: stats[key] for key in ('count', 'completed', 'cancelled', 'failed')}
+            for name, q in (('p50', 0.50), ('p95', 0.95)):
+                summary[f'ttft_{name}'] = _percentile(stats['ttft'], q)
+                summary[f'total_{name}'] = _percentile(stats['total'], q)
+            metrics['streams'][label] = summary
+        metrics['circuit_state'] = self.breaker.state
+        return metrics
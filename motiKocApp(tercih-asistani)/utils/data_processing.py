@@ -1,26 +1,16 @@
 # utils/data_processing.py
 import pandas as pd
-import json
 from typing import Dict, List, Any, Optional, Union
 import re
 from datetime import datetime, timedelta
 
+from .llm_json import JSONRepairError, parse_llm_json
+
 def clean_and_parse_json(json_string: str) -> Optional[Dict[str, Any]]:
-    """Clean and parse AI-generated JSON string with error handling."""
+    """Clean and parse AI-generated JSON string, repairing near-valid output locally."""
     try:
-        # Remove code block markers if present
-        json_string = json_string.strip()
-        if json_string.startswith('```json'):
-            json_string = json_string[7:]
-        if json_string.startswith('```'):
-            json_string = json_string[3:]
-        if json_string.endswith('```'):
-            json_string = json_string[:-3]
-        json_string = json_string.strip()
-        
-        # Try parsing the cleaned JSON string
-        return json.loads(json_string)
-    except json.JSONDecodeError as e:
+        return parse_llm_json(json_string)
+    except JSONRepairError as e:
         print(f"JSON parse error: {str(e)}")
         print(f"Problematic JSON string: {json_string}")
         return None
@@ -0,0 +1,3 @@
+# soru_bankasi/__init__.py
+from .vector_index import VectorIndex, LocalVectorIndex, batched_writes, create_vector_index
+from .partitions import FILTER_FIELDS, MetadataPartitions, vector_metadata
@@ -0,0 +1,169 @@
+# soru_bankasi/checkpoint.py
+
+import json
+import logging
+import os
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_ROWS = 1000
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} JSON'a çevrilemez")
+
+
+def _as_text(value: Any) -> Optional[str]:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    return str(value)
+
+
+class JsonlCheckpoint:
+    """
+    Toplu işlerin sonuçlarını satır satır biriktiren JSONL kontrol noktası.
+
+    Her sonuç tamamlanır tamamlanmaz dosyaya eklenir ve diske yazılır; işlem
+    yarıda kesilirse yeniden başlatıldığında `done_ids` ile işlenmiş satırlar
+    atlanır. Yarım kalmış son satır okunurken yok sayılır.
+    """
+
+    def __init__(self, path: str, key: str = "soru_id"):
+        self.path = path
+        self.key = key
+        self._file = None
+
+    def done_ids(self) -> Set[str]:
+        """Kontrol noktasındaki kayıtların anahtarlarını (str) döndürür."""
+        return {str(record[self.key]) for record in self.iter_records() if self.key in record}
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning(f"'{self.path}' satır {line_number} okunamadı (yarım kayıt), atlanıyor.")
+
+    def append(self, record: Dict[str, Any]) -> None:
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+            # Önceki çalışma yarım bir satır bıraktıysa yeni kayıt ona eklenmesin
+            if self._file.tell() > 0:
+                with open(self.path, "rb") as existing:
+                    existing.seek(-1, os.SEEK_END)
+                    if existing.read(1) != b"\n":
+                        self._file.write("\n")
+        self._file.write(json.dumps(record, ensure_ascii=False, default=_json_default) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "JsonlCheckpoint":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def iter_sorted_records(self, order_key: str) -> Iterator[Dict[str, Any]]:
+        """
+        Kayıtları `order_key` alanına (tamsayı) göre sıralı verir; alanı olmayan
+        kayıtlar sona, dosya sırasıyla eklenir. Bellekte yalnızca kayıt başına
+        (sıra, dosya konumu) tutulur, kayıtlar dosyadan tek tek okunur.
+        """
+        if not os.path.exists(self.path):
+            return
+        entries = []
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line_number, line in enumerate(f, start=1):
+                start, offset = offset, offset + len(line)
+                if not line.strip():
+                    continue
+                try:
+                    order = json.loads(line).get(order_key)
+                except ValueError:
+                    logger.warning(f"'{self.path}' satır {line_number} okunamadı (yarım kayıt), atlanıyor.")
+                    continue
+                entries.append(((0, int(order)) if order is not None else (1, line_number), start))
+            entries.sort()
+            for _, start in entries:
+                f.seek(start)
+                yield json.loads(f.readline())
+
+    def _iter_frames(self, columns: Sequence[str], chunk_rows: int,
+                     order_key: Optional[str] = None) -> Iterator[pd.DataFrame]:
+        batch: List[Dict[str, Any]] = []
+        records = self.iter_sorted_records(order_key) if order_key else self.iter_records()
+        for record in records:
+            batch.append(record)
+            if len(batch) >= chunk_rows:
+                yield pd.DataFrame(batch).reindex(columns=list(columns))
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch).reindex(columns=list(columns))
+
+    def export(self, columns: Sequence[str], csv_path: Optional[str] = None,
+               parquet_path: Optional[str] = None, chunk_rows: int = EXPORT_CHUNK_ROWS,
+               order_key: Optional[str] = None) -> int:
+        """
+        Kontrol noktasını parça parça CSV ve/veya Parquet dosyasına dönüştürür;
+        bellek kullanımı `chunk_rows` ile sınırlıdır. Liste alanları girdi
+        CSV'sindeki gibi "['a', 'b']" metni olarak yazılır.
+
+        Args:
+            columns (Sequence[str]): Çıktı sütunları (eksik alanlar boş kalır).
+            csv_path (str, optional): CSV çıktı yolu.
+            parquet_path (str, optional): Parquet çıktı yolu (pyarrow gerekir).
+            chunk_rows (int): Tek seferde belleğe alınan kayıt sayısı.
+            order_key (str, optional): Verilirse kayıtlar bu alana göre sıralanır
+                (örn. girdi satır sırası); verilmezse dosya sırası korunur.
+
+        Returns:
+            int: Yazılan kayıt sayısı.
+        """
+        writer = None
+        if parquet_path:
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                logger.warning("pyarrow kurulu değil; Parquet çıktısı atlanıyor.")
+                parquet_path = None
+
+        written = 0
+        try:
+            for frame in self._iter_frames(columns, chunk_rows, order_key):
+                # Tüm sütunlar metin olarak yazılır; parçalar arasında şema sabit kalır
+                frame = frame.apply(lambda column: column.map(_as_text))
+                if csv_path:
+                    frame.to_csv(csv_path, mode="w" if written == 0 else "a", header=written == 0, index=False)
+                if parquet_path:
+                    table = pa.Table.from_pandas(frame, schema=pa.schema([(c, pa.string()) for c in columns]),
+                                                 preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(parquet_path, table.schema)
+                    writer.write_table(table)
+                written += len(frame)
+        finally:
+            if writer is not None:
+                writer.close()
+        return written
@@ -0,0 +1,100 @@
+# soru_bankasi/curriculum.py
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+from .keyword_search import BM25Index
+
+logger = logging.getLogger(__name__)
+
+# Numaralı ana başlık ("1. Sayılar ve Cebir:") ve madde ("- Üslü İfadeler: ...") satırları
+_HEADING_RE = re.compile(r"^\s*\d+\.\s*(.+?):?\s*$")
+_ITEM_RE = re.compile(r"^\s*-\s*(.+?)\s*$")
+
+
+@dataclass
+class CurriculumSection:
+    heading: str
+    item: str
+
+    @property
+    def text(self) -> str:
+        return f"{self.heading} {self.item}"
+
+
+def split_curriculum(text: str) -> Tuple[str, List[CurriculumSection]]:
+    """
+    Müfredat metnini başlık satırı ve (ana başlık, madde) bölümlerine ayırır.
+
+    Returns:
+        Tuple[str, List[CurriculumSection]]: (program başlığı, bölümler)
+    """
+    title, heading = "", ""
+    sections: List[CurriculumSection] = []
+    for line in text.strip().splitlines():
+        if not line.strip():
+            continue
+        item = _ITEM_RE.match(line)
+        if item:
+            sections.append(CurriculumSection(heading, item.group(1)))
+            continue
+        match = _HEADING_RE.match(line)
+        if match:
+            heading = match.group(1)
+        elif not title:
+            title = line.strip()
+    return title, sections
+
+
+class CurriculumIndex:
+    """
+    Sınıf müfredatlarının bölümleri üzerinde BM25 araması.
+
+    Prompta tüm müfredat yerine yalnızca sorunun konusuyla eşleşen bölümler
+    eklenir; hiçbir bölüm eşleşmezse müfredatın tamamı döner.
+    """
+
+    def __init__(self, curriculums: Dict[str, str], top_k: int = 3):
+        self.top_k = top_k
+        self._curriculums = curriculums
+        self._titles: Dict[str, str] = {}
+        self._sections: Dict[str, List[CurriculumSection]] = {}
+        self._indexes: Dict[str, BM25Index] = {}
+        for grade, text in curriculums.items():
+            title, sections = split_curriculum(text)
+            self._titles[grade] = title
+            self._sections[grade] = sections
+            self._indexes[grade] = BM25Index([str(i) for i in range(len(sections))],
+                                             [section.text for section in sections])
+
+    def select(self, grade: str, queries: Sequence[str]) -> str:
+        """
+        Sorgulara (her soru için konu/alt konular) en uygun bölümleri müfredat
+        sırasıyla ve ana başlıkları altında döndürür.
+
+        Args:
+            grade (str): Müfredat anahtarı ("9", "10", ...).
+            queries (Sequence[str]): Soru başına arama metni; her biri için en
+                fazla `top_k` bölüm seçilir, sonuçlar birleştirilir.
+
+        Returns:
+            str: Prompta eklenecek müfredat metni.
+        """
+        index = self._indexes[grade]
+        chosen = set()
+        for query in queries:
+            chosen.update(int(vid) for vid, _ in index.search(query, top_k=self.top_k))
+        if not chosen:
+            logger.debug(f"{grade}. sınıf müfredatında eşleşen bölüm yok, tamamı kullanılıyor.")
+            return self._curriculums[grade].strip()
+
+        lines, heading = [self._titles[grade]], None
+        for position in sorted(chosen):
+            section = self._sections[grade][position]
+            if section.heading != heading:
+                heading = section.heading
+                lines.append(f"\n{heading}:")
+            lines.append(f"   - {section.item}")
+        return "\n".join(lines)
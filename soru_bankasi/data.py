@@ -0,0 +1,31 @@
+# soru_bankasi/data.py
+
+import pandas as pd
+
+# Embedding metnini oluşturan alanlar; ek MEB/müfredat alanları daha zengin bağlam sağlar
+TEXT_FIELDS = ["soru_metni", "çözüm", "alt_konular", "konu", "matematik_formulu"]
+CURRICULUM_FIELDS = ["meb_kazanım", "taxonomy", "soru_türü", "difficulty", "sinif", "sik_yapilan_hatalar"]
+
+
+def combine_text(row) -> str:
+    """Bir soru satırının embedding için kullanılan birleşik metnini oluşturur."""
+    parts = []
+    for field in TEXT_FIELDS + CURRICULUM_FIELDS:
+        if pd.notnull(row.get(field)):
+            parts.append(str(row[field]))
+    return " ".join(parts)
+
+
+def load_questions(csv_path: str) -> pd.DataFrame:
+    """
+    Soru CSV'sini okur ve `combined_text` sütununu ekler.
+
+    Args:
+        csv_path (str): Soru CSV dosyasının yolu.
+
+    Returns:
+        pd.DataFrame: Sorular.
+    """
+    df = pd.read_csv(csv_path)
+    df["combined_text"] = df.apply(combine_text, axis=1)
+    return df
@@ -0,0 +1,145 @@
+# soru_bankasi/embedding_cache.py
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    İçerik adresli, SQLite üzerinde kalıcı embedding önbelleği.
+
+    Anahtar sha256(model, boyut, metin) olduğundan aynı metin indeksleme,
+    sorgulama ve zenginleştirme çıktıları arasında tek kez vektörleştirilir.
+    Kayıt sayısı `max_entries` değerini aşınca en uzun süredir kullanılmayan
+    kayıtlar silinir (LRU).
+    """
+
+    def __init__(self, path: str, max_entries: int = 200_000):
+        """
+        Args:
+            path (str): SQLite dosya yolu.
+            max_entries (int): Önbellekte tutulacak en fazla kayıt sayısı.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, dimensions: int, text: str) -> str:
+        payload = f"{model}\x00{dimensions}\x00{text}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def get_many(self, model: str, dimensions: int,
+                 texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Metinlerin önbellekteki vektörlerini döndürür; bulunamayanlar için None.
+        """
+        keys = [self.make_key(model, dimensions, text) for text in texts]
+        found: Dict[str, bytes] = {}
+        with self._lock:
+            # SQLite parametre sınırına takılmamak için parçalı sorgu
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+        return [
+            np.frombuffer(found[key], dtype=np.float32).tolist() if key in found else None
+            for key in keys
+        ]
+
+    def put_many(self, model: str, dimensions: int, texts: Sequence[str],
+                 vectors: Sequence[Sequence[float]]) -> None:
+        """Vektörleri önbelleğe yazar ve gerekirse LRU temizliği yapar."""
+        now = time.time()
+        rows = [
+            (self.make_key(model, dimensions, text), np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)", rows
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+            logger.info(f"Embedding önbelleğinden {overflow} eski kayıt silindi.")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+
+class CachedEmbedder:
+    """
+    Bir embedding fonksiyonunu önbellekle sarar: yalnızca önbellekte olmayan
+    metinler API'ye gönderilir.
+    """
+
+    def __init__(self, embed_fn: Callable[[Sequence[str]], List[List[float]]],
+                 cache: EmbeddingCache, model: str, dimensions: int):
+        self.embed_fn = embed_fn
+        self.cache = cache
+        self.model = model
+        self.dimensions = dimensions
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, texts: Sequence[str]) -> List[List[float]]:
+        vectors = self.cache.get_many(self.model, self.dimensions, texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            fresh = self.embed_fn(missing_texts)
+            self.cache.put_many(self.model, self.dimensions, missing_texts, fresh)
+            for i, vector in zip(missing, fresh):
+                vectors[i] = vector
+        return vectors
@@ -0,0 +1,95 @@
+# soru_bankasi/embedding_providers.py
+
+import logging
+from typing import Any, List, Sequence
+
+from .local_embeddings import HashingEmbedder
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_PROVIDERS = ("openai", "local")
+
+
+class EmbeddingProvider:
+    """
+    Metin listesini embedding listesine çeviren arka uçların ortak arayüzü.
+
+    Sağlayıcılar çağrılabilir nesnelerdir; `CachedEmbedder` ve
+    `iter_embedded_batches` ile doğrudan kullanılabilir. `model` adı
+    önbellek ve manifest anahtarlarına girer, böylece sağlayıcı
+    değiştiğinde eski vektörler yeniden kullanılmaz.
+    """
+
+    model: str = ""
+    dimensions: int = 0
+    # Tek çağrıda gönderilebilecek en fazla metin sayısı
+    max_batch_size: int = 2048
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        raise NotImplementedError
+
+    def __call__(self, texts: Sequence[str]) -> List[List[float]]:
+        return self.embed(texts)
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """OpenAI embedding uç noktası (`embed_batch`, üstel geri çekilmeli tekrar denemeyle)."""
+
+    def __init__(self, model: str = "text-embedding-3-large", dimensions: int = 3072):
+        self.model = model
+        self.dimensions = dimensions
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        # openai paketi yalnızca bu sağlayıcı kullanıldığında gereklidir
+        from .embeddings import embed_batch
+        return embed_batch(texts, model=self.model)
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """
+    Ağ erişimi gerektirmeyen deterministik yerel embedding (`HashingEmbedder`).
+
+    Tüm bankayı saniyeler içinde vektörleştirir; çevrimdışı geliştirme,
+    kıyaslama ve uzak servis hız sınırına takıldığında ucuz bir alternatif
+    olarak kullanılır. Kalitesi anlamsal bir modelin gerisindedir.
+    """
+
+    max_batch_size = 4096
+
+    def __init__(self, dimensions: int = 3072):
+        self._embedder = HashingEmbedder(dimensions)
+        self.model = self._embedder.model
+        self.dimensions = dimensions
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        return self._embedder(texts)
+
+
+def supports_matryoshka(provider: str, model: str) -> bool:
+    """
+    Embedding'in ilk boyutları tek başına anlamlı bir özet mi (Matryoshka eğitimi)?
+    Yalnızca OpenAI text-embedding-3 modellerinde doğrudur; hashing izdüşümünde
+    önek yapısı yoktur ve önekle kaba tarama recall'u düşürür.
+    """
+    return provider == "openai" and model.startswith("text-embedding-3")
+
+
+def create_embedding_provider(provider: str, **options: Any) -> EmbeddingProvider:
+    """
+    Yapılandırmaya göre embedding sağlayıcısını oluşturur.
+
+    Args:
+        provider (str): "openai" veya "local".
+        **options: Sağlayıcıya özel ayarlar (openai: model, dimensions; local: dimensions).
+
+    Returns:
+        EmbeddingProvider: Embedding sağlayıcısı.
+    """
+    if provider == "openai":
+        return OpenAIEmbeddingProvider(
+            model=options.get("model", "text-embedding-3-large"),
+            dimensions=options.get("dimensions", 3072),
+        )
+    if provider == "local":
+        return LocalEmbeddingProvider(dimensions=options.get("dimensions", 3072))
+    raise ValueError(f"Bilinmeyen embedding sağlayıcısı: '{provider}'. Seçenekler: {EMBEDDING_PROVIDERS}")
@@ -0,0 +1,106 @@
+# soru_bankasi/embeddings.py
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+import openai
+
+from .rate_limit import estimate_tokens, get_scheduler
+
+logger = logging.getLogger(__name__)
+
+# OpenAI embedding uç noktası tek istekte en fazla 2048 girdi kabul eder.
+MAX_INPUTS_PER_REQUEST = 2048
+# Hesap sınırlarına göre güncelleyin; embedding çağrıları süreç genelinde bu bütçeyi paylaşır
+EMBEDDING_REQUESTS_PER_MINUTE = 3000
+EMBEDDING_TOKENS_PER_MINUTE = 1_000_000
+
+
+def embed_batch(texts: Sequence[str], model: str, max_retries: int = 5) -> List[List[float]]:
+    """
+    Birden fazla metni tek bir embedding isteğiyle vektörleştirir.
+
+    Args:
+        texts (Sequence[str]): Vektörleştirilecek metinler (en fazla 2048).
+        model (str): Embedding modeli.
+        max_retries (int): Hata durumunda en fazla deneme sayısı.
+
+    Returns:
+        List[List[float]]: Girdi sırasıyla aynı sırada embedding listesi.
+    """
+    if len(texts) > MAX_INPUTS_PER_REQUEST:
+        raise ValueError(f"Tek istekte en fazla {MAX_INPUTS_PER_REQUEST} metin gönderilebilir.")
+
+    # Hız sınırı, retry-after ve geri çekilme paylaşılan zamanlayıcıda yönetilir
+    scheduler = get_scheduler(
+        "openai-embeddings",
+        requests_per_minute=EMBEDDING_REQUESTS_PER_MINUTE,
+        tokens_per_minute=EMBEDDING_TOKENS_PER_MINUTE,
+    )
+    response = scheduler.call(
+        openai.Embedding.create, model=model, input=list(texts),
+        tokens=sum(estimate_tokens(text) for text in texts), max_retries=max_retries,
+    )
+    data = sorted(response["data"], key=lambda item: item["index"])
+    return [item["embedding"] for item in data]
+
+
+def iter_embedded_batches(
+    items: Sequence[Tuple[str, str]],
+    embed_fn: Callable[[Sequence[str]], List[List[float]]],
+    batch_size: int = 256,
+    max_workers: int = 4,
+    on_progress: Optional[Callable[[int, int, float], None]] = None,
+) -> Iterator[Tuple[List[str], Optional[List[List[float]]], Optional[Exception]]]:
+    """
+    (id, metin) çiftlerini toplu isteklerle ve sınırlı sayıda eşzamanlı istekle
+    vektörleştirir. Sonuçlar tamamlandıkça üretilir; böylece çağıran taraf upsert
+    yaparken diğer embedding istekleri arka planda sürer.
+
+    Args:
+        items (Sequence[Tuple[str, str]]): (id, metin) çiftleri.
+        embed_fn (Callable): Metin listesini embedding listesine çeviren fonksiyon.
+        batch_size (int): Tek istekte gönderilecek metin sayısı.
+        max_workers (int): Aynı anda uçuşta olabilecek istek sayısı.
+        on_progress (Callable, optional): (tamamlanan, toplam, geçen_süre) ile çağrılır.
+
+    Yields:
+        Tuple: (id listesi, embedding listesi veya None, hata veya None)
+    """
+    batch_size = max(1, min(batch_size, MAX_INPUTS_PER_REQUEST))
+    batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+    total = len(items)
+    done = 0
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        next_batch = 0
+
+        def fill() -> None:
+            # Uçuştaki istek sayısını max_workers ile sınırla
+            nonlocal next_batch
+            while next_batch < len(batches) and len(pending) < max_workers:
+                batch = batches[next_batch]
+                future = executor.submit(embed_fn, [text for _, text in batch])
+                pending[future] = [item_id for item_id, _ in batch]
+                next_batch += 1
+
+        fill()
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            results = [(pending.pop(future), future) for future in finished]
+            # Sonuçlar tüketilirken havuz boş kalmasın diye önce yeni istekleri gönder
+            fill()
+            for ids, future in results:
+                done += len(ids)
+                error = future.exception()
+                if error is not None:
+                    logger.error(f"{len(ids)} metinlik embedding grubu başarısız: {error}")
+                    yield ids, None, error
+                else:
+                    yield ids, future.result(), None
+                if on_progress:
+                    on_progress(done, total, time.perf_counter() - started)
@@ -0,0 +1,152 @@
+# soru_bankasi/keyword_search.py
+
+import bisect
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Türkçe F5 gövdeleme: eklemeli yapıda kelimenin ilk 5 harfi, hafif bir gövdeleyici
+# kadar isabetli ve çok daha hızlıdır ("üslü", "üslerin" -> "üslü"/"üsler").
+STEM_LENGTH = 5
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+# İçinde işlem işareti geçen ifadeler ((a^b)^c, a^m×a^n ...) formül terimi olarak bütün halinde tutulur
+_FORMULA_RE = re.compile(r"\S*[\^=×*/+√∫]\S*")
+_FORMULA_STRIP = "\"'.,;:!?"
+
+
+def turkish_casefold(text: str) -> str:
+    """Türkçe kurallarına göre küçük harfe çevirir (I -> ı, İ -> i)."""
+    return text.replace("I", "ı").replace("İ", "i").lower()
+
+
+def stem(token: str) -> str:
+    if token.isdigit():
+        return token
+    return token[:STEM_LENGTH]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Metni arama terimlerine ayırır: Türkçe küçük harfe çevrilmiş, gövdelenmiş
+    kelimeler ve "f:" önekli formül terimleri.
+    """
+    text = turkish_casefold(text)
+    terms = [stem(word) for word in _WORD_RE.findall(text)]
+    for formula in _FORMULA_RE.findall(text):
+        formula = formula.strip(_FORMULA_STRIP)
+        if formula:
+            terms.append("f:" + formula)
+    return terms
+
+
+class BM25Index:
+    """
+    Ters indeks üzerinde BM25 skorlaması.
+
+    Her terim için yalnızca o terimi içeren dokümanların listesi tutulur; bir
+    sorgu sadece sorgu terimlerinin listelerini dolaşır, tüm bankayı taramaz.
+    """
+
+    def __init__(self, ids: Sequence[str], texts: Iterable[str], k1: float = 1.5, b: float = 0.75):
+        self.ids = list(ids)
+        self.k1 = k1
+        self.b = b
+
+        postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        lengths = []
+        for doc, text in enumerate(texts):
+            terms = tokenize(text) if isinstance(text, str) else []
+            lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                postings[term].append((doc, tf))
+
+        self.doc_lengths = np.asarray(lengths, dtype=np.float32)
+        self.avg_length = float(self.doc_lengths.mean()) if lengths else 0.0
+        n_docs = len(lengths)
+
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._idf: Dict[str, float] = {}
+        for term, entries in postings.items():
+            docs = np.fromiter((d for d, _ in entries), dtype=np.int32, count=len(entries))
+            tfs = np.fromiter((tf for _, tf in entries), dtype=np.float32, count=len(entries))
+            self._postings[term] = (docs, tfs)
+            df = len(entries)
+            self._idf[term] = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        # Önek araması (yazarken arama) için sıralı sözlük
+        self._vocabulary = sorted(self._postings)
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + "\uffff")
+        return self._vocabulary[start:end]
+
+    def search(self, query: str, top_k: int = 10, prefix_last: bool = False,
+               rows: Optional[np.ndarray] = None) -> List[Tuple[str, float]]:
+        """
+        Sorguya en uygun dokümanları BM25 skoruyla döndürür.
+
+        Args:
+            query (str): Arama metni.
+            top_k (int): Döndürülecek sonuç sayısı.
+            prefix_last (bool): Son kelimeyi önek olarak ara (yazarken arama için).
+            rows (np.ndarray, optional): Yalnızca bu doküman numaraları skorlanır
+                (metadata ön filtresi).
+
+        Returns:
+            List[Tuple[str, float]]: (id, skor) listesi, skora göre azalan.
+        """
+        if not isinstance(query, str) or not query.strip():
+            return []
+        terms = list(dict.fromkeys(tokenize(query)))
+        if prefix_last:
+            words = _WORD_RE.findall(turkish_casefold(query))
+            if words and not query[-1].isspace():
+                last = stem(words[-1])
+                terms = [t for t in terms if t != last] + self._expand_prefix(last)
+
+        doc_parts, score_parts = [], []
+        for term in dict.fromkeys(terms):
+            if term not in self._postings:
+                continue
+            docs, tfs = self._postings[term]
+            if rows is not None:
+                keep = np.isin(docs, rows, assume_unique=True)
+                docs, tfs = docs[keep], tfs[keep]
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[docs] / self.avg_length)
+            doc_parts.append(docs)
+            score_parts.append(self._idf[term] * tfs * (self.k1 + 1) / (tfs + norm))
+        if not doc_parts:
+            return []
+
+        # Yalnızca dokunulan dokümanlar üzerinde toplama
+        docs, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+        k = min(top_k, len(docs))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(self.ids[docs[i]], float(scores[i])) for i in best]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Birden fazla sıralamayı reciprocal-rank fusion ile birleştirir:
+    skor(d) = Σ 1 / (k + sıra(d)).
+
+    Args:
+        rankings (Sequence[Sequence[str]]): Her biri en iyiden kötüye sıralı id listeleri.
+        k (int): Alt sıralardaki sonuçların etkisini yumuşatan sabit.
+
+    Returns:
+        List[Tuple[str, float]]: (id, birleşik skor) listesi, skora göre azalan.
+    """
+    fused: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, vid in enumerate(ranking, start=1):
+            fused[vid] += 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,220 @@
+# soru_bankasi/llm_json.py
+
+import json
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)\s*```", re.DOTALL)
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+class JSONRepairError(ValueError):
+    """Yanıt yerel onarımla da geçerli JSON'a çevrilemedi."""
+
+
+class RepairStats:
+    """
+    Ayrıştırma sonuçlarının sayacı: "clean" (doğrudan geçerli), "repaired"
+    (yerel onarımla kurtarıldı; her biri bir ücretli tekrar isteğinden
+    tasarruftur) ve "failed".
+    """
+
+    def __init__(self):
+        self.counts = {"clean": 0, "repaired": 0, "failed": 0}
+        self._lock = threading.Lock()
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            self.counts[outcome] += 1
+
+    @property
+    def retries_saved(self) -> int:
+        return self.counts["repaired"]
+
+    def summary(self) -> str:
+        with self._lock:
+            counts = dict(self.counts)
+        return (f"{counts['clean']} geçerli, {counts['repaired']} yerel onarıldı "
+                f"({counts['repaired']} ücretli tekrar önlendi), {counts['failed']} başarısız")
+
+
+def _extract_block(text: str) -> str:
+    """Kod bloğunu ve JSON öncesi/sonrası açıklamaları ayıklar; ilk dengeli {...} / [...] bloğunu döndürür."""
+    fence = _FENCE_RE.search(text)
+    if fence:
+        text = fence.group(1)
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        return text.strip()
+    start = min(starts)
+    depth, quote, escaped = 0, None, False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if quote:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    # Kapanmamış blok (kesilmiş yanıt): eldeki kadarı döner, onarım başarısız olabilir
+    return text[start:].strip()
+
+
+def _normalize_tokens(text: str) -> str:
+    """
+    Tek tırnaklı dizgeleri çift tırnağa, Python sabitlerini (True/False/None)
+    JSON karşılıklarına çevirir ve kapanış parantezinden önceki virgülleri siler.
+    Dizgelerin içi (örn. "MEB'in", "a , }") olduğu gibi korunur.
+    """
+    out: List[str] = []
+    i, n = 0, len(text)
+    while i < n:
+        ch = text[i]
+        if ch == '"':
+            j = i + 1
+            while j < n and text[j] != '"':
+                j += 2 if text[j] == "\\" else 1
+            out.append(text[i:j + 1])
+            i = j + 1
+        elif ch == "'":
+            j, chars = i + 1, []
+            while j < n and text[j] != "'":
+                if text[j] == "\\" and j + 1 < n:
+                    chars.append(text[j + 1] if text[j + 1] == "'" else text[j:j + 2])
+                    j += 2
+                    continue
+                chars.append('\\"' if text[j] == '"' else text[j])
+                j += 1
+            out.append('"' + "".join(chars) + '"')
+            i = j + 1
+        elif ch.isalpha():
+            j = i
+            while j < n and (text[j].isalnum() or text[j] == "_"):
+                j += 1
+            word = text[i:j]
+            out.append(_PYTHON_LITERALS.get(word, word))
+            i = j
+        elif ch == ",":
+            j = i + 1
+            while j < n and text[j].isspace():
+                j += 1
+            # Sondaki virgül (dizge dışında, ardından yalnızca boşluk ve } / ])
+            if j >= n or text[j] not in "}]":
+                out.append(ch)
+            i += 1
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out)
+
+
+def repair_json(text: str) -> str:
+    """Sık görülen LLM çıktı bozukluklarını onarır: kod blokları, açıklama metni, akıllı tırnaklar, tek tırnaklar ve sondaki virgüller."""
+    return _normalize_tokens(_extract_block(text.translate(_SMART_QUOTES)))
+
+
+def parse_with_outcome(text: str) -> Tuple[Any, str]:
+    """
+    LLM yanıtını JSON olarak ayrıştırır; geçersizse önce yerel olarak onarır.
+
+    Returns:
+        Tuple[Any, str]: (ayrıştırılmış değer, "clean" veya "repaired")
+
+    Raises:
+        JSONRepairError: Onarımdan sonra da geçerli JSON elde edilemezse.
+    """
+    if not isinstance(text, str):
+        raise JSONRepairError(f"Yanıt metin değil: {type(text).__name__}")
+    try:
+        return json.loads(text), "clean"
+    except json.JSONDecodeError as e:
+        try:
+            value = json.loads(repair_json(text))
+        except json.JSONDecodeError as repair_error:
+            raise JSONRepairError(f"Geçerli JSON formatı bulunamadı: {repair_error}") from e
+        logger.debug(f"Geçersiz JSON yerel olarak onarıldı ({e}).")
+        return value, "repaired"
+
+
+def parse_llm_json(text: str, stats: Optional[RepairStats] = None) -> Any:
+    """
+    `parse_with_outcome` ile ayrıştırır ve sonucu (geçerli, onarıldı, başarısız)
+    isteğe bağlı sayaca kaydeder.
+
+    Raises:
+        JSONRepairError: Onarımdan sonra da geçerli JSON elde edilemezse.
+    """
+    try:
+        value, outcome = parse_with_outcome(text)
+    except JSONRepairError:
+        if stats is not None:
+            stats.record("failed")
+        raise
+    if stats is not None:
+        stats.record(outcome)
+    return value
+
+
+def _coerce_list(value: Any) -> Optional[list]:
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str):
+        stripped = value.strip()
+        if stripped.startswith("["):
+            try:
+                parsed = parse_llm_json(stripped)
+                if isinstance(parsed, list):
+                    return parsed
+            except JSONRepairError:
+                pass
+        return [part.strip() for part in stripped.split(",") if part.strip()]
+    return None
+
+
+def validate_record(record: Any, schema: Dict[str, type],
+                    required: Sequence[str] = ()) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Kaydı beklenen alan tiplerine göre doğrular ve onarılabilir farkları düzeltir
+    (metin olarak gelen listeler, sayı olarak gelen metinler).
+
+    Args:
+        record (Any): Ayrıştırılmış model çıktısı.
+        schema (Dict[str, type]): Alan adı -> beklenen tip (`list` veya `str`).
+        required (Sequence[str]): Bulunması zorunlu alanlar.
+
+    Returns:
+        Tuple[Dict, List[str]]: (düzeltilmiş kayıt, sorun listesi; boşsa geçerli)
+    """
+    if not isinstance(record, dict):
+        return {}, [f"nesne bekleniyordu, {type(record).__name__} geldi"]
+    fixed = dict(record)
+    problems = [f"'{field}' alanı eksik" for field in required if fixed.get(field) in (None, "")]
+    for field, expected in schema.items():
+        value = fixed.get(field)
+        if value is None or isinstance(value, expected):
+            continue
+        if expected is list:
+            coerced = _coerce_list(value)
+        elif expected is str and isinstance(value, (int, float)):
+            coerced = str(value)
+        else:
+            coerced = None
+        if coerced is None:
+            problems.append(f"'{field}' alanı {expected.__name__} olmalı, {type(value).__name__} geldi")
+        else:
+            fixed[field] = coerced
+    return fixed, problems
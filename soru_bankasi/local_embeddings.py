@@ -0,0 +1,130 @@
+# soru_bankasi/local_embeddings.py
+
+import math
+import re
+import threading
+import zlib
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from .keyword_search import turkish_casefold
+
+# Kelime + karakter n-gram özellikleri sabit boyutlu bir vektöre hash'lenir.
+# Her özellik HASH_PROJECTIONS konuma işaretli olarak eklenir (seyrek rastgele izdüşüm).
+NGRAM_SIZES = (3, 4)
+NGRAM_WEIGHT = 0.5
+HASH_PROJECTIONS = 2
+EMBED_BLOCK_ROWS = 4096
+
+_TOKEN_RE = re.compile(r"\w+|[\^=×*/+√∫-]", re.UNICODE)
+# Her projeksiyon için farklı bir tek sayılı çarpan (çarpımsal hash)
+_MULTIPLIERS = np.array([0x9E3779B1, 0x85EBCA77, 0xC2B2AE3D, 0x27D4EB2F], dtype=np.uint64)
+
+
+class HashingEmbedder:
+    """
+    API gerektirmeyen, deterministik yerel embedding.
+
+    Her kelime, kendisi ve karakter n-gram'larının (örn. "<üsl", "slü>")
+    hash'lenmiş işaretli toplamı olarak bir kez vektörleştirilir; metnin
+    vektörü kelime vektörlerinin alt-doğrusal TF ağırlıklı toplamıdır.
+    Aynı metin her zaman aynı vektörü verir; kelime biçim farklılıkları
+    ("üslü", "üslerin") ortak n-gram'lar sayesinde yakın kalır.
+    """
+
+    def __init__(self, dimensions: int = 256):
+        if dimensions > 1 << 16:
+            raise ValueError("HashingEmbedder en fazla 65536 boyut destekler.")
+        self.dimensions = dimensions
+        # Görülen her kelimenin vektörü bir kez hesaplanır ve bu matriste satır olarak tutulur
+        self._word_rows: Dict[str, int] = {}
+        self._word_matrix = np.zeros((1024, dimensions), dtype=np.float32)
+        self._lock = threading.Lock()
+
+    @property
+    def model(self) -> str:
+        """Önbellek anahtarlarında kullanılan, yapılandırmayı içeren model adı."""
+        return f"local-hashing-ng{''.join(map(str, NGRAM_SIZES))}-p{HASH_PROJECTIONS}"
+
+    def _features(self, word: str) -> List[str]:
+        padded = f"<{word}>"
+        grams = [padded[i:i + n] for n in NGRAM_SIZES for i in range(len(padded) - n + 1)]
+        return ["w:" + word] + grams
+
+    def _word_vector(self, word: str) -> np.ndarray:
+        features = self._features(word)
+        weights = np.full(len(features), NGRAM_WEIGHT / max(1, len(features) - 1), dtype=np.float32)
+        weights[0] = 1.0
+
+        hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in features),
+                             dtype=np.uint64, count=len(features))
+        mixed = (hashes[:, None] * _MULTIPLIERS[None, :HASH_PROJECTIONS]) & np.uint64(0xFFFFFFFF)
+        positions = (mixed >> np.uint64(16)) % np.uint64(self.dimensions)
+        signs = np.where(mixed & np.uint64(1), 1.0, -1.0).astype(np.float32)
+
+        vector = np.bincount(
+            positions.ravel().astype(np.int64),
+            weights=(signs * weights[:, None]).ravel(),
+            minlength=self.dimensions,
+        )
+        return vector
+
+    def _word_row(self, word: str) -> int:
+        row = self._word_rows.get(word)
+        if row is None:
+            row = len(self._word_rows)
+            if row == self._word_matrix.shape[0]:
+                grown = np.zeros((2 * row, self.dimensions), dtype=np.float32)
+                grown[:row] = self._word_matrix
+                self._word_matrix = grown
+            self._word_matrix[row] = self._word_vector(word)
+            self._word_rows[word] = row
+        return row
+
+    def _embed_block(self, texts: Sequence[str]) -> np.ndarray:
+        # Metin başına (kelime, ağırlık) çiftleri toplanır; kelime vektörleri tek
+        # seferde toplanıp satır gruplarına göre reduceat ile özetlenir.
+        owners, word_rows, weights = [], [], []
+        for row, text in enumerate(texts):
+            if not isinstance(text, str):
+                continue
+            counts: Dict[str, int] = {}
+            for token in _TOKEN_RE.findall(turkish_casefold(text)):
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                owners.append(row)
+                word_rows.append(self._word_row(token))
+                weights.append(1.0 + math.log(count))
+
+        block = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        if word_rows:
+            vectors = self._word_matrix[np.asarray(word_rows, dtype=np.int64)]
+            vectors *= np.asarray(weights, dtype=np.float32)[:, None]
+            owners = np.asarray(owners, dtype=np.int64)
+            starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+            block[owners[starts]] = np.add.reduceat(vectors, starts, axis=0)
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return block / norms
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Metinleri birim uzunlukta vektörlere çevirir.
+
+        Args:
+            texts (Sequence[str]): Vektörleştirilecek metinler.
+
+        Returns:
+            np.ndarray: (metin sayısı, dimensions) float32 matris.
+        """
+        out = np.empty((len(texts), self.dimensions), dtype=np.float32)
+        # Kelime matrisi büyürken eşzamanlı çağrılar birbirini bozmasın
+        with self._lock:
+            for start in range(0, len(texts), EMBED_BLOCK_ROWS):
+                out[start:start + EMBED_BLOCK_ROWS] = self._embed_block(texts[start:start + EMBED_BLOCK_ROWS])
+        return out
+
+    def __call__(self, texts: Sequence[str]) -> List[List[float]]:
+        """`embed_batch` ile aynı biçimde (liste listesi) döndürür."""
+        return self.embed(texts).tolist()
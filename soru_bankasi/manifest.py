@@ -0,0 +1,112 @@
+# soru_bankasi/manifest.py
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def row_ids(df: pd.DataFrame) -> pd.Series:
+    """
+    Vektör id'lerini döndürür. `soru_id` satır silindiğinde kaymadığı için
+    tercih edilir; yoksa DataFrame index'i kullanılır.
+    """
+    if "soru_id" in df.columns:
+        return df["soru_id"].astype(str)
+    return pd.Series(df.index.astype(str), index=df.index)
+
+
+def row_fingerprints(df: pd.DataFrame) -> Dict[str, str]:
+    """
+    Her satırın içerik özetini (id -> hash) vektörel olarak hesaplar.
+    Satırdaki herhangi bir alan değişirse hash de değişir.
+    """
+    hashes = pd.util.hash_pandas_object(df.astype(str), index=False)
+    return dict(zip(row_ids(df), (format(h, "016x") for h in hashes)))
+
+
+@dataclass
+class ManifestDiff:
+    changed: List[str] = field(default_factory=list)   # yeni veya içeriği değişmiş id'ler
+    removed: List[str] = field(default_factory=list)   # CSV'den silinmiş id'ler
+    unchanged: int = 0
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.changed and not self.removed
+
+
+class IndexManifest:
+    """
+    İndekse yazılmış her satırın içerik hash'ini tutan manifest dosyası.
+
+    Başlangıçta CSV bu manifest ile karşılaştırılır; yalnızca değişen satırlar
+    yeniden embed edilip upsert edilir, silinen satırların vektörleri kaldırılır.
+    Embedding modeli, boyutu veya vektörlerle saklanan metadata alanları
+    değişirse manifest geçersiz sayılır: tüm satırlar yeniden indekslenir, ancak
+    indekste bulunan id'ler unutulmaz; bankadan silinmiş olanlar yine kaldırılır.
+    """
+
+    # Hash'i bilinmeyen (yeniden indekslenmesi gereken) ama indekste bulunan satır
+    STALE = ""
+
+    def __init__(self, path: str, model: str, dimensions: int, metadata_fields: Sequence[str] = ()):
+        self.path = path
+        self.model = model
+        self.dimensions = dimensions
+        self.metadata_fields = list(metadata_fields)
+        self.entries: Dict[str, str] = {}
+
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if (data.get("model") == model and data.get("dimensions") == dimensions
+                        and data.get("metadata_fields", []) == self.metadata_fields):
+                    self.entries = data.get("entries", {})
+                else:
+                    # id'ler korunur ki diff bankadan silinen satırları raporlayabilsin
+                    logger.info("Embedding ayarları değişmiş, manifest sıfırlanıyor.")
+                    self.entries = dict.fromkeys(data.get("entries", {}), self.STALE)
+            except (OSError, ValueError) as e:
+                logger.error(f"Manifest okunamadı, tam indeksleme yapılacak: {e}")
+
+    @property
+    def exists(self) -> bool:
+        return bool(self.entries)
+
+    def diff(self, fingerprints: Dict[str, str]) -> ManifestDiff:
+        """Güncel satır hash'lerini manifest ile karşılaştırır."""
+        result = ManifestDiff()
+        for vid, digest in fingerprints.items():
+            if self.entries.get(vid) == digest:
+                result.unchanged += 1
+            else:
+                result.changed.append(vid)
+        result.removed = [vid for vid in self.entries if vid not in fingerprints]
+        return result
+
+    def mark_indexed(self, fingerprints: Dict[str, str]) -> None:
+        self.entries.update(fingerprints)
+
+    def mark_removed(self, ids: List[str]) -> None:
+        for vid in ids:
+            self.entries.pop(vid, None)
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"model": self.model, "dimensions": self.dimensions,
+                 "metadata_fields": self.metadata_fields, "entries": self.entries},
+                f, ensure_ascii=False
+            )
+        os.replace(tmp_path, self.path)
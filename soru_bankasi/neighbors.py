@@ -0,0 +1,173 @@
+# soru_bankasi/neighbors.py
+
+import argparse
+import hashlib
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Uygulamanın komşu başına istediği aday sayısı (benzer_sorulari_getir.HYBRID_CANDIDATES)
+DEFAULT_NEIGHBORS = 20
+
+
+def bank_signature(fingerprints: Dict[str, str], provider: str, model: str, dimensions: int) -> str:
+    """
+    Soru bankasının tamamını ve embedding uzayını temsil eden özet; herhangi bir
+    satır ya da sağlayıcı, model veya boyut değişirse değişir. Böylece başka bir
+    embedding uzayında üretilmiş komşu tablosu canlı aramayla karıştırılmaz.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{provider}|{model}|{dimensions};".encode("utf-8"))
+    for vid in sorted(fingerprints):
+        digest.update(f"{vid}:{fingerprints[vid]};".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class NeighborTable:
+    """
+    Bankadaki her soru için önceden hesaplanmış en yakın `k` komşu tablosu.
+
+    Komşular satır numarası (int32) ve skor (float16) olarak saklanır; bir
+    sorunun önerileri sözlük araması + tek satır okuması ile döner.
+    """
+
+    def __init__(self, ids: np.ndarray, neighbors: np.ndarray, scores: np.ndarray, signature: str):
+        self.ids = ids
+        self.neighbors = neighbors
+        self.scores = scores
+        self.signature = signature
+        self._id_to_row = {vid: row for row, vid in enumerate(ids.tolist())}
+
+    @property
+    def k(self) -> int:
+        return self.neighbors.shape[1]
+
+    def __contains__(self, vid: str) -> bool:
+        return vid in self._id_to_row
+
+    def covers(self, top_k: int) -> bool:
+        """Tablo `top_k` komşuyu eksiksiz verebilir mi (küçük bankada tüm sorular yeterlidir)?"""
+        return self.k >= min(top_k, len(self.ids) - 1)
+
+    def lookup(self, vid: str, top_k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Verilen sorunun komşularını (id, skor) listesi olarak döndürür."""
+        row = self._id_to_row.get(vid)
+        if row is None:
+            return []
+        top_k = self.k if top_k is None else min(top_k, self.k)
+        return [
+            (str(self.ids[n]), float(score))
+            for n, score in zip(self.neighbors[row, :top_k], self.scores[row, :top_k])
+        ]
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(
+            tmp_path, ids=self.ids, neighbors=self.neighbors,
+            scores=self.scores, signature=np.array(self.signature)
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "NeighborTable":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["ids"], data["neighbors"], data["scores"], str(data["signature"]))
+
+
+def compute_neighbor_table(ids: List[str], vectors: np.ndarray, k: int = DEFAULT_NEIGHBORS,
+                           block_size: int = 256, signature: str = "") -> NeighborTable:
+    """
+    Tüm sorular için en yakın `k` komşuyu blok blok matris çarpımıyla hesaplar.
+
+    Her adımda `block_size` satırlık bir blok tüm bankayla çarpılır; bellek
+    kullanımı block_size x n ile sınırlı kalır. Soru kendi komşusu sayılmaz.
+
+    Args:
+        ids (List[str]): Vektör id'leri.
+        vectors (np.ndarray): (n, d) embedding matrisi.
+        k (int): Saklanacak komşu sayısı.
+        block_size (int): Tek çarpımda işlenecek satır sayısı.
+        signature (str): Tablonun üretildiği banka özeti.
+
+    Returns:
+        NeighborTable: Komşu tablosu.
+    """
+    n = len(ids)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    vectors = vectors / norms
+
+    k = max(0, min(k, n - 1))
+    neighbors = np.zeros((n, k), dtype=np.int32)
+    scores = np.zeros((n, k), dtype=np.float16)
+
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        block_scores = vectors[start:stop] @ vectors.T
+        # Sorunun kendisini dışarıda bırak
+        block_scores[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+        if k == 0:
+            continue
+        top = np.argpartition(-block_scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(block_scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        neighbors[start:stop] = np.take_along_axis(top, order, axis=1)
+        scores[start:stop] = np.take_along_axis(top_scores, order, axis=1)
+
+    return NeighborTable(np.asarray(ids, dtype=str), neighbors, scores, signature)
+
+
+def main() -> None:
+    """
+    Komşu tablosunu çevrimdışı üretir. Embedding'ler önbellekten okunur;
+    indeksleme sonrası çalıştırıldığında API çağrısı yapılmaz.
+    """
+    from .data import load_questions
+    from .embedding_cache import CachedEmbedder, EmbeddingCache
+    from .embedding_providers import EMBEDDING_PROVIDERS, create_embedding_provider
+    from .manifest import row_fingerprints, row_ids
+
+    parser = argparse.ArgumentParser(description="Soru bankası için komşu tablosu üretir.")
+    parser.add_argument("--csv", default="sorular_cozumleri_featureslerle.csv")
+    parser.add_argument("--output", default="cache/neighbors.npz")
+    parser.add_argument("--cache", default="cache/embeddings.sqlite")
+    parser.add_argument("--provider", default="openai", choices=EMBEDDING_PROVIDERS)
+    parser.add_argument("--model", default="text-embedding-3-large")
+    parser.add_argument("--dimensions", type=int, default=3072)
+    parser.add_argument("--k", type=int, default=DEFAULT_NEIGHBORS,
+                        help="Soru başına saklanacak komşu (uygulamanın istediği aday sayısından az olmamalı)")
+    parser.add_argument("--block-size", type=int, default=256)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    df = load_questions(args.csv)
+    provider = create_embedding_provider(args.provider, model=args.model, dimensions=args.dimensions)
+    embedder = CachedEmbedder(
+        provider, EmbeddingCache(args.cache), model=provider.model, dimensions=provider.dimensions
+    )
+    texts = df["combined_text"].tolist()
+    vectors = []
+    for start in range(0, len(texts), provider.max_batch_size):
+        vectors.extend(embedder(texts[start:start + provider.max_batch_size]))
+    vectors = np.asarray(vectors, dtype=np.float32)
+    logger.info(f"{len(df)} embedding okundu ({embedder.misses} tanesi sağlayıcıdan üretildi).")
+
+    table = compute_neighbor_table(
+        row_ids(df).tolist(), vectors, k=args.k, block_size=args.block_size,
+        signature=bank_signature(row_fingerprints(df), args.provider, provider.model, provider.dimensions)
+    )
+    table.save(args.output)
+    logger.info(f"Komşu tablosu '{args.output}' dosyasına kaydedildi.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# soru_bankasi/partitions.py
+
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Öneri aramasında ön filtre olarak kullanılabilen metadata alanları
+FILTER_FIELDS = ("sinif", "konu", "difficulty", "soru_türü")
+
+
+def vector_metadata(record: Dict[str, Any], fields: Sequence[str] = FILTER_FIELDS) -> Dict[str, Any]:
+    """
+    Bir soru satırından vektörle birlikte saklanacak metadata'yı seçer: yalnızca
+    filtrelenebilir alanlar. Soru metni, çözüm gibi gösterim alanları indekse
+    yazılmaz; sonuçlar id ile yerel soru deposundan doldurulur. Boş değerler
+    atlanır (Pinecone null metadata kabul etmez).
+    """
+    return {field: record[field] for field in fields if field in record and pd.notnull(record[field])}
+
+
+class MetadataPartitions:
+    """
+    Filtrelenebilir her alan/değer çifti için o değere sahip satır numaralarını
+    tutar. Filtreli bir sorgu yalnızca bu satırları tarar; ilk k sonucu alıp
+    sonradan elemek yerine aramadan önce bankayı daraltır.
+
+    Filtre sözdizimi Pinecone ile uyumludur:
+        {"sinif": "9. sınıf", "konu": {"$in": ["Üslü İfadeler", "Köklü İfadeler"]}}
+    Birden fazla alan VE ile birleştirilir.
+    """
+
+    def __init__(self, records: Sequence[Dict[str, Any]], fields: Sequence[str] = FILTER_FIELDS):
+        """
+        Args:
+            records (Sequence[Dict[str, Any]]): Satır sırasıyla metadata sözlükleri.
+            fields (Sequence[str]): Bölümlenecek alanlar.
+        """
+        self.fields = tuple(fields)
+        self.size = len(records)
+        rows: Dict[str, Dict[Any, List[int]]] = {field: defaultdict(list) for field in self.fields}
+        for row, record in enumerate(records):
+            for field in self.fields:
+                value = record.get(field)
+                if value is not None:
+                    rows[field][value].append(row)
+        self._rows = {
+            field: {value: np.asarray(indices, dtype=np.int64) for value, indices in values.items()}
+            for field, values in rows.items()
+        }
+
+    def values(self, field: str) -> List[Any]:
+        """Bir alanda görülen farklı değerleri döndürür."""
+        return sorted(self._rows.get(field, {}), key=str)
+
+    def _field_rows(self, field: str, condition: Any) -> np.ndarray:
+        if field not in self._rows:
+            raise ValueError(f"'{field}' alanı filtrelenemez. Desteklenen alanlar: {self.fields}")
+        partition = self._rows[field]
+        empty = np.empty(0, dtype=np.int64)
+
+        if isinstance(condition, dict):
+            if "$eq" in condition:
+                return partition.get(condition["$eq"], empty)
+            if "$in" in condition:
+                parts = [partition[value] for value in condition["$in"] if value in partition]
+                return np.unique(np.concatenate(parts)) if parts else empty
+            raise ValueError(f"Desteklenmeyen filtre operatörü: {list(condition)}")
+        return partition.get(condition, empty)
+
+    def select(self, filter: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """
+        Filtreye uyan satır numaralarını sıralı olarak döndürür.
+        Filtre yoksa None döner (tüm banka).
+        """
+        if not filter:
+            return None
+        selected = None
+        for field, condition in filter.items():
+            rows = self._field_rows(field, condition)
+            selected = rows if selected is None else np.intersect1d(selected, rows, assume_unique=True)
+            if selected.size == 0:
+                break
+        return selected
@@ -0,0 +1,91 @@
+# soru_bankasi/pipeline.py
+
+import logging
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import wait
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Başı bekleyen sonuçlar varken havuz boş kalmasın diye uçuştaki sınırın bu katı kadar iş kuyruğa alınır
+QUEUE_FACTOR = 2
+_POLL_SECONDS = 0.05
+
+
+def _await(future: Future, box: Dict[str, float], timeout: Optional[float]) -> Any:
+    """İşin sonucunu bekler; süre, iş kuyruktan çıkıp çalışmaya başladığı andan ölçülür."""
+    if timeout is None:
+        return future.result()
+    while True:
+        done, _ = wait([future], timeout=_POLL_SECONDS)
+        if done:
+            return future.result()
+        started = box.get("started")
+        if started is not None and time.monotonic() - started > timeout:
+            future.cancel()
+            raise FutureTimeoutError(f"{timeout:.0f} sn içinde tamamlanmadı")
+
+
+def run_ordered(
+    items: Iterable[T],
+    fn: Callable[[T], R],
+    max_in_flight: int = 8,
+    timeout: Optional[float] = None,
+) -> Iterator[Tuple[T, Optional[R], Optional[Exception]]]:
+    """
+    `fn` fonksiyonunu öğelere sınırlı eşzamanlılıkla uygular, sonuçları girdi
+    sırasıyla üretir.
+
+    Girdi tembel okunur (uçuşta en fazla `max_in_flight * QUEUE_FACTOR` öğe);
+    bir öğenin hatası veya zaman aşımı yalnızca o öğeyi etkiler.
+
+    Args:
+        items (Iterable): İşlenecek öğeler.
+        fn (Callable): Tek öğeyi işleyen fonksiyon.
+        max_in_flight (int): Aynı anda çalışan en fazla iş.
+        timeout (float, optional): Öğe başına en fazla süre (saniye). Süresi dolan
+            iş beklenmez; arka plandaki çağrı kendi istek zaman aşımıyla sonlanır.
+
+    Yields:
+        Tuple: (öğe, sonuç veya None, hata veya None)
+    """
+    source = iter(items)
+    window: deque = deque()
+    executor = ThreadPoolExecutor(max_workers=max_in_flight)
+
+    def submit_next() -> bool:
+        try:
+            item = next(source)
+        except StopIteration:
+            return False
+        box: Dict[str, float] = {}
+
+        def task() -> R:
+            box["started"] = time.monotonic()
+            return fn(item)
+
+        window.append((item, executor.submit(task), box))
+        return True
+
+    try:
+        while len(window) < max_in_flight * QUEUE_FACTOR and submit_next():
+            pass
+        while window:
+            item, future, box = window.popleft()
+            try:
+                result = _await(future, box, timeout)
+                outcome = (item, result, None)
+            except Exception as e:
+                outcome = (item, None, e)
+            # Sonuç tüketilirken havuz boş kalmasın diye önce yeni iş gönderilir
+            submit_next()
+            yield outcome
+    finally:
+        # Zaman aşımına uğrayan işler beklenmeden bırakılır
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,312 @@
+# soru_bankasi/quantization.py
+
+import logging
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Sıkıştırılmış kodlar bu büyüklükte bloklar halinde float32'ye açılır;
+# böylece 1M satırlık bankada bile geçici bellek sınırlı kalır.
+SCORE_BLOCK_ROWS = 65536
+
+
+class VectorCodec:
+    """
+    Embedding'leri bellekte sıkıştırılmış tutan kodlayıcıların ortak arayüzü.
+    `scores` kodlar üzerinden yaklaşık iç çarpımı hesaplar; kesin sıralama için
+    en iyi adaylar tam hassasiyetli vektörlerle yeniden skorlanır.
+    """
+
+    name = ""
+
+    def train(self, vectors: np.ndarray) -> None:
+        """Kodlayıcı parametrelerini örnek vektörlerden öğrenir."""
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Vektörleri bloklar halinde kodlar; memmap girdiler belleğe tamamen alınmaz."""
+        codes = None
+        for start in range(0, vectors.shape[0], SCORE_BLOCK_ROWS):
+            block = self._encode_block(np.asarray(vectors[start:start + SCORE_BLOCK_ROWS], dtype=np.float32))
+            if codes is None:
+                codes = np.empty((vectors.shape[0],) + block.shape[1:], dtype=block.dtype)
+            codes[start:start + block.shape[0]] = block
+        if codes is None:
+            codes = self._encode_block(np.zeros((0, vectors.shape[1]), dtype=np.float32))
+        return codes
+
+    def _encode_block(self, block: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        return {}
+
+    def set_state(self, state: Dict[str, np.ndarray]) -> None:
+        """Kaydedilmiş parametreleri yükler."""
+
+    @staticmethod
+    def bytes_per_vector(codes: np.ndarray) -> int:
+        return codes.itemsize * (codes.shape[1] if codes.ndim > 1 else 1)
+
+
+class Float16Codec(VectorCodec):
+    """Yarı hassasiyet: vektör başına 2 bayt/boyut, kayıp ihmal edilebilir."""
+
+    name = "float16"
+
+    def _encode_block(self, block: np.ndarray) -> np.ndarray:
+        return block.astype(np.float16)
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        out = np.empty(codes.shape[0], dtype=np.float32)
+        for start in range(0, codes.shape[0], SCORE_BLOCK_ROWS):
+            block = codes[start:start + SCORE_BLOCK_ROWS].astype(np.float32)
+            out[start:start + block.shape[0]] = block @ query
+        return out
+
+
+class Int8Codec(VectorCodec):
+    """
+    Boyut başına simetrik skaler nicemleme: x ≈ kod * ölçek, kod ∈ [-127, 127].
+    Vektör başına 1 bayt/boyut.
+    """
+
+    name = "int8"
+
+    def __init__(self):
+        self.scale: Optional[np.ndarray] = None
+
+    def train(self, vectors: np.ndarray) -> None:
+        max_abs = np.zeros(vectors.shape[1], dtype=np.float32)
+        for start in range(0, vectors.shape[0], SCORE_BLOCK_ROWS):
+            block = np.asarray(vectors[start:start + SCORE_BLOCK_ROWS], dtype=np.float32)
+            np.maximum(max_abs, np.abs(block).max(axis=0), out=max_abs)
+        scale = max_abs / 127.0
+        scale[scale == 0] = 1.0
+        self.scale = scale
+
+    def _encode_block(self, block: np.ndarray) -> np.ndarray:
+        return np.clip(np.rint(block / self.scale), -127, 127).astype(np.int8)
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        # (kod * ölçek) · q = kod · (q * ölçek)
+        scaled_query = query * self.scale
+        out = np.empty(codes.shape[0], dtype=np.float32)
+        for start in range(0, codes.shape[0], SCORE_BLOCK_ROWS):
+            block = codes[start:start + SCORE_BLOCK_ROWS].astype(np.float32)
+            out[start:start + block.shape[0]] = block @ scaled_query
+        return out
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        return {"scale": self.scale}
+
+    def set_state(self, state: Dict[str, np.ndarray]) -> None:
+        self.scale = state["scale"]
+
+
+class ProductQuantizer(VectorCodec):
+    """
+    Ürün nicemleme (PQ): vektör `m` alt uzaya bölünür, her alt uzay 256
+    merkezli k-means ile tek bayta kodlanır. 3072 boyut için m=96 seçilirse
+    vektör başına 96 bayt tutulur (float32'ye göre 128 kat küçük). Sorgu
+    skorları alt uzay başına önceden hesaplanan tablolardan toplanır.
+    """
+
+    name = "pq"
+
+    def __init__(self, m: int = 96, n_centroids: int = 256, iterations: int = 12,
+                 sample_size: int = 20000, seed: int = 0):
+        self.m = m
+        self.n_centroids = n_centroids
+        self.iterations = iterations
+        self.sample_size = sample_size
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None   # (m, n_centroids, d_sub)
+
+    def _split(self, vectors: np.ndarray) -> np.ndarray:
+        n, d = vectors.shape
+        if d % self.m:
+            raise ValueError(f"Boyut ({d}) alt uzay sayısına ({self.m}) tam bölünmeli.")
+        return vectors.reshape(n, self.m, d // self.m)
+
+    def train(self, vectors: np.ndarray) -> None:
+        rng = np.random.default_rng(self.seed)
+        if vectors.shape[0] > self.sample_size:
+            vectors = vectors[np.sort(rng.choice(vectors.shape[0], self.sample_size, replace=False))]
+        vectors = np.asarray(vectors, dtype=np.float32)
+        sub_vectors = self._split(vectors)
+        n = sub_vectors.shape[0]
+        k = min(self.n_centroids, n)
+
+        centroids = np.zeros((self.m, self.n_centroids, sub_vectors.shape[2]), dtype=np.float32)
+        for j in range(self.m):
+            x = sub_vectors[:, j, :]
+            c = x[rng.choice(n, k, replace=False)].copy()
+            for _ in range(self.iterations):
+                assign = self._nearest(x, c)
+                counts = np.bincount(assign, minlength=k)
+                sums = np.zeros_like(c)
+                np.add.at(sums, assign, x)
+                filled = counts > 0
+                # Boş kalan merkezler önceki konumunda bırakılır
+                c[filled] = sums[filled] / counts[filled, None]
+            centroids[j, :k] = c
+            # Küçük bankalarda kullanılmayan merkezler ilk merkezin kopyası olur; argmin hep ilkini seçer
+            centroids[j, k:] = c[0]
+        self.centroids = centroids
+
+    @staticmethod
+    def _nearest(x: np.ndarray, c: np.ndarray) -> np.ndarray:
+        distances = (c ** 2).sum(axis=1)[None, :] - 2 * x @ c.T
+        return distances.argmin(axis=1)
+
+    def _encode_block(self, block: np.ndarray) -> np.ndarray:
+        sub_vectors = self._split(block)
+        codes = np.empty((block.shape[0], self.m), dtype=np.uint8)
+        for j in range(self.m):
+            codes[:, j] = self._nearest(sub_vectors[:, j, :], self.centroids[j])
+        return codes
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        # Alt uzay başına sorgu ile tüm merkezlerin iç çarpım tablosu: (m, n_centroids)
+        lookup = np.einsum("mkd,md->mk", self.centroids, query.reshape(self.m, -1))
+        subspaces = np.arange(self.m)
+        out = np.empty(codes.shape[0], dtype=np.float32)
+        for start in range(0, codes.shape[0], SCORE_BLOCK_ROWS):
+            block = codes[start:start + SCORE_BLOCK_ROWS]
+            out[start:start + block.shape[0]] = lookup[subspaces, block].sum(axis=1)
+        return out
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        return {"centroids": self.centroids}
+
+    def set_state(self, state: Dict[str, np.ndarray]) -> None:
+        self.centroids = state["centroids"]
+        self.m = self.centroids.shape[0]
+        self.n_centroids = self.centroids.shape[1]
+
+
+class PrefixCodec(VectorCodec):
+    """
+    Matryoshka kaba aşaması: text-embedding-3 vektörlerinin ilk `dimensions`
+    boyutu yeniden normalize edilerek tek başına anlamlı bir embedding verir.
+    Tüm banka bu kısa önekle taranır, en iyi adaylar tam boyutla yeniden
+    sıralanır. İstenirse önek ayrıca `inner` kodlayıcıyla sıkıştırılır.
+    """
+
+    name = "prefix"
+
+    def __init__(self, dimensions: int, inner: Optional[VectorCodec] = None):
+        self.dimensions = dimensions
+        self.inner = inner
+
+    def _prefix(self, block: np.ndarray) -> np.ndarray:
+        prefix = np.asarray(block[..., :self.dimensions], dtype=np.float32)
+        norms = np.linalg.norm(prefix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return prefix / norms
+
+    def train(self, vectors: np.ndarray) -> None:
+        if self.inner is None:
+            return
+        prefixes = np.empty((vectors.shape[0], self.dimensions), dtype=np.float32)
+        for start in range(0, vectors.shape[0], SCORE_BLOCK_ROWS):
+            prefixes[start:start + SCORE_BLOCK_ROWS] = self._prefix(vectors[start:start + SCORE_BLOCK_ROWS])
+        self.inner.train(prefixes)
+
+    def _encode_block(self, block: np.ndarray) -> np.ndarray:
+        prefix = self._prefix(block)
+        return prefix if self.inner is None else self.inner._encode_block(prefix)
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        query_prefix = self._prefix(query)
+        if self.inner is not None:
+            return self.inner.scores(codes, query_prefix)
+        return codes @ query_prefix
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        return self.inner.get_state() if self.inner is not None else {}
+
+    def set_state(self, state: Dict[str, np.ndarray]) -> None:
+        if self.inner is not None:
+            self.inner.set_state(state)
+
+
+CODECS = {
+    "float16": Float16Codec,
+    "int8": Int8Codec,
+    "pq": ProductQuantizer,
+}
+
+
+def create_codec(storage: str, dimension: int,
+                 coarse_dimensions: Optional[int] = None) -> Optional[VectorCodec]:
+    """
+    Depolama türüne göre kodlayıcı oluşturur.
+
+    Args:
+        storage (str): "float32", "float16", "int8" veya "pq".
+        dimension (int): Tam vektör boyutu.
+        coarse_dimensions (int, optional): Verilirse kaba tarama bu boyuttaki
+            Matryoshka önekiyle yapılır.
+
+    Returns:
+        Optional[VectorCodec]: Kodlayıcı; float32 tam arama için None.
+    """
+    use_prefix = bool(coarse_dimensions) and coarse_dimensions < dimension
+    code_dimension = coarse_dimensions if use_prefix else dimension
+
+    if storage == "float32":
+        inner = None
+    elif storage == "pq":
+        # Alt uzay başına 32 boyut; bölünemiyorsa en yakın böleni seç
+        m = max(1, code_dimension // 32)
+        while code_dimension % m:
+            m -= 1
+        inner = ProductQuantizer(m=m)
+    elif storage in CODECS:
+        inner = CODECS[storage]()
+    else:
+        raise ValueError(f"Bilinmeyen depolama türü: {storage}. Seçenekler: float32, {', '.join(CODECS)}")
+
+    if use_prefix:
+        return PrefixCodec(coarse_dimensions, inner)
+    return inner
+
+
+def quantized_search(codec: VectorCodec, codes: np.ndarray, vectors: np.ndarray, query: np.ndarray,
+                     top_k: int, rerank: int = 100,
+                     rows: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sıkıştırılmış kodlarla aday seçip tam hassasiyetli vektörlerle yeniden sıralar.
+
+    Args:
+        codec (VectorCodec): Kodlayıcı.
+        codes (np.ndarray): Tüm bankanın kodları.
+        vectors (np.ndarray): Tam hassasiyetli (float32, genellikle memmap) vektörler.
+        query (np.ndarray): Birim uzunlukta sorgu vektörü.
+        top_k (int): Döndürülecek sonuç sayısı.
+        rerank (int): Kesin skorla yeniden sıralanacak aday sayısı.
+        rows (np.ndarray, optional): Yalnızca bu satırlarda ara (ön filtre).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (satır numaraları, kesin skorlar), skora göre azalan.
+    """
+    approx = codec.scores(codes if rows is None else codes[rows], query)
+    n_candidates = min(max(rerank, top_k), approx.shape[0])
+    if n_candidates <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    candidates = np.argpartition(-approx, n_candidates - 1)[:n_candidates]
+    if rows is not None:
+        candidates = rows[candidates]
+    # Disk üzerindeki memmap'e sıralı erişim için satırlar sıralanır
+    candidates = np.sort(candidates)
+    exact = np.asarray(vectors[candidates], dtype=np.float32) @ query
+
+    k = min(top_k, exact.shape[0])
+    best = np.argsort(-exact)[:k]
+    return candidates[best], exact[best]
@@ -0,0 +1,194 @@
+# soru_bankasi/question_store.py
+
+import ast
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .data import load_questions
+from .manifest import row_ids
+
+logger = logging.getLogger(__name__)
+
+# CSV'de "['A) 2^12', 'B) 2^7']" gibi metin olarak saklanan liste alanları
+LIST_FIELDS = ("şıklar", "alt_konular", "sik_yapilan_hatalar")
+STORE_FORMAT_VERSION = 1
+
+
+def parse_list(value: Any) -> List[str]:
+    """
+    Metin olarak saklanmış bir listeyi ayrıştırır. `literal_eval` başarısız
+    olursa virgülle bölmeye geri düşer; boş değerler boş liste döner.
+    """
+    if isinstance(value, (list, tuple)):
+        return [str(item) for item in value]
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return []
+    text = str(value).strip()
+    if not text:
+        return []
+    try:
+        parsed = ast.literal_eval(text)
+        if isinstance(parsed, (list, tuple)):
+            return [str(item) for item in parsed]
+    except (ValueError, SyntaxError):
+        pass
+    return [part.strip() for part in text.split(",") if part.strip()]
+
+
+def _encode_strings(values: List[str]) -> Dict[str, np.ndarray]:
+    """Metinleri tek bir UTF-8 tamponu ve bayt ofsetleri olarak kodlar."""
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return {"data": data, "offsets": offsets}
+
+
+def _decode_strings(data: np.ndarray, offsets: np.ndarray) -> List[str]:
+    buffer = data.tobytes()
+    bounds = offsets.tolist()
+    return [buffer[start:end].decode("utf-8") for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+class QuestionStore:
+    """
+    Soru bankasının bir kez ayrıştırılmış, `soru_id` ile anahtarlanmış sütunsal hali.
+
+    Liste alanları (şıklar, alt konular, sık yapılan hatalar) gerçek listelere
+    çevrilir; her yeniden çalıştırmada `literal_eval` yapılmaz. Bir sorunun
+    kaydı, metnine göre tüm sütunu taramak yerine sözlük aramasıyla bulunur.
+
+    Önbellek dosyası tipli sütunlar içerir: metin sütunları UTF-8 tampon +
+    ofsetler, liste sütunları ek olarak satır başına eleman ofsetleri, sayısal
+    sütunlar kendi dtype'ları ile saklanır. CSV'nin mtime/boyutu değişince
+    önbellek geçersiz sayılır.
+    """
+
+    def __init__(self, ids: List[str], columns: Dict[str, List[Any]]):
+        self.ids = list(ids)
+        self.columns = columns
+        self._id_to_row = {vid: row for row, vid in enumerate(self.ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, vid: str) -> bool:
+        return vid in self._id_to_row
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "QuestionStore":
+        """`load_questions` çıktısından bir depo oluşturur."""
+        columns: Dict[str, List[Any]] = {}
+        for field in df.columns:
+            series = df[field]
+            if field in LIST_FIELDS:
+                columns[field] = [parse_list(value) for value in series]
+            elif pd.api.types.is_numeric_dtype(series) and not series.isna().any():
+                columns[field] = series.to_numpy()
+            else:
+                columns[field] = ["" if pd.isnull(value) else str(value) for value in series]
+        return cls(row_ids(df).tolist(), columns)
+
+    def get(self, vid: str, field: str, default: Any = None) -> Any:
+        row = self._id_to_row.get(vid)
+        if row is None or field not in self.columns:
+            return default
+        value = self.columns[field][row]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def record(self, vid: str) -> Optional[Dict[str, Any]]:
+        """Bir sorunun tüm alanlarını sözlük olarak döndürür; yoksa None."""
+        if vid not in self._id_to_row:
+            return None
+        return {field: self.get(vid, field) for field in self.columns}
+
+    def column(self, field: str) -> List[Any]:
+        return list(self.columns[field])
+
+    def save(self, path: str, source_path: str) -> None:
+        """Depoyu, kaynak CSV'nin mtime/boyutuyla birlikte tipli sütunlar olarak yazar."""
+        stat = os.stat(source_path)
+        arrays: Dict[str, np.ndarray] = {
+            "version": np.array(STORE_FORMAT_VERSION),
+            "source_mtime_ns": np.array(stat.st_mtime_ns, dtype=np.int64),
+            "source_size": np.array(stat.st_size, dtype=np.int64),
+            "fields": np.array(list(self.columns), dtype=str),
+        }
+        for name, part in _encode_strings(self.ids).items():
+            arrays[f"ids.{name}"] = part
+        for i, (field, values) in enumerate(self.columns.items()):
+            key = f"col{i}"
+            if isinstance(values, np.ndarray):
+                arrays[f"{key}.numeric"] = values
+            elif field in LIST_FIELDS:
+                items = [item for value in values for item in value]
+                list_offsets = np.zeros(len(values) + 1, dtype=np.int64)
+                np.cumsum([len(value) for value in values], out=list_offsets[1:])
+                arrays[f"{key}.lists"] = list_offsets
+                for name, part in _encode_strings(items).items():
+                    arrays[f"{key}.{name}"] = part
+            else:
+                for name, part in _encode_strings(values).items():
+                    arrays[f"{key}.{name}"] = part
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, source_path: str) -> Optional["QuestionStore"]:
+        """Önbellek güncelse depoyu yükler; dosya yoksa veya CSV değiştiyse None döner."""
+        if not os.path.exists(path):
+            return None
+        stat = os.stat(source_path)
+        with np.load(path, allow_pickle=False) as data:
+            if (int(data["version"]) != STORE_FORMAT_VERSION
+                    or int(data["source_mtime_ns"]) != stat.st_mtime_ns
+                    or int(data["source_size"]) != stat.st_size):
+                return None
+            ids = _decode_strings(data["ids.data"], data["ids.offsets"])
+            columns: Dict[str, List[Any]] = {}
+            for i, field in enumerate(data["fields"].tolist()):
+                key = f"col{i}"
+                if f"{key}.numeric" in data.files:
+                    columns[field] = data[f"{key}.numeric"]
+                    continue
+                values = _decode_strings(data[f"{key}.data"], data[f"{key}.offsets"])
+                if f"{key}.lists" in data.files:
+                    bounds = data[f"{key}.lists"].tolist()
+                    values = [values[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+                columns[field] = values
+        return cls(ids, columns)
+
+    @classmethod
+    def open(cls, csv_path: str, cache_path: str) -> "QuestionStore":
+        """
+        Güncel önbellek varsa onu yükler, yoksa CSV'yi bir kez ayrıştırıp önbelleği yazar.
+
+        Args:
+            csv_path (str): Soru CSV dosyasının yolu.
+            cache_path (str): Sütunsal önbellek dosyasının yolu (.npz).
+
+        Returns:
+            QuestionStore: Soru deposu.
+        """
+        try:
+            store = cls.load(cache_path, csv_path)
+            if store is not None:
+                return store
+        except Exception as e:
+            logger.warning(f"Soru deposu önbelleği okunamadı, CSV'den yeniden oluşturuluyor: {e}")
+
+        store = cls.from_frame(load_questions(csv_path))
+        try:
+            store.save(cache_path, csv_path)
+        except OSError as e:
+            logger.warning(f"Soru deposu önbelleği yazılamadı: {e}")
+        return store
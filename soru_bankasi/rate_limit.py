@@ -0,0 +1,268 @@
+# soru_bankasi/rate_limit.py
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Uzak servislerin hız sınırı yanıtlarında bekleme süresini bildiren başlıklar
+RETRY_AFTER_HEADERS = ("retry-after-ms", "retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+# Tekrar denemeye değer geçici hatalar (sınıf adına göre; openai 0.x ve 1.x)
+_TRANSIENT_ERROR_NAMES = ("RateLimit", "Timeout", "APIConnection", "ServiceUnavailable", "APIError",
+                          "InternalServerError", "TryAgain", "ConnectionError")
+
+
+def estimate_tokens(text: str) -> int:
+    """Token sayısı için kaba tahmin (Türkçe metinde ~3 karakter/token)."""
+    return max(1, len(text) // 3)
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    for attribute in ("http_status", "status_code"):
+        status = getattr(error, attribute, None)
+        if isinstance(status, int):
+            return status
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    return _status_code(error) == 429 or "RateLimit" in type(error).__name__
+
+
+def is_retryable_error(error: Exception) -> bool:
+    status = _status_code(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    return any(name in type(error).__name__ for name in _TRANSIENT_ERROR_NAMES)
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    # "2", "0.5", "1s", "250ms", "6m0s" biçimleri
+    value = value.strip().lower()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    total, number = 0.0, ""
+    units = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    i = 0
+    while i < len(value):
+        ch = value[i]
+        if ch.isdigit() or ch == ".":
+            number += ch
+            i += 1
+            continue
+        unit = "ms" if value.startswith("ms", i) else ch
+        if unit not in units or not number:
+            return None
+        total += float(number) * units[unit]
+        number = ""
+        i += len(unit)
+    return total if not number else None
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Hata yanıtındaki retry-after / x-ratelimit-reset başlıklarından bekleme süresini okur."""
+    headers = getattr(error, "headers", None)
+    if headers is None:
+        headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    for name in RETRY_AFTER_HEADERS:
+        value = headers.get(name)
+        if value is None:
+            continue
+        seconds = _parse_duration(str(value))
+        if seconds is not None:
+            return seconds / 1000.0 if name == "retry-after-ms" else seconds
+    return None
+
+
+class TokenBucket:
+    """
+    Dakikalık istek/token bütçesi için token kovası.
+
+    Kova `capacity` kadar dolar ve saniyede `rate` hızla yenilenir. `acquire`
+    bütçeyi önceden ayırır (bakiye eksiye düşebilir) ve borç kapanana kadar
+    bekler; böylece bekleyenler sırayla ve bütçeyi aşmadan ilerler.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self._available = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Bütçeyi ayırır ve kullanılabilir olana kadar beklenmesi gereken süreyi döndürür."""
+        with self._lock:
+            now = time.monotonic()
+            self._available = min(self.capacity, self._available + (now - self._updated) * self.rate)
+            self._updated = now
+            self._available -= min(amount, self.capacity)
+            wait = -self._available / self.rate if self._available < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def acquire(self, amount: float = 1.0) -> None:
+        wait = self.reserve(amount)
+        if wait > 0:
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Sunucu retry-after bildirdiğinde tüm çağıranları bu süre kadar bekletir."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class AIMDLimiter:
+    """
+    Eşzamanlı istek sınırı için AIMD (additive increase, multiplicative decrease) denetleyicisi.
+
+    Her başarılı istek sınırı 1/sınır kadar artırır (tam bir pencere başarıyla
+    dönünce +1), hız sınırı yanıtı sınırı `decrease` ile çarpar. Toplu işler
+    böylece servisin kaldırabildiği en yüksek eşzamanlılığa yakınsar.
+
+    Son düşüşten önce başlamış isteklerin hız sınırı yanıtları aynı tıkanıklığa
+    aittir; sınırı yalnızca bir kez düşürürler (her düşüş yeni bir dönem açar).
+    """
+
+    def __init__(self, initial: float = 4, minimum: float = 1, maximum: float = 32,
+                 decrease: float = 0.5):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.in_flight = 0
+        self._epoch = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> int:
+        """Bir eşzamanlılık yuvası alır; `release` için dönem numarasını döndürür."""
+        with self._condition:
+            while self.in_flight >= max(1, int(self.limit)):
+                self._condition.wait()
+            self.in_flight += 1
+            return self._epoch
+
+    def release(self, outcome: str, epoch: int) -> None:
+        """outcome: "ok", "throttled" veya "error" (sınırı değiştirmez)."""
+        with self._condition:
+            self.in_flight -= 1
+            if outcome == "ok":
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            elif outcome == "throttled" and epoch == self._epoch:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+                self._epoch += 1
+            self._condition.notify_all()
+
+
+class RateLimitScheduler:
+    """
+    Bir uzak uç nokta (embedding, chat...) için paylaşılan çağrı zamanlayıcısı.
+
+    Her çağrı önce istek ve token kovasından bütçe ayırır, sonra AIMD
+    eşzamanlılık sınırı içinde çalışır. Hız sınırı hatalarında sunucunun
+    retry-after süresi tüm çağıranlara uygulanır; diğer geçici hatalarda
+    jitter'lı üstel geri çekilmeyle yeniden denenir. Kalıcı hatalar
+    (geçersiz istek, kimlik doğrulama) beklemeden yükseltilir.
+    """
+
+    def __init__(self, name: str, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None, initial_concurrency: int = 4,
+                 max_concurrency: int = 32, max_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 60.0):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.concurrency = AIMDLimiter(initial_concurrency, maximum=max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = {"calls": 0, "retries": 0, "throttled": 0, "failures": 0}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def last_attempts(self) -> int:
+        """Çağıran iş parçacığının son `call` çağrısında yapılan deneme sayısı."""
+        return getattr(self._local, "attempts", 0)
+
+    def backoff(self, attempt: int) -> float:
+        return min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    def call(self, fn: Callable[..., Any], *args: Any, tokens: int = 1,
+             max_retries: Optional[int] = None, **kwargs: Any) -> Any:
+        """
+        `fn(*args, **kwargs)` çağrısını hız sınırlarına uyarak çalıştırır.
+
+        Args:
+            fn (Callable): Uzak servisi çağıran fonksiyon.
+            tokens (int): İsteğin tahmini token maliyeti (token bütçesi için).
+            max_retries (int, optional): Zamanlayıcının varsayılanını geçersiz kılar.
+
+        Returns:
+            Any: `fn` çağrısının sonucu.
+        """
+        attempts = max_retries if max_retries is not None else self.max_retries
+        for attempt in range(attempts):
+            if self.requests is not None:
+                self.requests.acquire(1)
+            if self.tokens is not None:
+                self.tokens.acquire(tokens)
+
+            epoch = self.concurrency.acquire()
+            self._count("calls")
+            self._local.attempts = attempt + 1
+            outcome = "error"
+            try:
+                result = fn(*args, **kwargs)
+                outcome = "ok"
+                return result
+            except Exception as e:
+                if not is_retryable_error(e) or attempt == attempts - 1:
+                    self._count("failures")
+                    raise
+                if is_rate_limit_error(e):
+                    outcome = "throttled"
+                    self._count("throttled")
+                    wait = retry_after_seconds(e) or self.backoff(attempt)
+                    for bucket in (self.requests, self.tokens):
+                        if bucket is not None:
+                            bucket.pause(wait)
+                else:
+                    wait = self.backoff(attempt)
+                self._count("retries")
+                logger.warning(
+                    f"[{self.name}] İstek başarısız ({type(e).__name__}: {e}); "
+                    f"{wait:.1f} sn sonra tekrar denenecek ({attempt + 1}/{attempts})."
+                )
+            finally:
+                self.concurrency.release(outcome, epoch)
+            time.sleep(wait)
+        raise RuntimeError(f"[{self.name}] maksimum deneme sayısı aşıldı.")
+
+
+_SCHEDULERS: Dict[str, RateLimitScheduler] = {}
+_SCHEDULERS_LOCK = threading.Lock()
+
+
+def get_scheduler(name: str, **options: Any) -> RateLimitScheduler:
+    """
+    Verilen uç nokta için süreç genelinde paylaşılan zamanlayıcıyı döndürür.
+    Seçenekler yalnızca ilk oluşturmada kullanılır.
+    """
+    with _SCHEDULERS_LOCK:
+        scheduler = _SCHEDULERS.get(name)
+        if scheduler is None:
+            scheduler = _SCHEDULERS[name] = RateLimitScheduler(name, **options)
+        return scheduler
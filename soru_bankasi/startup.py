@@ -0,0 +1,132 @@
+# soru_bankasi/startup.py
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """Soğuk başlangıç aşamalarının (bağlantı, veri yükleme, indeksleme...) sürelerini toplar."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished = self.started
+        self.phases: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            finished = time.perf_counter()
+            elapsed = finished - started
+            with self._lock:
+                self.phases[phase] = self.phases.get(phase, 0.0) + elapsed
+                self.finished = max(self.finished, finished)
+            logger.info(f"Başlangıç aşaması '{phase}': {elapsed:.2f} sn")
+
+    def summary(self) -> str:
+        """Sürecin başından son ölçülen aşamanın bitişine kadar geçen süre ve aşama dökümü."""
+        with self._lock:
+            parts = ", ".join(f"{phase} {seconds:.2f} sn" for phase, seconds in self.phases.items())
+            total = self.finished - self.started
+        return f"{total:.2f} sn ({parts})" if parts else "ölçüm yok"
+
+
+class LazyResource:
+    """
+    İlk kullanıldığında bir kez oluşturulan, iş parçacığı güvenli kaynak.
+
+    Kaynak arka planda (örn. sağlık kontrolü tarafından) ısıtılabilir; o sırada
+    `get()` çağıran taraf oluşturma bitene kadar bekler, ikinci kez oluşturmaz.
+    Oluşturma başarısız olursa bir sonraki `get()` yeniden dener.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any], timer: Optional[StartupTimer] = None):
+        self.name = name
+        self._factory = factory
+        self._timer = timer
+        self._value: Any = None
+        self._ready = False
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def get(self) -> Any:
+        if self._ready:
+            return self._value
+        with self._lock:
+            if not self._ready:
+                if self._timer is not None:
+                    with self._timer.measure(self.name):
+                        self._value = self._factory()
+                else:
+                    self._value = self._factory()
+                self._ready = True
+        return self._value
+
+
+def _vector_count(stats: Any) -> Optional[int]:
+    # Yerel indeks sözlük, Pinecone yanıt nesnesi döndürür
+    if isinstance(stats, dict):
+        return stats.get("total_vector_count")
+    return getattr(stats, "total_vector_count", None)
+
+
+class IndexHealthMonitor:
+    """
+    Vektör indeksini arka planda belirli aralıklarla yoklar (`describe_index_stats`).
+
+    İlk yoklama bağlantıyı da kurar; böylece sayfa çizilirken indeks bağlantısı
+    arka planda ısınır. Son durum, gecikme ve vektör sayısı `snapshot()` ile
+    bekletmeden okunur; sayfa yeniden çalıştırmaları ağ çağrısı yapmaz.
+    """
+
+    def __init__(self, index: LazyResource, interval: float = 60.0):
+        self.index = index
+        self.interval = interval
+        self._state: Dict[str, Any] = {"healthy": None, "latency_ms": None, "checked_at": None,
+                                       "vector_count": None, "error": None}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "IndexHealthMonitor":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="index-health", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.check()
+            self._stop.wait(self.interval)
+
+    def check(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            stats = self.index.get().describe_index_stats()
+            state = {"healthy": True, "vector_count": _vector_count(stats), "error": None}
+        except Exception as e:
+            logger.warning(f"İndeks sağlık kontrolü başarısız: {e}")
+            state = {"healthy": False, "vector_count": None, "error": str(e)}
+        state["latency_ms"] = (time.perf_counter() - started) * 1000
+        state["checked_at"] = time.time()
+        with self._lock:
+            self._state = state
+        return state
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._state)
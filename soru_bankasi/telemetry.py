@@ -0,0 +1,177 @@
+# soru_bankasi/telemetry.py
+
+import heapq
+import json
+import logging
+import threading
+import time
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+LATENCY_PERCENTILES = (50, 90, 95, 99)
+
+_current = threading.local()
+
+
+def _usage_tokens(response: Any) -> tuple:
+    # openai 0.x yanıtı sözlük gibi, 1.x yanıtı nitelikli nesne döndürür
+    usage = response.get("usage") if isinstance(response, dict) else getattr(response, "usage", None)
+    if usage is None:
+        return 0, 0
+    if isinstance(usage, dict):
+        return usage.get("prompt_tokens", 0) or 0, usage.get("completion_tokens", 0) or 0
+    return getattr(usage, "prompt_tokens", 0) or 0, getattr(usage, "completion_tokens", 0) or 0
+
+
+class UsageMeter:
+    """Bir iş biriminin (soru veya soru partisi) LLM kullanımını toplar."""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.parse: Counter = Counter()
+
+    def add_attempts(self, attempts: int) -> None:
+        """Zamanlayıcının bir çağrı için yaptığı deneme sayısı (ilki dışındakiler tekrar sayılır)."""
+        self.requests += attempts
+        self.retries += max(0, attempts - 1)
+
+    def add_usage(self, response: Any) -> None:
+        prompt_tokens, completion_tokens = _usage_tokens(response)
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+
+    def add_retry(self) -> None:
+        """Geçersiz yanıt nedeniyle tekrarlanan istek."""
+        self.retries += 1
+
+    def add_parse(self, outcome: str) -> None:
+        self.parse[outcome] += 1
+
+
+@contextmanager
+def metered() -> Iterator[UsageMeter]:
+    """Blok içinde (aynı iş parçacığında) yapılan LLM çağrılarını yeni bir ölçere kaydeder."""
+    previous = getattr(_current, "meter", None)
+    meter = _current.meter = UsageMeter()
+    try:
+        yield meter
+    finally:
+        _current.meter = previous
+
+
+def current_meter() -> Optional[UsageMeter]:
+    return getattr(_current, "meter", None)
+
+
+class RunTelemetry:
+    """
+    Toplu zenginleştirme çalıştırmasının satır bazlı ölçümleri.
+
+    Her satır için gecikme, token, istek/tekrar sayısı ve JSON ayrıştırma sonucu
+    JSONL dosyasına yazılır; bellekte yalnızca özet için gereken gecikme dizisi
+    ve en yavaş satırlar tutulur. Partiyle işlenen satırlarda gecikme partinin
+    süresi, tokenlar partideki satırlara eşit paylaştırılmış değerdir.
+
+    Dosyaya ekleme kipinde yazılır ve her satır `run_id` taşır; kontrol
+    noktasından devam eden çalıştırmalar öncekilerin ölçümlerini silmez.
+    Özet her çalıştırma için ayrı dosyaya yazılır.
+    """
+
+    def __init__(self, path: Optional[str] = None, slowest: int = 10, run_id: Optional[str] = None):
+        self.path = path
+        self.slowest = slowest
+        self.run_id = run_id or time.strftime("%Y%m%dT%H%M%S")
+        self.started = time.perf_counter()
+        self._file = open(path, "a", encoding="utf-8") if path else None
+        self._latencies = array("d")
+        self._slowest: List[tuple] = []
+        self.totals: Dict[str, Any] = {"rows": 0, "failed_rows": 0, "requests": 0, "retries": 0,
+                                       "prompt_tokens": 0, "completion_tokens": 0}
+        self.parse: Counter = Counter()
+
+    def record(self, row_ids: Sequence[str], meter: Optional[UsageMeter], latency: float,
+               succeeded: Sequence[bool]) -> None:
+        """
+        Bir iş biriminin ölçümlerini kaydeder.
+
+        Args:
+            row_ids (Sequence[str]): Birimdeki satırların kimlikleri.
+            meter (UsageMeter, optional): Birimin kullanımı (zaman aşımında None).
+            latency (float): Birimin süresi (saniye).
+            succeeded (Sequence[bool]): Satır başına başarı durumu.
+        """
+        meter = meter or UsageMeter()
+        share = 1.0 / max(1, len(row_ids))
+        for key in ("requests", "retries", "prompt_tokens", "completion_tokens"):
+            self.totals[key] += getattr(meter, key)
+        self.parse.update(meter.parse)
+        parse = "+".join(sorted(meter.parse)) or "none"
+
+        for row_id, ok in zip(row_ids, succeeded):
+            self.totals["rows"] += 1
+            self.totals["failed_rows"] += 0 if ok else 1
+            self._latencies.append(latency)
+            entry = (latency, str(row_id))
+            if len(self._slowest) < self.slowest:
+                heapq.heappush(self._slowest, entry)
+            elif entry > self._slowest[0]:
+                heapq.heapreplace(self._slowest, entry)
+            if self._file is not None:
+                self._file.write(json.dumps({
+                    "run_id": self.run_id, "soru_id": str(row_id), "status": "ok" if ok else "failed",
+                    "latency_s": round(latency, 3), "batch_size": len(row_ids),
+                    "prompt_tokens": round(meter.prompt_tokens * share, 1),
+                    "completion_tokens": round(meter.completion_tokens * share, 1),
+                    "requests": meter.requests, "retries": meter.retries, "parse": parse,
+                }, ensure_ascii=False) + "\n")
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        latencies = np.frombuffer(self._latencies, dtype=np.float64)
+        percentiles = ({f"p{p}": float(v) for p, v in zip(LATENCY_PERCENTILES, np.percentile(latencies, LATENCY_PERCENTILES))}
+                       if len(latencies) else {})
+        return {
+            "run_id": self.run_id,
+            **self.totals,
+            "elapsed_s": elapsed,
+            "rows_per_minute": self.totals["rows"] / elapsed * 60 if elapsed > 0 else 0.0,
+            "latency_s": percentiles,
+            "parse": dict(self.parse),
+            "slowest": [{"soru_id": row_id, "latency_s": latency}
+                        for latency, row_id in sorted(self._slowest, reverse=True)],
+        }
+
+    def report(self) -> str:
+        """Çalıştırma özetini okunabilir metin olarak döndürür."""
+        s = self.summary()
+        latency = ", ".join(f"{name} {value:.1f} sn" for name, value in s["latency_s"].items()) or "-"
+        slowest = ", ".join(f"{item['soru_id']} ({item['latency_s']:.1f} sn)" for item in s["slowest"]) or "-"
+        return "\n".join([
+            f"Satır: {s['rows']} ({s['failed_rows']} başarısız), süre {s['elapsed_s']:.1f} sn, "
+            f"{s['rows_per_minute']:.1f} satır/dk",
+            f"Gecikme: {latency}",
+            f"İstek: {s['requests']} ({s['retries']} tekrar), token: {s['prompt_tokens']} girdi + "
+            f"{s['completion_tokens']} çıktı",
+            f"JSON ayrıştırma: {', '.join(f'{k} {v}' for k, v in s['parse'].items()) or '-'}",
+            f"En yavaş satırlar: {slowest}",
+        ])
+
+    def close(self) -> Optional[str]:
+        """Satır dosyasını kapatır ve özeti `<path>.<run_id>.summary.json` dosyasına yazar; özet yolunu döndürür."""
+        if self._file is None:
+            return None
+        self._file.close()
+        self._file = None
+        summary_path = f"{self.path}.{self.run_id}.summary.json"
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+        return summary_path
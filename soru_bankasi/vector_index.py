@@ -0,0 +1,435 @@
+# soru_bankasi/vector_index.py
+
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .partitions import FILTER_FIELDS, MetadataPartitions
+from .quantization import create_codec, quantized_search
+
+logger = logging.getLogger(__name__)
+
+
+class VectorIndex:
+    """
+    Benzer soru önerisinde kullanılan vektör indeksi arayüzü.
+
+    Çağrı imzaları Pinecone `Index` nesnesiyle aynıdır; böylece `index_data`
+    ve `query_similar_questions` hangi arka uçla çalıştığını bilmez.
+    """
+
+    def upsert(self, vectors: List[Dict[str, Any]]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def query(self, vector: List[float], top_k: int = 5, include_metadata: bool = False,
+              filter: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def describe_index_stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def delete(self, ids: List[str]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+def _json_default(value: Any) -> Any:
+    """NumPy skalerlerini JSON'a yazılabilir hale getirir."""
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+class LocalVectorIndex(VectorIndex):
+    """
+    Diskte memory-mapped NumPy dosyası olarak tutulan yerel kosinüs indeksi.
+
+    Vektörler birim uzunluğa normalize edilerek `vectors.npy` dosyasına yazılır;
+    bir sorgu tek bir matris-vektör çarpımı (BLAS) ile tüm bankayı skorlar.
+    id -> satır eşlemesi ve metadata `index.json` dosyasında saklanır.
+
+    `storage` float16/int8/pq seçildiğinde bellekte yalnızca sıkıştırılmış kodlar
+    tutulur; en iyi `rerank_candidates` aday disk üzerindeki float32 vektörlerle
+    kesin olarak yeniden skorlanır. `coarse_dimensions` verildiğinde kaba tarama
+    Matryoshka önekiyle (örn. 256 boyut) yapılır.
+
+    Nesne süreç genelinde paylaşılır (oturum iş parçacıkları ve sağlık kontrolü);
+    yazma işlemleri ve tembel yeniden kurulumlar (bölümler, kodlar) aynı `RLock`
+    altında çalışır. Sorgu kilit altında yalnızca matrisin, kodların ve bölümlerin
+    anlık görüntüsünü alır; skorlama kilitsiz yapılır, böylece oturumların sorguları
+    birbirini beklemez. Skorlama sırasında yazma olduysa sorgu kilit altında tekrarlanır.
+
+    Toplu indekslemede upsert'ler `batch()` bloğu içinde yapılmalıdır; aksi halde
+    her çağrı tüm id ve metadata listesini yeniden yazar.
+    """
+
+    VECTORS_FILE = "vectors.npy"
+    STATE_FILE = "index.json"
+    CODES_FILE = "codes_{name}.npz"
+
+    def __init__(self, path: str, dimension: int, initial_capacity: int = 1024,
+                 filter_fields: Sequence[str] = FILTER_FIELDS,
+                 storage: str = "float32", rerank_candidates: int = 100,
+                 coarse_dimensions: Optional[int] = None):
+        """
+        Args:
+            path (str): İndeks dosyalarının tutulacağı klasör.
+            dimension (int): Vektör boyutu (örn. 3072).
+            initial_capacity (int): İlk oluşturulacak satır kapasitesi.
+            filter_fields (Sequence[str]): Ön filtre için bölümlenecek metadata alanları.
+            storage (str): Bellekteki gösterim: "float32", "float16", "int8" veya "pq".
+            rerank_candidates (int): Sıkıştırılmış aramada kesin skorlanacak aday sayısı.
+            coarse_dimensions (int, optional): Verilirse banka önce bu boyuttaki
+                Matryoshka önekiyle taranır, adaylar tam boyutla yeniden sıralanır.
+        """
+        self.path = path
+        self.dimension = dimension
+        self.filter_fields = tuple(filter_fields)
+        self.storage = storage
+        self.rerank_candidates = rerank_candidates
+        self._codec = create_codec(storage, dimension, coarse_dimensions)
+        self._codes_name = storage if not coarse_dimensions else f"{storage}_prefix{coarse_dimensions}"
+        self._codes: Optional[np.ndarray] = None
+        # Her yazma işleminde artar; kaydedilmiş kodların güncelliğini belirler
+        self._revision = 0
+        # Yazma işlemlerinden sonra ilk filtreli sorguda yeniden kurulur
+        self._partitions: Optional[MetadataPartitions] = None
+        # batch() bloğu içinde durum dosyası yazılmaz; _dirty kaydedilmemiş değişikliği gösterir
+        self._batch_depth = 0
+        self._dirty = False
+        self._lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+
+        self._ids: List[str] = []
+        self._metadata: List[Dict[str, Any]] = []
+        self._id_to_row: Dict[str, int] = {}
+
+        state_path = os.path.join(path, self.STATE_FILE)
+        vectors_path = os.path.join(path, self.VECTORS_FILE)
+        if os.path.exists(state_path) and os.path.exists(vectors_path):
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("dimension") != dimension:
+                raise ValueError(
+                    f"İndeks boyutu uyuşmuyor: {state.get('dimension')} != {dimension}"
+                )
+            self._ids = state["ids"]
+            self._metadata = state["metadata"]
+            self._revision = state.get("revision", 0)
+            self._id_to_row = {vid: row for row, vid in enumerate(self._ids)}
+            self._vectors = np.load(vectors_path, mmap_mode="r+")
+        else:
+            self._vectors = self._allocate(max(initial_capacity, 1))
+
+    @property
+    def size(self) -> int:
+        return len(self._ids)
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        """Verilen kapasitede yeni bir memmap dosyası oluşturur, mevcut satırları taşır."""
+        vectors_path = os.path.join(self.path, self.VECTORS_FILE)
+        tmp_path = vectors_path + ".tmp"
+        new_vectors = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=np.float32, shape=(capacity, self.dimension)
+        )
+        if self.size:
+            new_vectors[:self.size] = self._vectors[:self.size]
+        new_vectors.flush()
+        del new_vectors
+        os.replace(tmp_path, vectors_path)
+        return np.load(vectors_path, mmap_mode="r+")
+
+    def _ensure_capacity(self, required: int) -> None:
+        capacity = self._vectors.shape[0]
+        if required <= capacity:
+            return
+        while capacity < required:
+            capacity *= 2
+        self._vectors = self._allocate(capacity)
+
+    def _mark_changed(self, persist: bool = False) -> None:
+        """
+        Yazma sonrası bölümleri ve kodları geçersiz kılar. Durum dosyası hemen,
+        `batch()` bloğu içindeyse blok sonunda (`persist` verilmedikçe) yazılır.
+        """
+        self._partitions = None
+        self._codes = None
+        self._revision += 1
+        self._dirty = True
+        if persist or not self._batch_depth:
+            self._save_state()
+
+    def _save_state(self) -> None:
+        self._dirty = False
+        self._vectors.flush()
+        state_path = os.path.join(self.path, self.STATE_FILE)
+        tmp_path = state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"dimension": self.dimension, "revision": self._revision,
+                 "ids": self._ids, "metadata": self._metadata},
+                f, ensure_ascii=False, default=_json_default
+            )
+        os.replace(tmp_path, state_path)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Blok içindeki upsert'lerin durum dosyasını (`index.json`) tek seferde yazar.
+
+        Dosya tüm id ve metadata listesini tuttuğundan her upsert'te yazılması toplu
+        indekslemenin maliyetini satır sayısıyla karesel büyütür. Blok içinde durum
+        yalnızca bellekte güncellenir, sorgular yeni satırları hemen görür. Silme
+        satırları yer değiştirdiği için blok içinde de hemen kaydedilir.
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth and self._dirty:
+                    self._save_state()
+
+    def _ensure_codes(self) -> np.ndarray:
+        """
+        Sıkıştırılmış kodları diskten yükler; indeks değişmişse yeniden eğitip kodlar.
+        """
+        with self._lock:
+            return self._load_or_build_codes()
+
+    def _load_or_build_codes(self) -> np.ndarray:
+        if self._codes is not None:
+            return self._codes
+
+        codes_path = os.path.join(self.path, self.CODES_FILE.format(name=self._codes_name))
+        if os.path.exists(codes_path):
+            with np.load(codes_path, allow_pickle=False) as data:
+                if int(data["revision"]) == self._revision:
+                    self._codec.set_state({key[6:]: data[key] for key in data.files if key.startswith("state_")})
+                    self._codes = data["codes"]
+                    return self._codes
+
+        logger.info(f"{self.size} vektör '{self._codes_name}' biçiminde kodlanıyor...")
+        vectors = self._vectors[:self.size]
+        self._codec.train(vectors)
+        self._codes = self._codec.encode(vectors)
+        if self._dirty:
+            # Revizyon henüz diske yazılmadı; kodlar yalnızca bellekte tutulur
+            return self._codes
+        state = {f"state_{key}": value for key, value in self._codec.get_state().items()}
+        tmp_path = codes_path + ".tmp.npz"
+        np.savez(tmp_path, codes=self._codes, revision=np.array(self._revision), **state)
+        os.replace(tmp_path, codes_path)
+        return self._codes
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def upsert(self, vectors: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Vektörleri ekler veya aynı id'ye sahip olanları günceller.
+
+        Args:
+            vectors (List[Dict[str, Any]]): {"id", "values", "metadata"} sözlükleri.
+
+        Returns:
+            Dict[str, Any]: Pinecone ile uyumlu {"upserted_count": n} yanıtı.
+        """
+        if not vectors:
+            return {"upserted_count": 0}
+
+        values = np.asarray([v["values"] for v in vectors], dtype=np.float32)
+        if values.ndim != 2 or values.shape[1] != self.dimension:
+            raise ValueError(f"Vektör boyutu {self.dimension} olmalı, gelen: {values.shape}")
+        values = self._normalize(values)
+
+        with self._lock:
+            new_ids = {str(v["id"]) for v in vectors} - self._id_to_row.keys()
+            self._ensure_capacity(self.size + len(new_ids))
+
+            for vector, row_values in zip(vectors, values):
+                vid = str(vector["id"])
+                row = self._id_to_row.get(vid)
+                if row is None:
+                    row = self.size
+                    self._ids.append(vid)
+                    self._metadata.append({})
+                    self._id_to_row[vid] = row
+                self._vectors[row] = row_values
+                self._metadata[row] = vector.get("metadata") or {}
+
+            self._mark_changed()
+        return {"upserted_count": len(vectors)}
+
+    def delete(self, ids: List[str]) -> Dict[str, Any]:
+        """
+        Verilen id'lere ait vektörleri siler. Son satır boşalan satıra taşınarak
+        matris sıkışık tutulur.
+        """
+        with self._lock:
+            for vid in ids:
+                row = self._id_to_row.pop(str(vid), None)
+                if row is None:
+                    continue
+                last = self.size - 1
+                if row != last:
+                    self._vectors[row] = self._vectors[last]
+                    self._ids[row] = self._ids[last]
+                    self._metadata[row] = self._metadata[last]
+                    self._id_to_row[self._ids[row]] = row
+                self._ids.pop()
+                self._metadata.pop()
+            self._mark_changed(persist=True)
+        return {}
+
+    def query(self, vector: List[float], top_k: int = 5, include_metadata: bool = False,
+              filter: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
+        """
+        Kosinüs benzerliğine göre en yakın `top_k` vektörü döndürür.
+
+        Args:
+            vector (List[float]): Sorgu vektörü.
+            top_k (int): Döndürülecek sonuç sayısı.
+            include_metadata (bool): Sonuçlara metadata eklensin mi.
+            filter (Dict[str, Any], optional): Pinecone sözdiziminde metadata filtresi.
+                Yalnızca filtreye uyan satırlar skorlanır.
+
+        Returns:
+            Dict[str, Any]: Pinecone ile uyumlu {"matches": [...]} yanıtı.
+        """
+        query_vec = self._normalize(np.asarray(vector, dtype=np.float32))
+        if top_k <= 0:
+            return {"matches": []}
+
+        with self._lock:
+            snapshot = self._snapshot(filter)
+        if snapshot is None:
+            return {"matches": []}
+        revision, result_rows, result_scores = self._search(snapshot, query_vec, top_k)
+
+        with self._lock:
+            if revision != self._revision:
+                # Skorlama sırasında satırlar değişmiş olabilir (silmede yer değiştirme)
+                snapshot = self._snapshot(filter)
+                if snapshot is None:
+                    return {"matches": []}
+                _, result_rows, result_scores = self._search(snapshot, query_vec, top_k)
+
+            matches = []
+            for row, score in zip(result_rows, result_scores):
+                match = {"id": self._ids[row], "score": float(score)}
+                if include_metadata:
+                    match["metadata"] = self._metadata[row]
+                matches.append(match)
+        return {"matches": matches}
+
+    def _snapshot(self, filter: Optional[Dict[str, Any]]) -> Optional[Tuple]:
+        """
+        Kilit altında çağrılır. Skorlama için (revizyon, vektörler, kodlar, satırlar)
+        döndürür; skorlanacak satır yoksa None.
+        """
+        if self.size == 0:
+            return None
+        rows = None
+        if filter:
+            if self._partitions is None:
+                self._partitions = MetadataPartitions(self._metadata, self.filter_fields)
+            rows = self._partitions.select(filter)
+            if rows.size == 0:
+                return None
+        codes = self._ensure_codes() if self._codec is not None else None
+        return self._revision, self._vectors[:self.size], codes, rows
+
+    def _search(self, snapshot: Tuple, query_vec: np.ndarray,
+                top_k: int) -> Tuple[int, np.ndarray, np.ndarray]:
+        revision, vectors, codes, rows = snapshot
+        if codes is not None:
+            result_rows, result_scores = quantized_search(
+                self._codec, codes, vectors, query_vec,
+                top_k, rerank=self.rerank_candidates, rows=rows
+            )
+        else:
+            result_rows, result_scores = self._exact_search(vectors, query_vec, top_k, rows)
+        return revision, result_rows, result_scores
+
+    @staticmethod
+    def _exact_search(vectors: np.ndarray, query_vec: np.ndarray, top_k: int,
+                      rows: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        if rows is None:
+            scores = vectors @ query_vec
+        else:
+            scores = vectors[rows] @ query_vec
+
+        k = min(top_k, scores.shape[0])
+        if k < scores.shape[0]:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(scores.shape[0])
+        candidates = candidates[np.argsort(-scores[candidates])]
+        result_rows = candidates if rows is None else rows[candidates]
+        return result_rows, scores[candidates]
+
+    def describe_index_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "dimension": self.dimension,
+                "total_vector_count": self.size,
+                "index_fullness": self.size / self._vectors.shape[0],
+                "namespaces": {},
+            }
+
+
+def batched_writes(index: Any) -> ContextManager:
+    """
+    Yerel indekste durum dosyasını blok sonunda bir kez yazan `batch()` bağlamını,
+    diğer arka uçlarda (Pinecone) boş bir bağlamı döndürür.
+    """
+    return index.batch() if isinstance(index, LocalVectorIndex) else nullcontext()
+
+
+def create_vector_index(backend: str, **options) -> Any:
+    """
+    Yapılandırmaya göre vektör indeksi oluşturur.
+
+    Args:
+        backend (str): "local" veya "pinecone".
+        **options: Arka uca özgü ayarlar. "local" için `path`, `dimension`,
+            `storage`, `rerank_candidates` ve `coarse_dimensions`;
+            "pinecone" için `api_key`, `index_name`, `dimension`, `region`.
+
+    Returns:
+        Any: `VectorIndex` arayüzünü sağlayan nesne (Pinecone için `Index`).
+    """
+    if backend == "local":
+        return LocalVectorIndex(
+            options["path"], options["dimension"],
+            storage=options.get("storage", "float32"),
+            rerank_candidates=options.get("rerank_candidates", 100),
+            coarse_dimensions=options.get("coarse_dimensions")
+        )
+
+    if backend == "pinecone":
+        from pinecone import Pinecone, ServerlessSpec
+
+        pc = Pinecone(api_key=options["api_key"])
+        index_name = options["index_name"]
+        if index_name not in pc.list_indexes().names():
+            logger.info(f"Index '{index_name}' bulunamadı. Oluşturuluyor...")
+            pc.create_index(
+                name=index_name,
+                dimension=options["dimension"],
+                metric="cosine",
+                spec=ServerlessSpec(cloud="aws", region=options.get("region", "us-east-1"))
+            )
+        return pc.Index(index_name)
+
+    raise ValueError(f"Bilinmeyen indeks arka ucu: {backend}")
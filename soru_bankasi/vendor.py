@@ -0,0 +1,83 @@
+# soru_bankasi/vendor.py
+
+import argparse
+import logging
+import os
+import sys
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = "motiKocApp(tercih-asistani)"
+
+# motiKoç uygulaması kök paketten ayrı dağıtıldığı için bu modüllerin bir kopyasını
+# kendi içinde taşır. Kaynak modül -> uygulamadaki kopya (depo köküne göre)
+VENDORED_MODULES: Dict[str, str] = {
+    "soru_bankasi/llm_json.py": f"{APP_DIR}/utils/llm_json.py",
+}
+
+
+def render_copy(source: str, target: str) -> str:
+    """Kaynak modülün içeriğini, kopyanın başlık satırlarıyla birlikte döndürür."""
+    with open(os.path.join(REPO_ROOT, source), "r", encoding="utf-8") as f:
+        lines = f.read().splitlines(keepends=True)
+    # Kaynağın "# <yol>" başlığı kopyanın kendi yoluyla değiştirilir
+    if lines and lines[0].startswith("# "):
+        lines = lines[1:]
+    relative_target = os.path.relpath(target, APP_DIR).replace(os.sep, "/")
+    header = (f"# {relative_target}\n"
+              f"# {source} kopyasıdır; düzenlemeyin. Güncellemek için: python -m soru_bankasi.vendor\n")
+    return header + "".join(lines)
+
+
+def stale_copies() -> List[str]:
+    """Kaynağından farklı olan (veya eksik) kopyaların yollarını döndürür."""
+    stale = []
+    for source, target in VENDORED_MODULES.items():
+        path = os.path.join(REPO_ROOT, target)
+        current = None
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                current = f.read()
+        if current != render_copy(source, target):
+            stale.append(target)
+    return stale
+
+
+def write_copies() -> List[str]:
+    """Güncel olmayan kopyaları yeniden yazar; yazılan yolları döndürür."""
+    written = []
+    for target in stale_copies():
+        source = next(src for src, dst in VENDORED_MODULES.items() if dst == target)
+        with open(os.path.join(REPO_ROOT, target), "w", encoding="utf-8") as f:
+            f.write(render_copy(source, target))
+        written.append(target)
+    return written
+
+
+def main() -> None:
+    """
+    Kopyaları kaynaklarından yeniden üretir; `--check` ile yalnızca denetler ve
+    kaynağından farklı kopya varsa 1 ile çıkar. Kaynak modül değiştiğinde çalıştırılır.
+    """
+    parser = argparse.ArgumentParser(description="Vendored modül kopyalarını üretir veya denetler.")
+    parser.add_argument("--check", action="store_true", help="Yalnızca denetle; farklı kopya varsa 1 ile çık")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.check:
+        stale = stale_copies()
+        for target in stale:
+            logger.error(f"'{target}' kaynağından farklı; 'python -m soru_bankasi.vendor' çalıştırın.")
+        sys.exit(1 if stale else 0)
+
+    written = write_copies()
+    for target in written:
+        logger.info(f"'{target}' güncellendi.")
+    if not written:
+        logger.info("Tüm kopyalar güncel.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+# tests/test_llm_json.py
+
+import json
+
+from soru_bankasi.llm_json import parse_with_outcome, repair_json
+
+
+def test_trailing_commas_removed_outside_strings():
+    assert json.loads(repair_json('{"a": [1, 2,], "b": {"c": 3,},}')) == {"a": [1, 2], "b": {"c": 3}}
+
+
+def test_string_contents_survive_repair():
+    data = json.loads(repair_json('{"k": "value with , } inside", "z": [1,2,],}'))
+    assert data == {"k": "value with , } inside", "z": [1, 2]}
+
+    data = json.loads(repair_json('{"a": "trailing , ]" ,}'))
+    assert data == {"a": "trailing , ]"}
+
+    data = json.loads(repair_json("{'cozum': 'x = 1 , ]', 'ok': True,}"))
+    assert data == {"cozum": "x = 1 , ]", "ok": True}
+
+
+def test_valid_json_is_not_counted_as_repaired():
+    _, outcome = parse_with_outcome('{"formul": "f(x) = [a, b, ]"}')
+    assert outcome == "clean"
@@ -0,0 +1,17 @@
+# tests/test_vendored_modules.py
+
+import os
+
+from soru_bankasi.vendor import REPO_ROOT, VENDORED_MODULES, render_copy, stale_copies
+
+
+def test_vendored_copies_match_sources():
+    # Kopya elle düzenlendiyse veya kaynak değişip kopya güncellenmediyse başarısız olur
+    assert stale_copies() == [], "Kopyaları güncellemek için: python -m soru_bankasi.vendor"
+
+
+def test_rendered_copy_keeps_source_body():
+    for source, target in VENDORED_MODULES.items():
+        with open(os.path.join(REPO_ROOT, source), "r", encoding="utf-8") as f:
+            body = f.read().split("\n", 1)[1]
+        assert render_copy(source, target).endswith(body)